@@ -1,177 +1,735 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import FileResponse, Response # Import Response
-from typing import Optional
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Optional, Tuple, Union
+import asyncio
+import hashlib
+import io
+import json
 import os
-import tempfile
+import zipfile
+from contextlib import asynccontextmanager
 import warnings
+import yaml
 import utils
 from services.resume_improver import ResumeImprover
-from pdf_generation.resume_pdf_generator import ResumePDFGenerator
+from services.job_queue import AwaitReview, Job, JobQueue
+from services.http_client import close_http_session
+from services.request_limits import RequestSizeLimitMiddleware
+from services import llm_dispatcher
+from pdf_generation.resume_pdf_generator import (
+    ResumePDFGenerator,
+    preload_fonts,
+    render_many,
+    shutdown_render_pool,
+)
+from langchain_core.globals import get_llm_cache
 from config import config
 from config.config import logger
 import time
 
 # Import our PDF to YAML converter used OpenAI to convert resumes
-from pdf2yaml import OpenAIPDFToYAMLConverter
+from pdf2yaml import ConversionCache, OpenAIPDFToYAMLConverter
 
-# Setup paths
-data_dir = os.path.join("data")
-os.makedirs(data_dir, exist_ok=True)
+# Every PDF file starts with these bytes
+PDF_MAGIC = b"%PDF-"
 
 # Suppress warnings
 warnings.filterwarnings("ignore", message="Received a Pydantic BaseModel V1 schema")
 
-app = FastAPI()
 
-@app.post("/process-resume/")
-async def process_resume(
-    background_tasks: BackgroundTasks,
-    resume_file: Optional[UploadFile] = File(None),
-    job_url: Optional[str] = Form(None),
-    job_description: Optional[str] = Form(None),
-    template_name: str = Form("classic"),
-    manual_review: bool = Form(False),
-    api_key: Optional[str] = Form(None)
-):
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Remove the workspaces of requests that a crashed or restarted worker left behind
+    await asyncio.to_thread(utils.sweep_workspaces)
+    if config.PRELOAD_FONTS:
+        # Parse the template fonts before the first request; render workers load theirs on start
+        await asyncio.to_thread(preload_fonts)
+    # Expire finished jobs even while no new ones are submitted
+    prune_task = asyncio.create_task(job_queue.prune_periodically())
+    yield
+    prune_task.cancel()
+    # Close the pooled HTTP connections used to download job posts
+    await close_http_session()
+    await asyncio.to_thread(shutdown_render_pool)
+
+
+app = FastAPI(lifespan=lifespan)
+# Stop oversized uploads before Starlette spools the whole body to disk
+app.add_middleware(RequestSizeLimitMiddleware)
+
+# Bounded worker pool for the asynchronous /jobs API
+job_queue = JobQueue()
+
+# Resumes converted from uploaded PDFs, keyed by the PDF's SHA-256
+pdf_conversion_cache = ConversionCache(
+    config.PDF_CONVERSION_CACHE_PATH, config.PDF_CONVERSION_CACHE_MAX_BYTES
+)
+
+
+def _resolve_api_key(api_key: Optional[str]) -> Optional[str]:
+    """Fall back to the OPENAI_API_KEY environment variable when no key is sent."""
+    return api_key or os.environ.get("OPENAI_API_KEY")
+
+
+def _validate_request(resume_file, job_url, job_description, api_key):
+    """Reject requests that cannot be processed before any work is done."""
+    if not job_url and not job_description:
+        raise HTTPException(status_code=400, detail="Either job_url or job_description must be provided")
+
+    if resume_file:
+        # API key is definitively required for PDF conversion
+        if not api_key:
+            raise HTTPException(
+                status_code=400,
+                detail="OpenAI API key is required to process an uploaded resume. Please provide it in the form or set OPENAI_API_KEY environment variable."
+            )
+
+        # Check if the uploaded file is a PDF
+        if not resume_file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Uploaded file must be a PDF")
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Uploaded file exceeds the limit of {config.MAX_UPLOAD_BYTES} bytes",
+    )
+
+
+async def _save_upload(resume_file: UploadFile, workspace: utils.Workspace) -> Tuple[str, str]:
+    """Copy the uploaded PDF to a file in the request's workspace.
+
+    By the time this runs Starlette has spooled the upload (to disk beyond
+    1 MB); `RequestSizeLimitMiddleware` already stopped bodies over
+    `MAX_REQUEST_BYTES` while they arrived. The spooled file is copied
+    `UPLOAD_CHUNK_BYTES` at a time and hashed in the same pass. Files that do
+    not start with the PDF magic bytes or are larger than `MAX_UPLOAD_BYTES`
+    are rejected before the rest is copied.
+
+    Returns:
+        tuple: The path of the PDF and its SHA-256.
     """
-    1. Upload and convert resume to YAML (if provided)
-    2. Generate tailored resume based on job details
+    # The size Starlette measured while spooling the upload
+    if resume_file.size is not None and resume_file.size > config.MAX_UPLOAD_BYTES:
+        raise _upload_too_large()
+    digest = hashlib.sha256()
+    header = b""
+    size = 0
+    temp_pdf = open(workspace.file("upload.pdf"), "wb")
+    try:
+        with temp_pdf:
+            while chunk := await resume_file.read(config.UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > config.MAX_UPLOAD_BYTES:
+                    raise _upload_too_large()
+                if len(header) < len(PDF_MAGIC):
+                    header += chunk[: len(PDF_MAGIC) - len(header)]
+                    if header != PDF_MAGIC[: len(header)]:
+                        raise HTTPException(status_code=400, detail="Uploaded file must be a PDF")
+                digest.update(chunk)
+                await asyncio.to_thread(temp_pdf.write, chunk)
+        if header != PDF_MAGIC:
+            raise HTTPException(status_code=400, detail="Uploaded file must be a PDF")
+    except BaseException:
+        os.unlink(temp_pdf.name)
+        raise
+    return temp_pdf.name, digest.hexdigest()
 
-    - If resume_file is provided, it will be converted to YAML using OpenAI
-    - If resume_file is not provided, the default resume from config will be used
-    - Either job_url or job_description must be provided
+
+async def _open_workspace(resume_file: Optional[UploadFile]) -> Tuple[utils.Workspace, Optional[str], Optional[str]]:
+    """Create the workspace of a request and save its uploaded PDF (if any) there.
+
+    Returns:
+        tuple: The workspace, and the path and SHA-256 of the uploaded PDF
+            (both None without an upload).
     """
-    temp_pdf_path = None # Initialize to None for cleanup
-    yaml_conversion_time = 0.0 # Initialize conversion time
+    workspace = await asyncio.to_thread(utils.Workspace)
+    try:
+        if resume_file is None:
+            return workspace, None, None
+        return (workspace, *await _save_upload(resume_file, workspace))
+    except BaseException:
+        await asyncio.to_thread(workspace.cleanup)
+        raise
+
 
+def _convert_resume(
+    job: Job, api_key: Optional[str], temp_pdf_path: str, pdf_sha256: Optional[str] = None
+) -> str:
+    """Convert the uploaded PDF to a resume YAML in the job's workspace and return its path."""
+    yaml_path = job.workspace.file("uploaded_resume.yaml")
+    cache = pdf_conversion_cache if config.PDF_CONVERSION_CACHE_ENABLED else None
+    converter = OpenAIPDFToYAMLConverter(api_key=api_key, cache=cache)
     try:
-        start_time_total = time.time() # Changed to start_time_total for clarity
+        success = converter.convert_pdf_to_yaml(temp_pdf_path, yaml_path, pdf_sha256)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing uploaded resume: {str(e)}")
+
+    if not success:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to convert PDF to YAML. Check server logs for details."
+        )
+    return yaml_path
 
-        # API Key handling
-        if not api_key:
-            # If not provided in form, try environment variable
-            api_key = os.environ.get("OPENAI_API_KEY")
-            if not api_key:
-                # Only raise error if it's actually needed (i.e., for PDF conversion)
-                # or if the default resume also relies on it later.
-                # For now, it's checked when resume_file is processed.
-                pass
-
-        # Validate job input
-        if not job_url and not job_description:
-            raise HTTPException(status_code=400, detail="Either job_url or job_description must be provided")
-
-        # Determine which resume to use
-        resume_path = config.DEFAULT_RESUME_PATH
-        if resume_file:
-            # API key is definitively required for PDF conversion
-            if not api_key:
-                raise HTTPException(
-                    status_code=400,
-                    detail="OpenAI API key is required to process an uploaded resume. Please provide it in the form or set OPENAI_API_KEY environment variable."
-                )
 
-            # Check if the uploaded file is a PDF
-            if not resume_file.filename.lower().endswith('.pdf'):
-                raise HTTPException(status_code=400, detail="Uploaded file must be a PDF")
+def _render_resume(job: Job, resume_improver: ResumeImprover, template_name: str) -> bytes:
+    """Render the tailored resume to a PDF in memory and return it."""
+    pdf_generator = ResumePDFGenerator(template_name=template_name)
 
-            # Create a temporary file to store the uploaded PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-                content = await resume_file.read()
-                temp_pdf.write(content)
-                temp_pdf_path = temp_pdf.name
+    # The tailored resume is handed over in memory, no YAML is read back
+    resume_data = resume_improver.resume_yaml
 
-            try:
-                yaml_filename = f"uploaded_resume.yaml" # Use a distinct name for uploaded resume YAML
-                yaml_path = os.path.join(data_dir, yaml_filename)
+    pdf = pdf_generator.render_to_bytes(resume_data)
+    job.resume_data = resume_data
+    _keep_render(job, template_name, pdf)
+    return pdf
 
-                converter = OpenAIPDFToYAMLConverter(api_key=api_key)
 
-                start_time_yaml = time.time()
-                success = converter.convert_pdf_to_yaml(temp_pdf_path, yaml_path)
-                end_time_yaml = time.time()
-                yaml_conversion_time = end_time_yaml - start_time_yaml
-                logger.info(f"PDF to YAML conversion took {yaml_conversion_time:.2f} seconds")
+def _keep_render(job: Job, template_name: str, pdf: bytes):
+    """Keep a rendered PDF on the job, and also in its workspace with `SAVE_RENDERED_PDFS`."""
+    job.keep_render(template_name, pdf)
+    if config.SAVE_RENDERED_PDFS:
+        with open(job.workspace.file("renders", f"tailored_resume_{template_name}.pdf"), "wb") as stream:
+            stream.write(pdf)
 
-                if not success:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Failed to convert PDF to YAML. Check server logs for details."
-                    )
-                resume_path = yaml_path
 
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Error processing uploaded resume: {str(e)}")
+def _pdf_response(pdf: bytes, template_name: str, headers: dict, background=None) -> Response:
+    """Send a PDF from memory as a download."""
+    headers = {
+        "Content-Disposition": f'attachment; filename="tailored_resume_{template_name}.pdf"',
+        **headers,
+    }
+    return Response(
+        content=pdf, media_type="application/pdf", headers=headers, background=background
+    )
+
+
+def _cleanup_upload(temp_pdf_path: Optional[str], resume_path: str):
+    """Remove the uploaded PDF and the YAML converted from it."""
+    if temp_pdf_path and os.path.exists(temp_pdf_path):
+        os.unlink(temp_pdf_path)
+    if resume_path != config.DEFAULT_RESUME_PATH and os.path.exists(resume_path):
+        os.unlink(resume_path)
+
+
+def run_tailoring_pipeline(
+    job: Job,
+    job_url: Optional[str] = None,
+    job_description: Optional[str] = None,
+    template_name: str = "classic",
+    manual_review: bool = False,
+    api_key: Optional[str] = None,
+    temp_pdf_path: Optional[str] = None,
+    pdf_sha256: Optional[str] = None,
+    workspace: Optional[utils.Workspace] = None,
+) -> Union[bytes, AwaitReview]:
+    """Run the convert -> fetch -> parse -> tailor -> render pipeline for one request.
+
+    This is blocking and must run on a worker thread, never on the event loop.
+    Stage durations are recorded on `job.timings`. With `manual_review`, the
+    pipeline stops after tailoring and returns an `AwaitReview`, so the
+    JobQueue frees the worker and renders once the review is done. Every file
+    of the job is written to `workspace` (a new one if omitted), which is kept
+    on `job.workspace` until the job is removed.
+
+    Returns:
+        bytes: The generated PDF, or an `AwaitReview`.
+    """
+    job.workspace = workspace or job.workspace or utils.Workspace()
+    resume_path = config.DEFAULT_RESUME_PATH
+    try:
+        if temp_pdf_path:
+            with job.track_stage("convert"):
+                resume_path = _convert_resume(job, api_key, temp_pdf_path, pdf_sha256)
+            logger.info(f"PDF to YAML conversion took {job.timings['convert']:.2f} seconds")
+            job.emit("converted")
 
-        # Initialize ResumeImprover
         resume_improver = ResumeImprover(
             url=job_url,
             job_description=job_description,
-            resume_location=resume_path
+            resume_location=resume_path,
+            progress_callback=job.emit,
+            workspace=job.workspace.path,
+            # The stages hand the resume over in memory; the YAML is only needed for review
+            save_yaml=manual_review,
         )
 
+        # Download the job post and load the resume
+        with job.track_stage("fetch"):
+            resume_improver.prepare()
+
+        # Extract the job description
+        with job.track_stage("parse"):
+            resume_improver.parse_job()
+
         # Generate tailored resume
-        resume_improver.create_draft_tailored_resume(
-            auto_open=False,
-            manual_review=manual_review,
-            skip_pdf_create=True
+        with job.track_stage("tailor"):
+            resume_improver.tailor()
+
+        def render(job: Job) -> bytes:
+            with job.track_stage("render"):
+                if manual_review:
+                    resume_improver.reload_resume_yaml()
+                pdf = _render_resume(job, resume_improver, template_name)
+            job.emit("pdf_rendered", template_name=template_name)
+            if config.SAVE_TAILORED_RESUME_YAML:
+                resume_improver.save_resume_yaml()
+            return pdf
+
+        if manual_review:
+            return AwaitReview(resume_improver.yaml_loc, render)
+        return render(job)
+
+    finally:
+        # The tailored resume has its own copy, so the upload is not needed during review
+        _cleanup_upload(temp_pdf_path, resume_path)
+
+
+async def arun_tailoring_pipeline(
+    job: Job,
+    job_url: Optional[str] = None,
+    job_description: Optional[str] = None,
+    template_name: str = "classic",
+    manual_review: bool = False,
+    api_key: Optional[str] = None,
+    temp_pdf_path: Optional[str] = None,
+    pdf_sha256: Optional[str] = None,
+    workspace: Optional[utils.Workspace] = None,
+) -> bytes:
+    """Async version of `run_tailoring_pipeline`.
+
+    The download and LLM calls are awaited on the event loop, so many requests
+    share it instead of holding a thread each. Only the PDF conversion, file
+    I/O and rendering are handed to worker threads. Files are written to
+    `workspace` as in `run_tailoring_pipeline`.
+
+    Returns:
+        bytes: The generated PDF.
+    """
+    job.workspace = workspace or job.workspace or utils.Workspace()
+    resume_path = config.DEFAULT_RESUME_PATH
+    try:
+        if temp_pdf_path:
+            with job.track_stage("convert"):
+                resume_path = await asyncio.to_thread(
+                    _convert_resume, job, api_key, temp_pdf_path, pdf_sha256
+                )
+            logger.info(f"PDF to YAML conversion took {job.timings['convert']:.2f} seconds")
+            job.emit("converted")
+
+        resume_improver = ResumeImprover(
+            url=job_url,
+            job_description=job_description,
+            resume_location=resume_path,
+            progress_callback=job.emit,
+            workspace=job.workspace.path,
+            # The stages hand the resume over in memory; the YAML is only needed for review
+            save_yaml=manual_review,
         )
 
-        # Initialize ResumePDFGenerator
-        pdf_generator = ResumePDFGenerator(template_name=template_name)
+        with job.track_stage("fetch"):
+            await resume_improver.aprepare()
+
+        with job.track_stage("parse"):
+            await resume_improver.aparse_job()
 
-        # Define output directory
-        output_dir = os.path.join("resume")
-        os.makedirs(output_dir, exist_ok=True)
+        with job.track_stage("tailor"):
+            await resume_improver.atailor()
 
-        # Read the generated resume YAML
-        yaml_path_for_pdf = resume_improver.yaml_loc # Use the path where the final tailored YAML is
-        if not os.path.exists(yaml_path_for_pdf):
-            raise FileNotFoundError(f"Tailored resume YAML not found at {yaml_path_for_pdf}")
+        if manual_review:
+            await job.await_review(resume_improver.yaml_loc)
+            await asyncio.to_thread(resume_improver.reload_resume_yaml)
 
-        resume_data = utils.read_yaml(filename=yaml_path_for_pdf)
+        with job.track_stage("render"):
+            pdf = await asyncio.to_thread(
+                _render_resume, job, resume_improver, template_name
+            )
+        job.emit("pdf_rendered", template_name=template_name)
+        if config.SAVE_TAILORED_RESUME_YAML:
+            await asyncio.to_thread(resume_improver.save_resume_yaml)
 
-        pdf_location = pdf_generator.generate_resume(output_dir, resume_data)
+        return pdf
 
-        end_time_total = time.time()
-        total_processing_time = end_time_total - start_time_total
+    finally:
+        await asyncio.to_thread(_cleanup_upload, temp_pdf_path, resume_path)
+
+
+@app.post("/process-resume/")
+async def process_resume(
+    resume_file: Optional[UploadFile] = File(None),
+    job_url: Optional[str] = Form(None),
+    job_description: Optional[str] = Form(None),
+    template_name: str = Form("classic"),
+    manual_review: bool = Form(False),
+    api_key: Optional[str] = Form(None)
+):
+    """
+    1. Upload and convert resume to YAML (if provided)
+    2. Generate tailored resume based on job details
+
+    - If resume_file is provided, it will be converted to YAML using OpenAI
+    - If resume_file is not provided, the default resume from config will be used
+    - Either job_url or job_description must be provided
+    - With manual_review, the job is queued and the response (202) is sent once
+      the resume is tailored: it carries the job id and the `resume_location`
+      to review. Approve it with POST /jobs/{job_id}/approve and download the
+      PDF from GET /jobs/{job_id}/pdf.
+    """
+    try:
+        api_key = _resolve_api_key(api_key)
+        _validate_request(resume_file, job_url, job_description, api_key)
+
+        workspace, temp_pdf_path, pdf_sha256 = await _open_workspace(resume_file)
+
+        if manual_review:
+            job = job_queue.submit_async(
+                arun_tailoring_pipeline,
+                job_url=job_url,
+                job_description=job_description,
+                template_name=template_name,
+                manual_review=True,
+                api_key=api_key,
+                temp_pdf_path=temp_pdf_path,
+                pdf_sha256=pdf_sha256,
+                workspace=workspace,
+            )
+            resume_location = await _wait_for_review(job)
+            if resume_location is None:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to process resume: job {job.id} is {job.status}: {job.error}",
+                )
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "id": job.id,
+                    "status": job.status,
+                    "resume_location": resume_location,
+                    "approve_url": f"/jobs/{job.id}/approve",
+                    "pdf_url": f"/jobs/{job.id}/pdf",
+                },
+            )
+
+        job = Job()
+        start_time_total = time.time()
+        try:
+            pdf = await arun_tailoring_pipeline(
+                job,
+                job_url=job_url,
+                job_description=job_description,
+                template_name=template_name,
+                manual_review=manual_review,
+                api_key=api_key,
+                temp_pdf_path=temp_pdf_path,
+                pdf_sha256=pdf_sha256,
+                workspace=workspace,
+            )
+        except BaseException:
+            await asyncio.to_thread(workspace.cleanup)
+            raise
+        total_processing_time = time.time() - start_time_total
         logger.info(f"Total processing time: {total_processing_time:.2f} seconds")
 
         # Prepare custom headers for processing times
         headers = {
-            "X-Processing-Time-Yaml": str(yaml_conversion_time),
+            "X-Processing-Time-Yaml": str(job.timings.get("convert", 0.0)),
             "X-Processing-Time-Total": str(total_processing_time)
         }
 
-        # Add cleanup of temporary files to background tasks
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            background_tasks.add_task(os.unlink, temp_pdf_path)
-        # Also clean up the generated YAML files if they are temporary and not needed after PDF generation
-        if resume_path != config.DEFAULT_RESUME_PATH and os.path.exists(resume_path):
-             background_tasks.add_task(os.unlink, resume_path) # Clean up generated YAML
-
-        # Return the PDF as a downloadable file with custom headers
-        filename = f"tailored_resume_{template_name}.pdf"
-        return FileResponse(
-            path=pdf_location,
-            filename=filename,
-            media_type="application/pdf",
-            headers=headers # Pass custom headers
+        # Send the PDF straight from memory with custom headers; the workspace
+        # is removed once it has been sent
+        return _pdf_response(
+            pdf, template_name, headers, background=BackgroundTask(workspace.cleanup)
         )
 
     except FileNotFoundError as e:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            background_tasks.add_task(os.unlink, temp_pdf_path)
         raise HTTPException(status_code=404, detail=str(e))
 
     except HTTPException:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            background_tasks.add_task(os.unlink, temp_pdf_path)
         raise
 
     except Exception as e:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            background_tasks.add_task(os.unlink, temp_pdf_path)
         # Catch-all for any other unexpected errors
         logger.error(f"An unhandled error occurred: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to process resume due to an internal server error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to process resume due to an internal server error: {str(e)}")
+
+
+async def _wait_for_review(job: Job) -> Optional[str]:
+    """Wait until a streamed job is awaiting review or has finished.
+
+    If the client disconnects first the job is cancelled, as nobody would
+    learn which resume to review.
+
+    Returns:
+        str: The tailored resume YAML under review, or None if the job finished first.
+    """
+    reached = asyncio.Event()
+    review = {}
+
+    def listener(event):
+        if event["event"] == "awaiting_review":
+            review["resume_location"] = event["resume_location"]
+            reached.set()
+
+    # Streamed jobs only start once we await, so no event is missed
+    job.listeners.append(listener)
+    job.future.add_done_callback(lambda _: reached.set())
+    try:
+        await reached.wait()
+    finally:
+        job.listeners.remove(listener)
+        if not reached.is_set():
+            job_queue.cancel(job.id)
+    return review.get("resume_location")
+
+
+def _format_event(event: dict) -> str:
+    """Format a job event as a server-sent event."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _stream_job_events(job: Job):
+    """Yield the progress events of a job as server-sent events until it finishes.
+
+    If the client disconnects the job is cancelled, so an abandoned request
+    stops spending LLM calls.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def listener(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    # Replay what happened before the client started reading. Streamed jobs
+    # emit from the event loop, so nothing can be emitted in between.
+    for event in job.events:
+        events.put_nowait(event)
+    job.listeners.append(listener)
+    job.future.add_done_callback(lambda _: loop.call_soon_threadsafe(events.put_nowait, None))
+    try:
+        yield _format_event({"event": "queued", "id": job.id})
+        while (event := await events.get()) is not None:
+            yield _format_event(event)
+
+        summary = job.to_dict()
+        summary.pop("events")
+        if job.status == Job.COMPLETED:
+            summary["pdf_url"] = f"/jobs/{job.id}/pdf"
+        yield _format_event({"event": job.status, **summary})
+    finally:
+        job.listeners.remove(listener)
+        if not job.done:
+            job_queue.cancel(job.id)
+
+
+@app.post("/process-resume/stream")
+async def process_resume_stream(
+    resume_file: Optional[UploadFile] = File(None),
+    job_url: Optional[str] = Form(None),
+    job_description: Optional[str] = Form(None),
+    template_name: str = Form("classic"),
+    manual_review: bool = Form(False),
+    api_key: Optional[str] = Form(None)
+):
+    """
+    Run the same pipeline as /process-resume/ and stream its progress as server-sent events.
+
+    Events are sent as they happen (fetched, job_parsed, section_rewritten,
+    tailored, pdf_rendered) and carry partial results such as the parsed job
+    and each rewritten section. The last event is `completed` (with `pdf_url`),
+    `failed` or `cancelled`. Closing the connection cancels the job.
+
+    With `manual_review`, an `awaiting_review` event follows `tailored` and the
+    job waits for POST /jobs/{job_id}/approve (the id is in the X-Job-Id header).
+    """
+    api_key = _resolve_api_key(api_key)
+    _validate_request(resume_file, job_url, job_description, api_key)
+
+    workspace, temp_pdf_path, pdf_sha256 = await _open_workspace(resume_file)
+
+    job = job_queue.submit_async(
+        arun_tailoring_pipeline,
+        job_url=job_url,
+        job_description=job_description,
+        template_name=template_name,
+        manual_review=manual_review,
+        api_key=api_key,
+        temp_pdf_path=temp_pdf_path,
+        pdf_sha256=pdf_sha256,
+        workspace=workspace,
+    )
+    return StreamingResponse(
+        _stream_job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Job-Id": job.id},
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    resume_file: Optional[UploadFile] = File(None),
+    job_url: Optional[str] = Form(None),
+    job_description: Optional[str] = Form(None),
+    template_name: str = Form("classic"),
+    manual_review: bool = Form(False),
+    api_key: Optional[str] = Form(None)
+):
+    """
+    Queue a tailoring job and return its id immediately.
+
+    Accepts the same inputs as /process-resume/. Poll GET /jobs/{job_id} for
+    status and download the result from GET /jobs/{job_id}/pdf. With
+    `manual_review`, the job reaches the `awaiting_review` status after
+    tailoring and is rendered once POST /jobs/{job_id}/approve is called. It
+    does not occupy a worker while it waits.
+    """
+    api_key = _resolve_api_key(api_key)
+    _validate_request(resume_file, job_url, job_description, api_key)
+
+    workspace, temp_pdf_path, pdf_sha256 = await _open_workspace(resume_file)
+
+    job = job_queue.submit(
+        run_tailoring_pipeline,
+        job_url=job_url,
+        job_description=job_description,
+        template_name=template_name,
+        manual_review=manual_review,
+        api_key=api_key,
+        temp_pdf_path=temp_pdf_path,
+        pdf_sha256=pdf_sha256,
+        workspace=workspace,
+    )
+    return {"id": job.id, "status": job.status}
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the status and per-stage timings of a queued job."""
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job that is queued or, for streamed jobs, still running."""
+    job = _get_job_or_404(job_id)
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status} and cannot be cancelled")
+    return {"id": job.id, "status": Job.CANCELLED}
+
+
+@app.post("/jobs/{job_id}/approve")
+async def approve_job(job_id: str, resume_yaml: Optional[UploadFile] = File(None)):
+    """
+    End the manual review of a job so it is rendered right away.
+
+    Optionally upload the edited resume YAML; it replaces the tailored resume
+    before rendering.
+    """
+    job = _get_job_or_404(job_id)
+    if job.status != Job.AWAITING_REVIEW:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}, not awaiting review")
+
+    if resume_yaml:
+        try:
+            resume = yaml.safe_load(await resume_yaml.read())
+        except yaml.YAMLError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid resume YAML: {e}")
+        if not isinstance(resume, dict):
+            raise HTTPException(status_code=400, detail="The resume YAML must be a mapping")
+        resume["editing"] = False
+        await asyncio.to_thread(utils.write_yaml, resume, filename=job.review.resume_location)
+
+    # Saving the edited resume may already have ended the review
+    job_queue.approve(job_id)
+    return {"id": job.id, "approved": True}
+
+
+@app.post("/jobs/{job_id}/render")
+async def render_job_templates(
+    job_id: str,
+    template_names: List[str] = Form(...),
+    response_type: str = Form("zip"),
+):
+    """
+    Render the tailored resume of a completed job with several templates at once.
+
+    The templates are laid out in parallel worker processes, without running
+    the LLM pipeline again. Returns a zip of the PDFs, or with
+    `response_type=manifest` the download URL of each PDF.
+    """
+    job = _get_job_or_404(job_id)
+    if job.resume_data is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has no tailored resume yet")
+    if response_type not in ("zip", "manifest"):
+        raise HTTPException(status_code=400, detail="response_type must be 'zip' or 'manifest'")
+
+    try:
+        pdfs = await asyncio.to_thread(render_many, job.resume_data, template_names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for template_name, pdf in pdfs.items():
+        await asyncio.to_thread(_keep_render, job, template_name, pdf)
+
+    if response_type == "manifest":
+        return {
+            "id": job.id,
+            "templates": {
+                template_name: f"/jobs/{job.id}/pdf?template_name={template_name}"
+                for template_name in pdfs
+            },
+        }
+
+    archive_data = io.BytesIO()
+    with zipfile.ZipFile(archive_data, "w") as archive:
+        for template_name, pdf in pdfs.items():
+            archive.writestr(f"tailored_resume_{template_name}.pdf", pdf)
+    return Response(
+        content=archive_data.getvalue(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="tailored_resumes_{job.id}.zip"'},
+    )
+
+
+@app.get("/jobs/{job_id}/pdf")
+async def get_job_pdf(job_id: str, template_name: Optional[str] = None):
+    """Download the tailored resume of a completed job, optionally in another rendered template."""
+    job = _get_job_or_404(job_id)
+    if job.status == Job.FAILED:
+        raise HTTPException(status_code=500, detail=f"Job {job_id} failed: {job.error}")
+    if job.status == Job.CANCELLED:
+        raise HTTPException(status_code=410, detail=f"Job {job_id} was cancelled")
+    if job.status != Job.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status}")
+
+    template_name = template_name or job.params.get("template_name", "classic")
+    pdf = job.renders.get(template_name)
+    if pdf is None:
+        raise HTTPException(status_code=404, detail=f"{template_name} PDF for job {job_id} is not available")
+
+    return _pdf_response(
+        pdf, template_name, {"X-Processing-Time-Total": str(job.to_dict()["total_time"])}
+    )
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Return hit/miss counters and the size of the LLM response cache."""
+    llm_cache = get_llm_cache()
+    if not hasattr(llm_cache, "stats"):
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.stats()}
+
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    """Return the queue depth and rate limit state of the LLM dispatcher."""
+    return llm_dispatcher.dispatcher.stats()
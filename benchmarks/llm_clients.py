@@ -0,0 +1,99 @@
+"""Compare fresh LLM clients with the pooled ones against a local mock server.
+
+Run from the project root:
+    python -m benchmarks.llm_clients --calls 50 --latency 0.005
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+import config
+from services.langchain_helpers import create_llm
+from pdf2yaml import get_openai_client
+from .mock_openai_server import MockOpenAIServer
+
+API_KEY = "sk-benchmark"
+
+
+def _time_calls(server, calls, make_client, call):
+    server.reset()
+    start = time.perf_counter()
+    for _ in range(calls):
+        call(make_client())
+    elapsed = time.perf_counter() - start
+    return elapsed, len(server.connections)
+
+
+def run(calls: int, latency: float) -> list:
+    """Run every scenario and return (name, seconds, connections) rows."""
+    rows = []
+    with MockOpenAIServer(latency=latency) as server:
+        llm_kwargs = dict(
+            model_name=config.MODEL_NAME,
+            api_key=API_KEY,
+            base_url=server.base_url,
+            temperature=config.TEMPERATURE,
+            # Every call must reach the server
+            cache=False,
+        )
+
+        def chat(llm):
+            llm.invoke("ping")
+
+        def completion(client):
+            client.chat.completions.create(
+                model=config.MODEL_NAME, messages=[{"role": "user", "content": "ping"}]
+            )
+
+        scenarios = [
+            ("ChatOpenAI, new per call", lambda: ChatOpenAI(**llm_kwargs), chat),
+            ("create_llm, pooled", lambda: create_llm(**llm_kwargs), chat),
+            (
+                "OpenAI, new per call",
+                lambda: OpenAI(api_key=API_KEY, base_url=server.base_url),
+                completion,
+            ),
+            (
+                "get_openai_client, pooled",
+                lambda: get_openai_client(API_KEY),
+                completion,
+            ),
+        ]
+        # get_openai_client reads the base URL from the environment
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        for name, make_client, call in scenarios:
+            # Warm up imports and the pools
+            call(make_client())
+            elapsed, connections = _time_calls(server, calls, make_client, call)
+            rows.append((name, elapsed, connections))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50, help="Calls per scenario")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Mock server latency in seconds"
+    )
+    args = parser.parse_args()
+    # Per-request logs from the clients and the mock server would drown the results
+    for name in ("httpx", "aiohttp.access"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    print(f"{'scenario':<30} {'total (s)':>10} {'per call (ms)':>14} {'connections':>12}")
+    for name, elapsed, connections in run(args.calls, args.latency):
+        print(
+            f"{name:<30} {elapsed:>10.3f} {elapsed / args.calls * 1000:>14.2f} {connections:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+import time
+from aiohttp import web
+
+DEFAULT_CONTENT = json.dumps({"basic": {"name": "Jane Doe"}, "skills": []})
+
+
+class MockOpenAIServer:
+    """Local OpenAI-compatible server answering `/v1/chat/completions`.
+
+    The server runs its own event loop in a background thread and counts the
+    requests and TCP connections it receives, so benchmarks can show how many
+    connections a client opens without calling the real API.
+
+    Usage:
+        with MockOpenAIServer(latency=0.01) as server:
+            client = OpenAI(api_key="sk-test", base_url=server.base_url)
+    """
+
+    def __init__(self, latency: float = 0.0, content: str = DEFAULT_CONTENT):
+        """
+        Args:
+            latency (float, optional): Seconds to wait before each response. Defaults to 0.
+            content (str, optional): The message content of every completion.
+        """
+        self.latency = latency
+        self.content = content
+        self.requests = 0
+        self.connections = set()
+        self.base_url = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    async def _chat_completions(self, request):
+        body = await request.json()
+        with self._lock:
+            self.requests += 1
+            # Each TCP connection has its own client port
+            self.connections.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        )
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+
+    def start(self):
+        """Start the server and return its base URL."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.base_url
+
+    def stop(self):
+        """Stop the server and its event loop."""
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def reset(self):
+        """Reset the request and connection counters."""
+        with self._lock:
+            self.requests = 0
+            self.connections = set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,231 @@
+"""Time each stage of the tailoring pipeline offline and report p50/p95 latencies.
+
+The LLM is replaced by `services.FakeChatModel`, the job post is read from the
+test data and the resumes are synthetic, so the suite needs no network access
+and spends no tokens. Run from the project root:
+    python -m benchmarks.pipeline --iterations 20 --latency 0 --json results.json
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import utils
+from services.resume_improver import ResumeImprover
+from services.fake_chat_model import FakeChatModel
+from models.job_post import JobPost
+from pdf_generation.resume_pdf_generator import ResumePDFGenerator
+
+JOB_POSTING_HTML = os.path.join(config.TESTS_DATA_PATH, "example_job_posting.html")
+
+# (experiences, projects, highlights per entry) of the synthetic resumes
+RESUME_SIZES = {
+    "small": (2, 1, 3),
+    "medium": (4, 3, 5),
+    "large": (8, 6, 8),
+}
+
+
+def synthetic_resume(experiences: int, projects: int, highlights: int) -> dict:
+    """Build a resume with the structure of the sample resume and the given number of entries."""
+    resume = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+    experience = resume["experiences"][0]
+    project = resume["projects"][0]
+    highlight = experience["highlights"][0]
+    resume["experiences"] = [
+        dict(
+            experience,
+            company=f"{experience['company']} {i + 1}",
+            highlights=[f"{highlight} ({j + 1})" for j in range(highlights)],
+        )
+        for i in range(experiences)
+    ]
+    resume["projects"] = [
+        dict(
+            project,
+            name=f"{project['name']} {i + 1}",
+            highlights=[f"{highlight} ({j + 1})" for j in range(highlights)],
+        )
+        for i in range(projects)
+    ]
+    return resume
+
+
+def _configure(**settings):
+    """Apply settings to both the `config` package and its `config.config` module."""
+    for name, value in settings.items():
+        setattr(config, name, value)
+        setattr(config.config, name, value)
+
+
+def percentile(durations: list, fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of durations."""
+    ordered = sorted(durations)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure(func, iterations: int, setup=None) -> dict:
+    """Time `func` over several iterations.
+
+    Args:
+        func (Callable): Called with the result of `setup` (or without arguments).
+        iterations (int): Number of timed calls.
+        setup (Callable, optional): Prepares each call outside the timed section.
+
+    Returns:
+        dict: The p50, p95 and mean duration in milliseconds.
+    """
+    durations = []
+    for _ in range(iterations):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        durations.append((time.perf_counter() - start) * 1000)
+    return dict(
+        p50_ms=percentile(durations, 0.50),
+        p95_ms=percentile(durations, 0.95),
+        mean_ms=statistics.fmean(durations),
+        iterations=iterations,
+    )
+
+
+def run(iterations: int, sizes: list, templates: list, work_dir: str) -> dict:
+    """Run every benchmark case.
+
+    Returns:
+        dict: The measurement (or the error) for each case name.
+    """
+    results = {}
+
+    def case(name, func, setup=None):
+        try:
+            results[name] = measure(func, iterations, setup)
+        except Exception as e:
+            results[name] = dict(error=f"{type(e).__name__}: {e}")
+
+    with open(JOB_POSTING_HTML, "r") as stream:
+        job_post_html = stream.read()
+    job_post_text = ResumeImprover(job_description="")
+    job_post_text.job_post_html_data = job_post_html
+    job_post_text._extract_html_data()
+    job_post_text = job_post_text.job_post_raw
+
+    def scrape_setup():
+        improver = ResumeImprover(job_description="")
+        improver.job_post_html_data = job_post_html
+        return improver
+
+    case("scrape_parse", lambda improver: improver._extract_html_data(), scrape_setup)
+    case(
+        "job_extraction",
+        lambda job_post: job_post.parse_job_post(),
+        lambda: JobPost(job_post_text),
+    )
+
+    for size in sizes:
+        resume = synthetic_resume(*RESUME_SIZES[size])
+        resume_location = os.path.join(work_dir, f"resume_{size}.yaml")
+        utils.write_yaml(resume, filename=resume_location)
+
+        def tailor_setup():
+            improver = ResumeImprover(
+                job_description=job_post_text, resume_location=resume_location
+            )
+            improver.parse_job()
+            return improver
+
+        case(f"tailor[{size}]", lambda improver: improver.tailor(), tailor_setup)
+
+        def in_memory_tailor_setup():
+            improver = ResumeImprover(
+                job_description=job_post_text, resume=copy.deepcopy(resume), save_yaml=False
+            )
+            improver.parse_job()
+            return improver
+
+        case(
+            f"tailor_in_memory[{size}]",
+            lambda improver: improver.tailor(),
+            in_memory_tailor_setup,
+        )
+
+        yaml_location = os.path.join(work_dir, f"io_{size}.yaml")
+        case(
+            f"yaml_io[{size}]",
+            lambda: (
+                utils.write_yaml(resume, filename=yaml_location),
+                utils.read_yaml(filename=yaml_location),
+            ),
+        )
+
+        for template_name in templates:
+            output_dir = os.path.join(work_dir, "pdf", size, template_name)
+            os.makedirs(output_dir, exist_ok=True)
+            case(
+                f"render[{size}][{template_name}]",
+                lambda: ResumePDFGenerator(template_name).generate_resume(
+                    output_dir, resume
+                ),
+            )
+            case(
+                f"render_bytes[{size}][{template_name}]",
+                lambda: ResumePDFGenerator(template_name).render_to_bytes(resume),
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per case")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds each fake LLM call waits"
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", default=list(RESUME_SIZES), choices=list(RESUME_SIZES)
+    )
+    parser.add_argument(
+        "--templates",
+        nargs="+",
+        default=list(ResumePDFGenerator.TEMPLATES),
+        choices=list(ResumePDFGenerator.TEMPLATES),
+    )
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        _configure(
+            CHAT_MODEL=FakeChatModel,
+            FAKE_LLM_LATENCY_SECONDS=args.latency,
+            DATA_PATH=work_dir,
+            JOB_INDEX_MODE="off",
+            PDF_CACHE_ENABLED=False,
+        )
+        results = run(args.iterations, args.sizes, args.templates, work_dir)
+
+    print(f"{'case':<40} {'p50 (ms)':>10} {'p95 (ms)':>10} {'mean (ms)':>10}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<40} {'failed: ' + result['error'][:60]}")
+            continue
+        print(
+            f"{name:<40} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['mean_ms']:>10.2f}"
+        )
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
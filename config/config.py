@@ -28,11 +28,95 @@ REQUESTS_HEADERS = {
 CHAT_MODEL = ChatOpenAI
 MODEL_NAME = "gpt-4o"
 TEMPERATURE = 0.3
+# Seconds each call to services.FakeChatModel waits, standing in for the API round trip
+FAKE_LLM_LATENCY_SECONDS = 0.0
 # OPEN_FILE_COMMAND = "cursor -r"
 OPEN_FILE_COMMAND = "start"  # For Windows
 MAX_CONCURRENT_WORKERS = 4
+# Strip boilerplate from scraped job posts and fit the batch prompt into a token budget
+PROMPT_COMPACTION_ENABLED = True
+BATCH_PROMPT_TOKEN_BUDGET = 6000
+# Reuse the tailored output of unchanged resume sections when a resume is resubmitted for the same job
+DELTA_TAILORING_ENABLED = True
+TAILORED_SECTIONS_MAX_ENTRIES = 500
+# Concurrent requests parsing the same job post, or tailoring the same resume to it, share one run
+SINGLE_FLIGHT_ENABLED = True
+# Prompt-plus-LLM runnables kept for reuse across calls
+CHAIN_CACHE_SIZE = 64
+# LLM clients kept alive for reuse, one per model, temperature, API key and event loop
+LLM_POOL_SIZE = 32
 MAX_RETRIES = 3
 BACKOFF_FACTOR = 5
+JOB_QUEUE_WORKERS = MAX_CONCURRENT_WORKERS
+JOB_RETENTION_SECONDS = 60 * 60
+# How often finished jobs past JOB_RETENTION_SECONDS are removed
+JOB_PRUNE_INTERVAL_SECONDS = 60
+# Rendered PDFs a finished job keeps in memory; the oldest are dropped beyond this size
+JOB_RENDERS_MAX_BYTES = 8 * 1024 * 1024
+# Uploaded resume PDFs are copied to the workspace in chunks of this size and rejected beyond the cap
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Largest request body (the upload plus the other form fields), rejected while it arrives
+MAX_REQUEST_BYTES = MAX_UPLOAD_BYTES + 1024 * 1024
+# Each request writes its files to a private workspace under this directory
+WORKSPACES_PATH = os.path.join(DATA_PATH, "workspaces")
+WORKSPACE_MAX_AGE_SECONDS = 24 * 60 * 60
+# Also write the tailored resume.yaml of API jobs to their workspace after rendering
+SAVE_TAILORED_RESUME_YAML = False
+# API PDFs are rendered and served from memory; also write them to the job's workspace
+SAVE_RENDERED_PDFS = False
+# Worker threads of each BackgroundRunner, however many tasks are queued
+BACKGROUND_RUNNER_WORKERS = 8
+# Send the LLM calls that miss the LLM cache through the LLM dispatcher (instead of the OpenAI client's own retries)
+LLM_DISPATCHER_ENABLED = True
+# Budgets of the LLM dispatcher shared by every LLM call (0 disables a budget)
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 300000
+# Most LLM calls in flight; halved on each rate limit error and grown back on success
+LLM_MAX_CONCURRENCY = 16
+# Output tokens assumed for each call when checking the tokens-per-minute budget
+LLM_ESTIMATED_OUTPUT_TOKENS = 500
+# Retries of a rate limited LLM call, waiting Retry-After or an exponential backoff from this many seconds
+LLM_RATE_LIMIT_RETRIES = 3
+LLM_RATE_LIMIT_BACKOFF_SECONDS = 1.0
+# Durable record of background batches, so an interrupted batch resumes where it stopped
+JOB_STORE_ENABLED = True
+JOB_STORE_PATH = os.path.join(DATA_PATH, "background_tasks", "jobs.sqlite3")
+
+# Pooled HTTP client used by the async pipeline to download job posts
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_CONNECTIONS_PER_HOST = 10
+HTTP_TIMEOUT_SECONDS = 30
+
+# Job post index: "reuse" trusts previously parsed postings, "revalidate" issues a
+# conditional GET first and "off" always downloads and parses
+JOB_INDEX_MODE = "reuse"
+JOB_INDEX_PATH = os.path.join(DATA_PATH, "cache", "job_index.sqlite3")
+# In "reuse" mode, postings checked longer ago than this are revalidated with a conditional GET
+JOB_INDEX_TTL_SECONDS = 24 * 60 * 60
+
+# Persistent LLM response cache
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(DATA_PATH, "cache", "llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = 10000
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Rendered PDF cache, keyed by resume data, template name and template version
+PDF_CACHE_ENABLED = True
+PDF_CACHE_PATH = os.path.join(DATA_PATH, "cache", "pdf")
+PDF_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Resumes converted from uploaded PDFs, keyed by the PDF's SHA-256 and the converter version
+PDF_CONVERSION_CACHE_ENABLED = True
+PDF_CONVERSION_CACHE_PATH = os.path.join(DATA_PATH, "cache", "pdf2yaml")
+PDF_CONVERSION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Worker processes used to render several templates in parallel
+PDF_RENDER_WORKERS = os.cpu_count() or 1
+
+# Parse every template font at startup instead of on the first render
+PRELOAD_FONTS = True
 
 
 # Confirm presence of OpenAI API key
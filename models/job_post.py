@@ -48,14 +48,22 @@ class JobDescription(BaseModel):
 
 
 class JobPost:
-    def __init__(self, posting: str):
-        """Initialize JobPost with the job posting string."""
+    def __init__(self, posting: str, llm_kwargs: dict = None):
+        """Initialize JobPost with the job posting string.
+
+        Args:
+            posting (str): The text of the job posting.
+            llm_kwargs (dict, optional): Overrides for the extraction LLM, e.g. `chat_model`. Defaults to None.
+        """
         self.posting = posting
         self.extractor_llm = services.langchain_helpers.create_llm(
-            chat_model=config.CHAT_MODEL,
-            model_name=config.MODEL_NAME,
-            temperature=config.TEMPERATURE,
-            cache=True,
+            **{
+                "chat_model": config.CHAT_MODEL,
+                "model_name": config.MODEL_NAME,
+                "temperature": config.TEMPERATURE,
+                "cache": True,
+                **(llm_kwargs or {}),
+            }
         )
         self.parsed_job = None
 
@@ -64,3 +72,9 @@ class JobPost:
         model = self.extractor_llm.with_structured_output(JobDescription)
         self.parsed_job = model.invoke(self.posting).dict()
         return self.parsed_job
+
+    async def aparse_job_post(self, **chain_kwargs) -> dict:
+        """Async version of `parse_job_post`."""
+        model = self.extractor_llm.with_structured_output(JobDescription)
+        self.parsed_job = (await model.ainvoke(self.posting)).dict()
+        return self.parsed_job
@@ -132,3 +132,21 @@ class ResumeImproverOutput(BaseModel):
     final_answer: List[ResumeImprovements] = Field(
         ..., description=Prompts.descriptions["RESUME_IMPROVER_OUTPUT"]["final_answer"]
     )
+
+
+class BatchResumeOutput(BaseModel):
+    """Pydantic class that defines every tailored section, returned by a single LLM call."""
+
+    technical_skills: List[str] = Field(
+        ..., description="Technical skills that match the job"
+    )
+    non_technical_skills: List[str] = Field(
+        ..., description="Non-technical skills that match the job"
+    )
+    objective: str = Field(..., description="Tailored objective statement")
+    experience_highlights: List[List[str]] = Field(
+        ..., description="Rewritten highlights for each experience"
+    )
+    project_highlights: List[List[str]] = Field(
+        ..., description="Rewritten highlights for each project"
+    )
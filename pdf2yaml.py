@@ -1,8 +1,14 @@
 import argparse
+import functools
+import hashlib
 import os
+import shutil
 import yaml
 import json
 import logging
+import threading
+from collections import OrderedDict
+import pypdf
 from pypdf import PdfReader
 from openai import OpenAI
 
@@ -10,15 +16,134 @@ from openai import OpenAI
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# OpenAI clients shared by every converter, one per API key, least recently used first
+MAX_OPENAI_CLIENTS = 32
+_openai_clients = OrderedDict()
+_openai_clients_lock = threading.Lock()
+
+
+def get_openai_client(api_key):
+    """Return the shared OpenAI client for an API key.
+
+    Each client holds its own HTTP connection pool, so reusing it lets every
+    upload with the same key skip the TCP and TLS handshakes.
+    """
+    with _openai_clients_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key)
+            _openai_clients[api_key] = client
+            while len(_openai_clients) > MAX_OPENAI_CLIENTS:
+                _openai_clients.popitem(last=False)
+        _openai_clients.move_to_end(api_key)
+        return client
+
+
+@functools.lru_cache(maxsize=None)
+def converter_version():
+    """Return a hash of the conversion code.
+
+    This module holds the prompt, the model settings and the YAML template,
+    and pypdf extracts the text, so changing any of them invalidates
+    previously converted resumes.
+    """
+    digest = hashlib.sha256(pypdf.__version__.encode())
+    with open(os.path.abspath(__file__), "rb") as stream:
+        digest.update(stream.read())
+    return digest.hexdigest()
+
+
+def hash_pdf(pdf_path):
+    """Return the SHA-256 of a PDF file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """On-disk cache of resumes converted from PDFs.
+
+    Converted YAML files are keyed by the SHA-256 of the PDF bytes and the
+    converter version, so uploading the same PDF again skips both the text
+    extraction and the OpenAI call. The least recently used files are evicted
+    once the cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(pdf_sha256):
+        """Build the cache key of a PDF from its SHA-256."""
+        return hashlib.sha256(f"{pdf_sha256}:{converter_version()}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.yaml")
+
+    def fetch(self, key, output_path):
+        """Copy a cached conversion to `output_path`.
+
+        Returns:
+            bool: True on a cache hit.
+        """
+        path = self._path(key)
+        tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            if not os.path.exists(path):
+                return False
+            # Mark as recently used
+            os.utime(path)
+            shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, output_path)
+        return True
+
+    def store(self, key, yaml_path):
+        """Add a freshly converted resume YAML to the cache."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(yaml_path, tmp_path)
+        with self._lock:
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used files while the cache is over `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".yaml"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
 class OpenAIPDFToYAMLConverter:
-    def __init__(self, api_key=None):
-        """Initialize the converter with an OpenAI API key."""
+    def __init__(self, api_key=None, cache=None):
+        """Initialize the converter with an OpenAI API key.
+
+        Args:
+            api_key (str, optional): Defaults to the OPENAI_API_KEY environment variable.
+            cache (ConversionCache, optional): Reuse earlier conversions of the same PDF. Defaults to None.
+        """
         # Use provided API key or get from environment variable
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Provide it as an argument or set the OPENAI_API_KEY environment variable.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = get_openai_client(self.api_key)
+        self.cache = cache
         
         # Template for the expected YAML structure
         self.yaml_template = {
@@ -191,8 +316,35 @@ class OpenAIPDFToYAMLConverter:
             logger.error(f"Error creating YAML structure: {e}")
             return self.yaml_template
 
-    def convert_pdf_to_yaml(self, pdf_path, output_path):
-        """Convert PDF to YAML format using OpenAI."""
+    def convert_pdf_to_yaml(self, pdf_path, output_path, pdf_sha256=None):
+        """Convert PDF to YAML format using OpenAI.
+
+        With a cache, a PDF converted before is copied from the cache instead.
+
+        Args:
+            pdf_path (str): The PDF to convert.
+            output_path (str): Where to write the YAML.
+            pdf_sha256 (str, optional): The SHA-256 of the PDF, if already known. Defaults to None.
+
+        Returns:
+            bool: True if the YAML was written.
+        """
+        if self.cache is None:
+            return self._convert_pdf_to_yaml(pdf_path, output_path)
+        key = self.cache.make_key(pdf_sha256 or hash_pdf(pdf_path))
+        if self.cache.fetch(key, output_path):
+            logger.info(f"Reusing converted resume for PDF: {pdf_path}")
+            return True
+        if not self._convert_pdf_to_yaml(pdf_path, output_path):
+            return False
+        try:
+            self.cache.store(key, output_path)
+        except OSError as e:
+            logger.warning(f"Could not cache converted resume: {e}")
+        return True
+
+    def _convert_pdf_to_yaml(self, pdf_path, output_path):
+        """Extract the text of the PDF and convert it with OpenAI."""
         logger.info(f"Converting PDF: {pdf_path}")
         
         # Extract text from PDF
@@ -228,11 +380,13 @@ def main():
     parser.add_argument('pdf_path', help='Path to the PDF file')
     parser.add_argument('--output', '-o', default='resume.yaml', help='Output YAML file path')
     parser.add_argument('--api-key', '-k', help='OpenAI API key (alternatively, set OPENAI_API_KEY environment variable)')
+    parser.add_argument('--cache-dir', help='Reuse earlier conversions of the same PDF stored in this directory')
     
     args = parser.parse_args()
     
     try:
-        converter = OpenAIPDFToYAMLConverter(api_key=args.api_key)
+        cache = ConversionCache(args.cache_dir) if args.cache_dir else None
+        converter = OpenAIPDFToYAMLConverter(api_key=args.api_key, cache=cache)
         success = converter.convert_pdf_to_yaml(args.pdf_path, args.output)
         
         if success:
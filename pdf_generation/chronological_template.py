@@ -24,12 +24,19 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_timeline_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """
     Generate and return a SimpleDocTemplate for a timeline-focused resume PDF.
     """
-    author_name_formatted = name.replace(" ", "_") + "_timeline_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    else:
+        pdf_location = output
     doc = SimpleDocTemplate(
         pdf_location,
         pagesize=A4,
@@ -51,9 +58,9 @@ FONT_PATHS = {
 }
 
 FONT_NAMES = {
-    "regular": "FONT_Timeline_Regular",
-    "bold": "FONT_Timeline_Bold",
-    "italic": "FONT_Timeline_Italic",
+    "regular": "Calibri",
+    "bold": "Calibri-Bold",
+    "italic": "Calibri-Italic",
 }
 
 DEFAULT_PADDING = (2, 2)
@@ -35,25 +35,32 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_elegant_graduate_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """Generate and return a SimpleDocTemplate for an elegant graduate resume PDF."""
-    author_name_formatted = name.replace(" ", "_") + "_elegant_graduate_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
-
-    # Create directory if it doesn't exist
-    os.makedirs(job_data_location, exist_ok=True)
-
-    # Check if file exists and handle permissions
-    if os.path.exists(pdf_location):
-        try:
-            os.remove(pdf_location)
-        except PermissionError:
-            import time
-
-            timestamp = int(time.time())
-            pdf_location = os.path.join(
-                job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
-            )
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+
+        # Create directory if it doesn't exist
+        os.makedirs(job_data_location, exist_ok=True)
+
+        # Check if file exists and handle permissions
+        if os.path.exists(pdf_location):
+            try:
+                os.remove(pdf_location)
+            except PermissionError:
+                import time
+
+                timestamp = int(time.time())
+                pdf_location = os.path.join(
+                    job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
+                )
+    else:
+        pdf_location = output
 
     doc = SimpleDocTemplate(
         pdf_location,
@@ -70,15 +77,15 @@ def generate_doc_template(name, job_data_location):
 
 # Define fonts - using Georgia for elegant look
 FONT_PATHS = {
-    "regular": os.path.join(config.RESOURCES_PATH, "fonts/ARIAL.ttf"),
-    "bold": os.path.join(config.RESOURCES_PATH, "fonts/ARIALBD.ttf"),
-    "italic": os.path.join(config.RESOURCES_PATH, "fonts/ARIALI.ttf"),
+    "regular": os.path.join(config.RESOURCES_PATH, "fonts/ARIAL.TTF"),
+    "bold": os.path.join(config.RESOURCES_PATH, "fonts/ARIALBD.TTF"),
+    "italic": os.path.join(config.RESOURCES_PATH, "fonts/ARIALI.TTF"),
 }
 
 FONT_NAMES = {
-    "regular": "FONT_Elegant_Regular",
-    "bold": "FONT_Elegant_Bold",
-    "italic": "FONT_Elegant_Italic",
+    "regular": "Arial",
+    "bold": "Arial-Bold",
+    "italic": "Arial-Italic",
 }
 
 # Template dimensions
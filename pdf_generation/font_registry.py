@@ -0,0 +1,85 @@
+import os
+import threading
+from reportlab.pdfbase import pdfmetrics, ttfonts
+import config
+
+# Built-in fonts used when a template's font file is missing
+FALLBACK_FONTS = {
+    "regular": "Helvetica",
+    "bold": "Helvetica-Bold",
+    "italic": "Helvetica-Oblique",
+}
+
+
+class FontRegistry:
+    """Process-wide registry of the TrueType fonts used by the templates.
+
+    Parsing a TTF file is the most expensive part of setting up a render, and
+    ReportLab keeps registered fonts in a global table anyway, so each font is
+    parsed and registered once per process. Templates then only look up names
+    that are already registered, which costs no file I/O on repeat renders.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Font name -> path of the file it was registered from (None for fallbacks)
+        self._fonts = {}
+
+    def register(self, name: str, path: str, style: str = "regular"):
+        """Register a font under `name`, parsing its file only the first time.
+
+        Args:
+            name (str): The font name the templates' styles refer to.
+            path (str): The TrueType file of the font.
+            style (str, optional): The template style ("regular", "bold" or
+                "italic"), used to pick a built-in fallback if `path` is missing.
+
+        Raises:
+            ValueError: If `name` is already registered from a different file.
+        """
+        with self._lock:
+            if name in self._fonts:
+                registered_path = self._fonts[name]
+                if registered_path is not None and registered_path != path:
+                    raise ValueError(
+                        f"Font {name} is already registered from {registered_path}"
+                    )
+                return
+            if name in pdfmetrics.getRegisteredFontNames():
+                # Registered directly with ReportLab, outside this registry
+                self._fonts[name] = None
+                return
+            if os.path.exists(path):
+                pdfmetrics.registerFont(ttfonts.TTFont(name, path))
+                self._fonts[name] = path
+            else:
+                fallback = FALLBACK_FONTS.get(style, FALLBACK_FONTS["regular"])
+                config.logger.warning(
+                    f"Font file {path} not found, using {fallback} for {name}"
+                )
+                pdfmetrics.registerFont(
+                    pdfmetrics.Font(name, fallback, "WinAnsiEncoding")
+                )
+                self._fonts[name] = None
+
+    def register_template(self, template):
+        """Register every font a template module declares in `FONT_PATHS`."""
+        for style, path in template.FONT_PATHS.items():
+            self.register(template.FONT_NAMES[style], path, style)
+
+    def preload(self, templates):
+        """Register the fonts of several templates up front.
+
+        Args:
+            templates (iterable): Template modules, e.g. `ResumePDFGenerator.TEMPLATES.values()`.
+        """
+        for template in templates:
+            self.register_template(template)
+
+    def is_registered(self, name: str) -> bool:
+        """Check whether a font name is registered, by this registry or directly with ReportLab."""
+        with self._lock:
+            return name in self._fonts or name in pdfmetrics.getRegisteredFontNames()
+
+
+font_registry = FontRegistry()
@@ -17,25 +17,32 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_minimal_ats_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """Generate and return a SimpleDocTemplate for an ATS-focused minimal resume PDF."""
-    author_name_formatted = name.replace(" ", "_") + "_minimal_ats_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
-
-    # Create directory if it doesn't exist
-    os.makedirs(job_data_location, exist_ok=True)
-
-    # Check if file exists and handle permissions
-    if os.path.exists(pdf_location):
-        try:
-            os.remove(pdf_location)
-        except PermissionError:
-            import time
-
-            timestamp = int(time.time())
-            pdf_location = os.path.join(
-                job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
-            )
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+
+        # Create directory if it doesn't exist
+        os.makedirs(job_data_location, exist_ok=True)
+
+        # Check if file exists and handle permissions
+        if os.path.exists(pdf_location):
+            try:
+                os.remove(pdf_location)
+            except PermissionError:
+                import time
+
+                timestamp = int(time.time())
+                pdf_location = os.path.join(
+                    job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
+                )
+    else:
+        pdf_location = output
 
     doc = SimpleDocTemplate(
         pdf_location,
@@ -58,9 +65,9 @@ FONT_PATHS = {
 }
 
 FONT_NAMES = {
-    "regular": "FONT_Minimal_Regular",
-    "bold": "FONT_Minimal_Bold",
-    "italic": "FONT_Minimal_Italic",
+    "regular": "Calibri",
+    "bold": "Calibri-Bold",
+    "italic": "Calibri-Italic",
 }
 
 # Template dimensions
@@ -0,0 +1,175 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import reportlab
+import config
+
+# Fields of the resume YAML that do not change the rendered PDF
+IGNORED_FIELDS = ("editing",)
+
+
+@functools.lru_cache(maxsize=None)
+def template_version(template) -> str:
+    """Return a hash of the code that lays out a template.
+
+    The template module, the generator (which holds the shared table layout)
+    and the ReportLab version all change the output, so editing any of them
+    invalidates previously rendered PDFs.
+    """
+    from . import resume_pdf_generator
+
+    digest = hashlib.sha256(reportlab.Version.encode())
+    for module in (template, resume_pdf_generator):
+        with open(inspect.getfile(module), "rb") as stream:
+            digest.update(stream.read())
+    return digest.hexdigest()
+
+
+class RenderedPDFCache:
+    """On-disk cache of rendered resume PDFs.
+
+    PDFs are keyed by a canonical hash of the resume data, the template name
+    and the template version, so re-rendering an unchanged resume is a file
+    copy instead of a ReportLab layout. The least recently used PDFs are
+    evicted once the cache grows beyond `max_bytes`; their order and the
+    total size are tracked in memory, so the cache directory is only scanned
+    once per process.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or config.PDF_CACHE_PATH
+        self.max_bytes = max_bytes or config.PDF_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        # Cache key -> PDF size, least recently used first; loaded on first use
+        self._entries = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(template_name: str, template, data: dict) -> str:
+        """Build the cache key for rendering `data` with a template.
+
+        Args:
+            template_name (str): The name the template was requested by.
+            template (module): The template module used for the layout.
+            data (dict): The resume data.
+        """
+        data = {k: v for k, v in data.items() if k not in IGNORED_FIELDS}
+        canonical = json.dumps(
+            dict(
+                template_name=template_name,
+                template_version=template_version(template),
+                data=data,
+            ),
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _index(self) -> OrderedDict:
+        """Return the LRU index, scanning the cache directory the first time. Call with the lock held."""
+        if self._entries is None:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith(".pdf"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[: -len(".pdf")], stat.st_size))
+            self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def _touch(self, key: str) -> bool:
+        """Mark a PDF as recently used. Call with the lock held.
+
+        Returns:
+            bool: False if the PDF is not cached.
+        """
+        entries = self._index()
+        if key not in entries:
+            return False
+        try:
+            # The modification time keeps the LRU order across restarts
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            self._total_bytes -= entries.pop(key)
+            return False
+        entries.move_to_end(key)
+        return True
+
+    def fetch(self, key: str, pdf_location: str) -> bool:
+        """Place a cached PDF at `pdf_location`.
+
+        Returns:
+            bool: True on a cache hit.
+        """
+        with self._lock:
+            if not self._touch(key):
+                return False
+        os.makedirs(os.path.dirname(os.path.abspath(pdf_location)), exist_ok=True)
+        tmp_location = f"{pdf_location}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # A copy, not a hard link: a later render into `pdf_location` would
+            # otherwise overwrite the cache entry through the shared inode
+            shutil.copyfile(self._path(key), tmp_location)
+        except FileNotFoundError:
+            return False
+        os.replace(tmp_location, pdf_location)
+        return True
+
+    def fetch_bytes(self, key: str):
+        """Return a cached PDF.
+
+        Returns:
+            bytes: The PDF, or None on a cache miss.
+        """
+        with self._lock:
+            if not self._touch(key):
+                return None
+        try:
+            with open(self._path(key), "rb") as stream:
+                return stream.read()
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, pdf_location: str):
+        """Add a freshly rendered PDF to the cache."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(pdf_location, tmp_path)
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            entries = self._index()
+            os.replace(tmp_path, path)
+            self._total_bytes += size - entries.pop(key, 0)
+            entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used PDFs while the cache is over `max_bytes`. Call with the lock held."""
+        while self._entries and self._total_bytes > self.max_bytes:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Remove every cached PDF."""
+        with self._lock:
+            if os.path.isdir(self.cache_dir):
+                shutil.rmtree(self.cache_dir)
+            self._entries = None
+            self._total_bytes = 0
+
+
+pdf_cache = RenderedPDFCache()
@@ -34,25 +34,32 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_professional_ats_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """Generate and return a SimpleDocTemplate for a professional ATS-optimized resume PDF."""
-    author_name_formatted = name.replace(" ", "_") + "_professional_ats_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
-
-    # Create directory if it doesn't exist
-    os.makedirs(job_data_location, exist_ok=True)
-
-    # Check if file exists and handle permissions
-    if os.path.exists(pdf_location):
-        try:
-            os.remove(pdf_location)
-        except PermissionError:
-            import time
-
-            timestamp = int(time.time())
-            pdf_location = os.path.join(
-                job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
-            )
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+
+        # Create directory if it doesn't exist
+        os.makedirs(job_data_location, exist_ok=True)
+
+        # Check if file exists and handle permissions
+        if os.path.exists(pdf_location):
+            try:
+                os.remove(pdf_location)
+            except PermissionError:
+                import time
+
+                timestamp = int(time.time())
+                pdf_location = os.path.join(
+                    job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
+                )
+    else:
+        pdf_location = output
 
     doc = SimpleDocTemplate(
         pdf_location,
@@ -69,15 +76,15 @@ def generate_doc_template(name, job_data_location):
 
 # Define fonts - Using Times for very high ATS readability
 FONT_PATHS = {
-    "regular": os.path.join(config.RESOURCES_PATH, "fonts/TIMES.ttf"),
-    "bold": os.path.join(config.RESOURCES_PATH, "fonts/TIMESBD.ttf"),
-    "italic": os.path.join(config.RESOURCES_PATH, "fonts/TIMESI.ttf"),
+    "regular": os.path.join(config.RESOURCES_PATH, "fonts/TIMES.TTF"),
+    "bold": os.path.join(config.RESOURCES_PATH, "fonts/TIMESBD.TTF"),
+    "italic": os.path.join(config.RESOURCES_PATH, "fonts/TIMESI.TTF"),
 }
 
 FONT_NAMES = {
-    "regular": "FONT_ATS_Regular",
-    "bold": "FONT_ATS_Bold",
-    "italic": "FONT_ATS_Italic",
+    "regular": "TimesNewRoman",
+    "bold": "TimesNewRoman-Bold",
+    "italic": "TimesNewRoman-Italic",
 }
 
 # Template dimensions
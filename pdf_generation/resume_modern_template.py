@@ -18,19 +18,27 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_modern_resume_2"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """
     Generate and return a SimpleDocTemplate for a modern resum'w e PDF.
 
     Args:
         name (str): The name of the resume author.
         job_data_location (str): The path where the PDF will be saved.
+        output (BytesIO, optional): Write the PDF to this buffer instead of a file under `job_data_location`.
 
     Returns:
-        tuple: A tuple containing the document template for the resume PDF and the PDF location.
+        tuple: A tuple containing the document template for the resume PDF and the PDF location (`output` when given).
     """
-    author_name_formatted = name.replace(" ", "_") + "_modern_resume_2"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    else:
+        pdf_location = output
     doc = SimpleDocTemplate(
         pdf_location,
         pagesize=A4,
@@ -63,9 +71,9 @@ FONT_PATHS = {
     "italic": os.path.join(config.RESOURCES_PATH, "fonts/calibrii.ttf"),
 }
 FONT_NAMES = {
-    "regular": "FONT_Modern_Regular",
-    "bold": "FONT_Modern_Bold",
-    "italic": "FONT_Modern_Italic",
+    "regular": "Calibri",
+    "bold": "Calibri-Bold",
+    "italic": "Calibri-Italic",
 }
 
 sample_style_sheets = getSampleStyleSheet()
@@ -1,7 +1,11 @@
+import concurrent.futures
 import configparser
+import io
 import json
+import multiprocessing
 import os
 import random
+import threading
 import config
 import utils
 import subprocess
@@ -12,7 +16,6 @@ from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics, ttfonts
 from reportlab.platypus import (
     Paragraph,
     SimpleDocTemplate,
@@ -37,6 +40,8 @@ from . import (
     professional_template3,
     technical_expert_template,
 )
+from .font_registry import font_registry
+from .pdf_cache import pdf_cache
 
 
 class ResumePDFGenerator:
@@ -71,11 +76,11 @@ class ResumePDFGenerator:
     def _register_fonts(self):
         """
         Register fonts for use in the PDF.
+
+        Fonts are parsed once per process by the shared font registry, so
+        this is a lookup for every generator after the first.
         """
-        for style, path in self.template.FONT_PATHS.items():
-            pdfmetrics.registerFont(
-                ttfonts.TTFont(self.template.FONT_NAMES[style], path)
-            )
+        font_registry.register_template(self.template)
 
     def _append_section_table_style(self, table_styles, row_index):
         """
@@ -423,13 +428,63 @@ class ResumePDFGenerator:
             )
         return row_index
 
-    def generate_resume(self, job_data_location, data):
+    def generate_resume(self, job_data_location, data, output=None):
         """
         Generate a resume PDF from JSON data.
 
+        PDFs already rendered from the same data and template are served from
+        the rendered PDF cache instead of being laid out again. Renders into
+        `output` skip the cache, so that they never touch the disk.
+
+        Args:
+            job_data_location (str): The path where the PDF will be saved. Ignored with `output`.
+            data (dict): The JSON data containing resume information.
+            output (BytesIO, optional): Write the PDF to this buffer instead of a file.
+
+        Returns:
+            str: The location of the PDF, or `output` when given.
+        """
+        if output is not None or not config.PDF_CACHE_ENABLED:
+            return self._build_resume(job_data_location, data, output)
+
+        cache_key = pdf_cache.make_key(self.template_name, self.template, data)
+        pdf_location = os.path.join(job_data_location, self.pdf_filename(data["basic"]["name"]))
+        if pdf_cache.fetch(cache_key, pdf_location):
+            config.logger.info(f"Reusing rendered {self.template_name} PDF")
+            return pdf_location
+
+        pdf_location = self._build_resume(job_data_location, data)
+        pdf_cache.store(cache_key, pdf_location)
+        return pdf_location
+
+    def pdf_filename(self, name):
+        """
+        Return the file name the template gives the PDF of `name`.
+        """
+        return name.replace(" ", "_") + self.template.PDF_NAME_SUFFIX + ".pdf"
+
+    def render_to_bytes(self, data) -> bytes:
+        """
+        Render a resume PDF in memory, without writing any file.
+
+        Args:
+            data (dict): The JSON data containing resume information.
+
+        Returns:
+            bytes: The PDF.
+        """
+        output = io.BytesIO()
+        self.generate_resume(None, data, output=output)
+        return output.getvalue()
+
+    def _build_resume(self, job_data_location, data, output=None):
+        """
+        Lay out and write a resume PDF from JSON data.
+
         Args:
             job_data_location (str): The path where the PDF will be saved.
             data (dict): The JSON data containing resume information.
+            output (BytesIO, optional): Write the PDF to this buffer instead of a file.
         """
         email = data["basic"]["email"]
         name = data["basic"]["name"]
@@ -447,7 +502,9 @@ class ResumePDFGenerator:
 
         address = data["basic"]["address"]
         info += f" | {address}"
-        doc, pdf_location = self.template.generate_doc_template(name, job_data_location)
+        doc, pdf_location = self.template.generate_doc_template(
+            name, job_data_location, output=output
+        )
 
         if self.template_name == "modern" and hasattr(
             self.template, "build_modern_resume"
@@ -652,3 +709,98 @@ class ResumePDFGenerator:
             return self.generate_resume(
                 job_data_location, utils.read_yaml(filename=yaml_path)
             )
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the process pool used by `render_many`, starting it on first use.
+
+    The pool is started lazily inside the API process, which by then runs the
+    job queue, the LLM dispatcher and SQLite connections on other threads.
+    Forking it could copy a lock held by one of those threads into a worker
+    and deadlock it, so workers are forked from a clean forkserver process
+    that only imported this module (or spawned where forkserver is missing).
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                mp_context = multiprocessing.get_context("forkserver")
+                mp_context.set_forkserver_preload([__name__])
+            else:
+                mp_context = multiprocessing.get_context("spawn")
+            _render_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=config.PDF_RENDER_WORKERS,
+                mp_context=mp_context,
+                initializer=preload_fonts,
+            )
+        return _render_pool
+
+
+def preload_fonts():
+    """Register the fonts of every template so no render has to parse a font file."""
+    font_registry.preload(ResumePDFGenerator.TEMPLATES.values())
+
+
+def shutdown_render_pool():
+    """Stop the worker processes started by `render_many`."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown()
+            _render_pool = None
+
+
+def _render_template(template_name, job_data_location, data):
+    if job_data_location is None:
+        return ResumePDFGenerator(template_name).render_to_bytes(data)
+    return ResumePDFGenerator(template_name).generate_resume(job_data_location, data)
+
+
+def render_many(data, template_names, job_data_location=None):
+    """
+    Render the same resume with several templates at once.
+
+    ReportLab layout is CPU-bound, so each template is rendered in its own
+    worker process and the whole call takes about as long as the slowest
+    template. Each PDF is written to a subdirectory named after its template,
+    since several templates use the same file name, or without
+    `job_data_location` returned in memory.
+
+    Args:
+        data (dict): The JSON data containing resume information.
+        template_names (list): Names of templates in `ResumePDFGenerator.TEMPLATES`.
+        job_data_location (str, optional): The path under which the PDFs will be saved.
+
+    Returns:
+        dict: The location of the generated PDF for each template name, or
+            its bytes without `job_data_location`.
+    """
+    template_names = list(dict.fromkeys(template_names))
+    unknown = [t for t in template_names if t not in ResumePDFGenerator.TEMPLATES]
+    if unknown:
+        raise ValueError(f"Unknown templates: {', '.join(unknown)}")
+
+    locations = {}
+    for template_name in template_names:
+        if job_data_location is None:
+            locations[template_name] = None
+        else:
+            locations[template_name] = os.path.join(job_data_location, template_name)
+            os.makedirs(locations[template_name], exist_ok=True)
+
+    if len(template_names) == 1:
+        template_name = template_names[0]
+        return {template_name: _render_template(template_name, locations[template_name], data)}
+
+    render_pool = _get_render_pool()
+    futures = {
+        template_name: render_pool.submit(
+            _render_template, template_name, location, data
+        )
+        for template_name, location in locations.items()
+    }
+    return {template_name: future.result() for template_name, future in futures.items()}
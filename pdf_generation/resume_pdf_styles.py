@@ -9,19 +9,27 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """
     Generate and return a SimpleDocTemplate for the resume PDF.
 
     Args:
         name (str): The name of the resume author.
         job_data_location (str): The path where the PDF will be saved.
+        output (BytesIO, optional): Write the PDF to this buffer instead of a file under `job_data_location`.
 
     Returns:
-        tuple: A tuple containing the document template for the resume PDF and the PDF location.
+        tuple: A tuple containing the document template for the resume PDF and the PDF location (`output` when given).
     """
-    author_name_formatted = name.replace(" ", "_") + "_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+    else:
+        pdf_location = output
     doc = SimpleDocTemplate(
         pdf_location,
         pagesize=A4,
@@ -55,9 +63,9 @@ FONT_PATHS = {
     "italic": os.path.join(config.RESOURCES_PATH, "fonts/calibrii.ttf"),
 }
 FONT_NAMES = {
-    "regular": "FONT_Regular",
-    "bold": "FONT_Bold",
-    "italic": "FONT_Italic",
+    "regular": "Calibri",
+    "bold": "Calibri-Bold",
+    "italic": "Calibri-Italic",
 }
 
 sample_style_sheets = getSampleStyleSheet()
@@ -37,25 +37,32 @@ COLORS = {
 }
 
 
-def generate_doc_template(name, job_data_location):
+# Appended to the author name to form the file name of the PDF
+PDF_NAME_SUFFIX = "_technical_expert_resume"
+
+
+def generate_doc_template(name, job_data_location, output=None):
     """Generate and return a SimpleDocTemplate for a technical expert resume PDF."""
-    author_name_formatted = name.replace(" ", "_") + "_technical_expert_resume"
-    pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
-
-    # Create directory if it doesn't exist
-    os.makedirs(job_data_location, exist_ok=True)
-
-    # Check if file exists and handle permissions
-    if os.path.exists(pdf_location):
-        try:
-            os.remove(pdf_location)
-        except PermissionError:
-            import time
-
-            timestamp = int(time.time())
-            pdf_location = os.path.join(
-                job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
-            )
+    author_name_formatted = name.replace(" ", "_") + PDF_NAME_SUFFIX
+    if output is None:
+        pdf_location = os.path.join(job_data_location, f"{author_name_formatted}.pdf")
+
+        # Create directory if it doesn't exist
+        os.makedirs(job_data_location, exist_ok=True)
+
+        # Check if file exists and handle permissions
+        if os.path.exists(pdf_location):
+            try:
+                os.remove(pdf_location)
+            except PermissionError:
+                import time
+
+                timestamp = int(time.time())
+                pdf_location = os.path.join(
+                    job_data_location, f"{author_name_formatted}_{timestamp}.pdf"
+                )
+    else:
+        pdf_location = output
 
     doc = SimpleDocTemplate(
         pdf_location,
@@ -72,15 +79,15 @@ def generate_doc_template(name, job_data_location):
 
 # Define fonts - Using monospace fonts for technical feel
 FONT_PATHS = {
-    "regular": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLA.ttf"),
-    "bold": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLAB.ttf"),
-    "italic": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLAI.ttf"),
+    "regular": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLA.TTF"),
+    "bold": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLAB.TTF"),
+    "italic": os.path.join(config.RESOURCES_PATH, "fonts/CONSOLAI.TTF"),
 }
 
 FONT_NAMES = {
-    "regular": "FONT_Technical_Regular",
-    "bold": "FONT_Technical_Bold",
-    "italic": "FONT_Technical_Italic",
+    "regular": "Consolas",
+    "bold": "Consolas-Bold",
+    "italic": "Consolas-Italic",
 }
 
 # Template dimensions
@@ -1,5 +1,6 @@
 from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 from langchain.schema import HumanMessage, SystemMessage
+import threading
 import yaml
 import config
 
@@ -7,18 +8,33 @@ import config
 class Prompts:
     """
     A class to load and manage prompt templates and extractor descriptions from a YAML configuration file.
+
+    The YAML files are loaded once per process and every prompt is compiled into a
+    `ChatPromptTemplate` that chains can share, so importing the models or building
+    a chain never re-parses them.
     """
 
     lookup = None
     descriptions = None
+    chat_prompts = None
+    _lock = threading.Lock()
 
     @classmethod
-    def initialize(cls):
+    def initialize(cls, reload: bool = False):
         """
         Initialize the Prompts class by loading the YAML files and setting up the lookup dictionary.
+
+        Calls after the first are no-ops unless `reload` is set.
+
+        :param reload: Re-read the YAML files even if they were already loaded.
         """
-        cls.lookup = cls._load_prompts(config.PROMPTS_YAML)
-        cls.descriptions = cls._load_descriptions(config.DESCRIPTIONS_YAML)
+        with cls._lock:
+            if cls.lookup is not None and not reload:
+                return
+            lookup = cls._load_prompts(config.PROMPTS_YAML)
+            descriptions = cls._load_descriptions(config.DESCRIPTIONS_YAML)
+            chat_prompts = cls._compile_prompts(lookup)
+            cls.lookup, cls.descriptions, cls.chat_prompts = lookup, descriptions, chat_prompts
 
     @staticmethod
     def _load_prompts(yaml_path: str) -> dict:
@@ -49,6 +65,19 @@ class Prompts:
 
         return lookup
 
+    @staticmethod
+    def _compile_prompts(lookup: dict) -> dict:
+        """
+        Compile the message templates of every prompt type into a chat prompt.
+
+        :param lookup: The dictionary returned by `_load_prompts`.
+        :return: A dictionary with prompt types as keys and `ChatPromptTemplate` values.
+        """
+        return {
+            prompt_type: ChatPromptTemplate(messages=prompt_msgs)
+            for prompt_type, prompt_msgs in lookup.items()
+        }
+
     @staticmethod
     def _load_descriptions(yaml_path: str) -> dict:
         """
@@ -1,3 +1,7 @@
 from .resume_improver import *
 from .langchain_helpers import *
+from .fake_chat_model import *
 from .background_runner import *
+from .job_queue import *
+from .review import *
+from .llm_dispatcher import *
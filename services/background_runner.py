@@ -1,57 +1,252 @@
+import concurrent.futures
+import heapq
+import itertools
+import os
 import threading
 import time
+from typing import Callable, List, Optional
 from config import config
 import logging
 
+# Workers exit after this long without a task, so finished runners do not keep threads alive
+WORKER_IDLE_SECONDS = 30
+_logger_lock = threading.Lock()
+_current = threading.local()
+
+
+def current_task() -> Optional["BackgroundTask"]:
+    """Return the BackgroundTask running on this thread, if any.
+
+    Long tasks check `current_task().cancel_requested` between steps to stop
+    early when they are cancelled.
+    """
+    return getattr(_current, "task", None)
+
+
+class BackgroundTask:
+    """A function submitted to the BackgroundRunner.
+
+    `future` holds the result or the exception of the function.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, task_id: int, func: Callable, args: tuple, kwargs: dict, priority: int):
+        self.id = task_id
+        self.name = getattr(func, "__name__", repr(func))
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = concurrent.futures.Future()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+
+    def __lt__(self, other):
+        return (self.priority, self.id) < (other.priority, other.id)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> bool:
+        """Cancel the task.
+
+        A pending task never starts. A running task is asked to stop and ends
+        when it next checks `cancel_requested`.
+
+        Returns:
+            bool: False if the task had already finished.
+        """
+        if self.future.done():
+            return False
+        self._cancel_event.set()
+        self.future.cancel()
+        return True
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return BackgroundTask.CANCELLED
+        if not self.future.done():
+            return BackgroundTask.RUNNING if self.started_at else BackgroundTask.PENDING
+        if self.future.exception() is not None:
+            return BackgroundTask.FAILED
+        return BackgroundTask.CANCELLED if self.cancel_requested else BackgroundTask.COMPLETED
+
+    def result(self, timeout: float = None):
+        """Return the result of the function, or raise its exception."""
+        return self.future.result(timeout)
+
+    def to_dict(self) -> dict:
+        """Return the status and timings of the task."""
+        now = time.time()
+        exception = self.future.exception() if self.future.done() and not self.future.cancelled() else None
+        return dict(
+            id=self.id,
+            name=self.name,
+            priority=self.priority,
+            status=self.status,
+            queued_time=(self.started_at or self.finished_at or now) - self.submitted_at,
+            run_time=(self.finished_at or now) - self.started_at if self.started_at else None,
+            error=str(exception) if exception else None,
+        )
+
 
 class BackgroundRunner:
-    def __init__(self):
-        self.threads = []
+    """Run functions on a bounded pool of worker threads.
+
+    Tasks wait in a priority queue (lower `priority` runs first, then in
+    submission order), and at most `max_workers` threads are started however
+    many tasks are submitted.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or config.BACKGROUND_RUNNER_WORKERS
+        self.tasks: List[BackgroundTask] = []
         self.logger = self._create_logger()
+        self._queue = []
+        self._condition = threading.Condition()
+        self._workers = []
+        self._idle_workers = 0
+        self._task_ids = itertools.count()
+        self._shutdown = False
 
     def _create_logger(self):
-        """Creates a custom logger for the BackgroundRunner."""
+        """Return the BackgroundRunner logger, adding the task log file handler once per process."""
         logger = logging.getLogger(__name__)
-        handler = logging.FileHandler(config.BACKGROUND_TASKS_LOG)
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        with _logger_lock:
+            if not any(
+                isinstance(handler, logging.FileHandler)
+                and handler.baseFilename == os.path.abspath(config.BACKGROUND_TASKS_LOG)
+                for handler in logger.handlers
+            ):
+                handler = logging.FileHandler(config.BACKGROUND_TASKS_LOG)
+                formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+                handler.setFormatter(formatter)
+                logger.addHandler(handler)
         logger.setLevel(logging.INFO)
         return logger
 
-    def run_in_background(self, func, *args, **kwargs):
-        """Submits a function to be run in the background."""
-        self.logger.info(
-            f"Submitting task {func.__name__} with args {args} and kwargs {kwargs}"
-        )
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-        self.threads.append(thread)
-        thread.start()
-        self.logger.info("Task submitted.")
+    def run_in_background(self, func, *args, priority: int = 0, **kwargs) -> BackgroundTask:
+        """Queue `func(*args, **kwargs)` and return its task immediately.
+
+        Args:
+            func (Callable): The function to run.
+            priority (int, optional): Lower values run first. Defaults to 0.
+
+        Returns:
+            BackgroundTask: The queued task.
+        """
+        task = BackgroundTask(next(self._task_ids), func, args, kwargs, priority)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit tasks after shutdown")
+            self.tasks.append(task)
+            heapq.heappush(self._queue, task)
+            # Start another worker only when the idle ones cannot take every queued task
+            if len(self._queue) > self._idle_workers and len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._work, name=f"background-runner-{task.id}", daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify()
+        self.logger.info(f"Queued task {task.id} ({task.name}) with priority {priority}")
+        return task
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._idle_workers += 1
+                self._condition.wait_for(
+                    lambda: self._queue or self._shutdown, timeout=WORKER_IDLE_SECONDS
+                )
+                self._idle_workers -= 1
+                if not self._queue:
+                    self._workers.remove(threading.current_thread())
+                    return
+                task = heapq.heappop(self._queue)
+            self._run(task)
+
+    def _run(self, task: BackgroundTask):
+        if not task.future.set_running_or_notify_cancel():
+            self.logger.info(f"Task {task.id} ({task.name}) cancelled before it started")
+            return
+        task.started_at = time.time()
+        _current.task = task
+        try:
+            result = task.func(*task.args, **task.kwargs)
+        except Exception as e:
+            task.finished_at = time.time()
+            self.logger.error(f"Task {task.id} ({task.name}) failed: {e}")
+            task.future.set_exception(e)
+        else:
+            task.finished_at = time.time()
+            self.logger.info(
+                f"Task {task.id} ({task.name}) {'cancelled' if task.cancel_requested else 'completed'} "
+                f"in {task.finished_at - task.started_at:.2f}s"
+            )
+            task.future.set_result(result)
+        finally:
+            _current.task = None
 
     def check_status(self):
-        """Checks the status of the background tasks."""
-        if not self.threads:
+        """Checks the status of the background tasks.
+
+        Returns:
+            list: The status and timings of each task, or a message if none was submitted.
+        """
+        if not self.tasks:
             self.logger.info("No tasks submitted.")
             return "No tasks submitted."
 
-        statuses = []
-        for thread in self.threads:
-            if thread.is_alive():
-                self.logger.info("Task is running.")
-                statuses.append("Task is running.")
-            else:
-                self.logger.info("Task completed.")
-                statuses.append("Task completed.")
+        statuses = [task.to_dict() for task in self.tasks]
+        for status in statuses:
+            self.logger.info(
+                f"Task {status['id']} ({status['name']}) is {status['status']}, "
+                f"queued {status['queued_time']:.2f}s, ran {status['run_time'] or 0:.2f}s"
+            )
         return statuses
 
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for every submitted task to finish.
+
+        Returns:
+            bool: False if `timeout` seconds passed first.
+        """
+        _, not_done = concurrent.futures.wait(
+            [task.future for task in self.tasks], timeout=timeout
+        )
+        return not not_done
+
     def stop_all_tasks(self):
-        """Stops all running background tasks."""
+        """Cancel every task: pending tasks never start and running ones are asked to stop."""
         self.logger.info("Stopping all tasks.")
-        for thread in self.threads:
-            if thread.is_alive():
-                # Python does not provide a direct way to kill threads.
-                self.logger.warning(
-                    "Cannot directly stop threads. They will complete on their own."
-                )
-        self.logger.info("All tasks stopped.")
+        cancelled = sum(task.cancel() for task in self.tasks)
+        self.logger.info(f"Cancelled {cancelled} tasks.")
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Stop the workers once the queue is empty.
+
+        Args:
+            wait (bool, optional): Wait for the workers to exit. Defaults to True.
+            cancel_pending (bool, optional): Cancel the tasks that have not started. Defaults to False.
+        """
+        with self._condition:
+            self._shutdown = True
+            if cancel_pending:
+                for task in self._queue:
+                    task.cancel()
+            self._condition.notify_all()
+        if wait:
+            with self._condition:
+                workers = list(self._workers)
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import Field
+import config
+
+
+def _resolve_ref(json_schema: dict, definitions: dict) -> dict:
+    """Follow a `$ref` to its definition (pydantic v1 `definitions` or v2 `$defs`)."""
+    while "$ref" in json_schema:
+        json_schema = definitions[json_schema["$ref"].split("/")[-1]]
+    return json_schema
+
+
+def sample_value(json_schema: dict, definitions: dict, list_length: int, name: str = "value"):
+    """Build a value matching a JSON schema.
+
+    Args:
+        json_schema (dict): The schema of the value.
+        definitions (dict): Schemas referenced by `$ref`.
+        list_length (int): Number of items in every array.
+        name (str, optional): The field name, used as the text of strings.
+
+    Returns:
+        The sample value.
+    """
+    json_schema = _resolve_ref(json_schema, definitions)
+    if "enum" in json_schema:
+        return json_schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in json_schema:
+            options = [s for s in json_schema[key] if s.get("type") != "null"]
+            return sample_value(options[0], definitions, list_length, name)
+    schema_type = json_schema.get("type", "object")
+    if schema_type == "object":
+        return {
+            field: sample_value(field_schema, definitions, list_length, field)
+            for field, field_schema in json_schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [
+            sample_value(json_schema.get("items", {}), definitions, list_length, f"{name} {i + 1}")
+            for i in range(list_length)
+        ]
+    if schema_type == "boolean":
+        return False
+    if schema_type in ("integer", "number"):
+        return 1
+    return f"Sample {name.replace('_', ' ')}"
+
+
+def sample_structured_output(schema, list_length: int = 3):
+    """Build a schema-valid instance of a pydantic class (v1 or v2).
+
+    Args:
+        schema (type): The pydantic class.
+        list_length (int, optional): Number of items in every list. Defaults to 3.
+    """
+    if hasattr(schema, "model_json_schema"):
+        json_schema = schema.model_json_schema()
+        return schema.model_validate(
+            sample_value(json_schema, json_schema.get("$defs", {}), list_length)
+        )
+    json_schema = schema.schema()
+    return schema.parse_obj(
+        sample_value(json_schema, json_schema.get("definitions", {}), list_length)
+    )
+
+
+def _to_messages(prompt) -> List[BaseMessage]:
+    """Return the messages of a prompt value, or of plain text."""
+    if hasattr(prompt, "to_messages"):
+        return prompt.to_messages()
+    return [HumanMessage(content=str(prompt))]
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model returning schema-valid structured output.
+
+    Select it with `config.CHAT_MODEL = FakeChatModel` or
+    `llm_kwargs={"chat_model": FakeChatModel}` to run the whole pipeline
+    without network access or tokens, e.g. in tests and benchmarks. Every call
+    waits `latency` seconds to stand in for the API round trip. Settings meant
+    for real models (API key, base URL, ...) are accepted and ignored.
+    """
+
+    model_name: str = "fake"
+    temperature: float = 0.0
+    latency: float = Field(default_factory=lambda: config.FAKE_LLM_LATENCY_SECONDS)
+    list_length: int = 3
+    response: str = "OK"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-structured-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return dict(model_name=self.model_name, response=self.response)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    def with_structured_output(self, schema, **kwargs):
+        """Return a runnable producing a sample instance of `schema` for any input.
+
+        The "API call" still goes through `_generate`, so a rate limited
+        subclass dispatches it like a real model's.
+        """
+
+        def respond(prompt):
+            self._generate(_to_messages(prompt))
+            return sample_structured_output(schema, self.list_length)
+
+        async def arespond(prompt):
+            await self._agenerate(_to_messages(prompt))
+            return sample_structured_output(schema, self.list_length)
+
+        return RunnableLambda(respond, afunc=arespond)
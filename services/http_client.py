@@ -0,0 +1,39 @@
+import asyncio
+import weakref
+import aiohttp
+from config import config
+
+# One pooled session per event loop; aiohttp sessions cannot be shared across loops
+_sessions = weakref.WeakKeyDictionary()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the pooled HTTP session of the running event loop.
+
+    The session is created on first use and keeps connections alive, so
+    concurrent downloads share one bounded connection pool instead of opening
+    a new connection (and thread) each.
+
+    Returns:
+        aiohttp.ClientSession: The session bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config.HTTP_MAX_CONNECTIONS,
+            limit_per_host=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=config.HTTP_TIMEOUT_SECONDS),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_http_session():
+    """Close the pooled HTTP session of the running event loop, if any."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+import utils
+from config import config
+
+
+def hash_job_post(text: str) -> str:
+    """Return the content hash used to identify a job posting's text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class JobPostIndex:
+    """Index of parsed job postings so known postings are never re-extracted.
+
+    Each URL maps to the validators returned by the server (ETag and
+    Last-Modified), the hash of the posting text, the folder holding the
+    parsed `job.yaml` and when the posting was last checked. A second table
+    maps text hashes to the same folders so postings submitted as plain text,
+    or URLs whose text did not change, are reused too. The index is a SQLite
+    database in WAL mode shared by every process, and lookups never write.
+    """
+
+    JOB_FILENAME = "job.yaml"
+    TEXT_FILENAME = "job_post.txt"
+    HTML_FILENAME = "job_post.html"
+
+    def __init__(self, index_path: str = None, ttl_seconds: int = None):
+        self.index_path = index_path or config.JOB_INDEX_PATH
+        self.ttl_seconds = ttl_seconds or config.JOB_INDEX_TTL_SECONDS
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_post_urls (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    text_hash TEXT NOT NULL,
+                    job_data_location TEXT NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_post_texts (
+                    text_hash TEXT PRIMARY KEY,
+                    job_data_location TEXT NOT NULL
+                )
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup_url(self, url: str) -> Optional[dict]:
+        """Return the index entry for a URL if its parsed job is still on disk."""
+        row = self._connection().execute(
+            "SELECT etag, last_modified, text_hash, job_data_location, checked_at "
+            "FROM job_post_urls WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(
+            etag=row[0],
+            last_modified=row[1],
+            text_hash=row[2],
+            job_data_location=row[3],
+            checked_at=row[4],
+        )
+        if self._is_current(entry["job_data_location"], entry["text_hash"]):
+            return entry
+        return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Tell whether a URL entry was checked against the job board within `ttl_seconds`."""
+        return time.time() - entry["checked_at"] <= self.ttl_seconds
+
+    def lookup_text(self, text_hash: str) -> Optional[str]:
+        """Return the folder of a previously parsed posting with the same text."""
+        row = self._connection().execute(
+            "SELECT job_data_location FROM job_post_texts WHERE text_hash = ?", (text_hash,)
+        ).fetchone()
+        if row and self._is_current(row[0], text_hash):
+            return row[0]
+        return None
+
+    def record(
+        self,
+        job_data_location: str,
+        text_hash: str,
+        url: str = None,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        """Add or refresh the entries for a parsed posting.
+
+        A URL entry is marked as checked now, so only call this after the
+        posting was downloaded or revalidated.
+
+        Args:
+            job_data_location (str): The folder containing the parsed `job.yaml`.
+            text_hash (str): The hash of the posting text.
+            url (str, optional): The URL the posting was downloaded from.
+            etag (str, optional): The ETag header returned for the URL.
+            last_modified (str, optional): The Last-Modified header returned for the URL.
+        """
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_post_texts (text_hash, job_data_location) VALUES (?, ?)",
+                (text_hash, job_data_location),
+            )
+            if url:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_post_urls "
+                    "(url, etag, last_modified, text_hash, job_data_location, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, text_hash, job_data_location, time.time()),
+                )
+
+    def _is_current(self, job_data_location: str, text_hash: str) -> bool:
+        """Check the folder still holds the indexed posting.
+
+        Postings for the same company and title share a folder, so a later
+        posting may have overwritten the one the index points to.
+        """
+        text_path = os.path.join(job_data_location, self.TEXT_FILENAME)
+        if not os.path.exists(os.path.join(job_data_location, self.JOB_FILENAME)):
+            return False
+        if not os.path.exists(text_path):
+            return False
+        with open(text_path, "r") as stream:
+            return hash_job_post(stream.read()) == text_hash
+
+    def load(self, job_data_location: str) -> tuple:
+        """Load a stored posting.
+
+        Returns:
+            tuple: The parsed job dict, the raw posting text and the raw HTML (or None).
+        """
+        parsed_job = utils.read_yaml(
+            filename=os.path.join(job_data_location, self.JOB_FILENAME)
+        )
+        with open(os.path.join(job_data_location, self.TEXT_FILENAME), "r") as stream:
+            job_post_raw = stream.read()
+        try:
+            with open(os.path.join(job_data_location, self.HTML_FILENAME), "r") as stream:
+                job_post_html_data = stream.read()
+        except FileNotFoundError:
+            job_post_html_data = None
+        return parsed_job, job_post_raw, job_post_html_data
+
+    def save(
+        self,
+        job_data_location: str,
+        parsed_job: dict,
+        job_post_raw: str,
+        job_post_html_data: str = None,
+    ):
+        """Write a parsed posting and its source text to its folder.
+
+        Every file is replaced atomically, so a concurrent `load` never reads
+        a partial file. The text, which `_is_current` checks against the
+        index, is written last.
+        """
+        os.makedirs(job_data_location, exist_ok=True)
+        utils.write_yaml(
+            parsed_job, filename=os.path.join(job_data_location, self.JOB_FILENAME)
+        )
+        html_path = os.path.join(job_data_location, self.HTML_FILENAME)
+        if job_post_html_data is not None:
+            _write_text(html_path, job_post_html_data)
+        else:
+            try:
+                os.remove(html_path)
+            except FileNotFoundError:
+                pass
+        _write_text(os.path.join(job_data_location, self.TEXT_FILENAME), job_post_raw)
+
+
+def _write_text(filename: str, text: str):
+    """Replace a text file atomically, as `utils.write_yaml` does."""
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_filename, "w") as stream:
+            stream.write(text)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+job_post_index = JobPostIndex()
@@ -0,0 +1,326 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+from config import config
+from .review import ReviewGate
+
+
+class AwaitReview:
+    """Returned by a pipeline to hand its resume to manual review.
+
+    The queue releases the worker thread and runs `continuation(job)` on a
+    worker again once the review of `resume_location` is done.
+    """
+
+    def __init__(self, resume_location: str, continuation: Callable):
+        self.resume_location = resume_location
+        self.continuation = continuation
+
+
+class Job:
+    """A single tailoring request tracked by the JobQueue."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    AWAITING_REVIEW = "awaiting_review"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, params: dict = None):
+        self.id = uuid.uuid4().hex
+        self.params = params or {}
+        self.status = Job.QUEUED
+        self.stage = None
+        self.timings = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        # The tailored resume data and the PDFs (bytes) rendered from it, per template
+        self.resume_data = None
+        self.renders = {}
+        self._renders_lock = threading.Lock()
+        # The private directory of the job's files (a utils.Workspace), removed with the job
+        self.workspace = self.params.get("workspace")
+        self.events = []
+        self.listeners = []
+        self.review = ReviewGate()
+
+    def emit(self, event: str, **data):
+        """Record a progress event and pass it to every listener.
+
+        Args:
+            event (str): The event name (e.g. "fetched", "section_rewritten").
+            **data: JSON-serializable event payload, such as partial results.
+        """
+        event = dict(event=event, time=time.time() - self.created_at, **data)
+        self.events.append(event)
+        for listener in list(self.listeners):
+            listener(event)
+
+    def keep_render(self, template_name: str, pdf: bytes):
+        """Keep a rendered PDF with the job until it expires.
+
+        The oldest renders are dropped once they add up to more than
+        `JOB_RENDERS_MAX_BYTES`; the newest one is always kept.
+
+        Args:
+            template_name (str): The template the PDF was rendered with.
+            pdf (bytes): The PDF.
+        """
+        with self._renders_lock:
+            self.renders.pop(template_name, None)
+            self.renders[template_name] = pdf
+            total = sum(len(render) for render in self.renders.values())
+            for name in list(self.renders)[:-1]:
+                if total <= config.JOB_RENDERS_MAX_BYTES:
+                    break
+                total -= len(self.renders.pop(name))
+
+    @contextmanager
+    def track_stage(self, name: str):
+        """Record the wall-clock duration of a pipeline stage.
+
+        Args:
+            name (str): The name of the stage (e.g. "parse", "tailor", "render").
+        """
+        self.stage = name
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.time() - start
+
+    async def await_review(self, resume_location: str):
+        """Wait, without holding a thread, until the review of the tailored resume is done.
+
+        Args:
+            resume_location (str): The tailored resume YAML under review.
+        """
+        self.status = Job.AWAITING_REVIEW
+        self.emit("awaiting_review", resume_location=resume_location)
+        with self.track_stage("review"):
+            await self.review.wait_async(resume_location)
+        self.status = Job.RUNNING
+        self.emit("reviewed")
+
+    @property
+    def done(self) -> bool:
+        return self.status in (Job.COMPLETED, Job.FAILED, Job.CANCELLED)
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable summary of the job."""
+        total = None
+        if self.started_at is not None:
+            total = (self.finished_at or time.time()) - self.started_at
+        return dict(
+            id=self.id,
+            status=self.status,
+            stage=self.stage,
+            timings=dict(self.timings),
+            total_time=total,
+            queued_time=(self.started_at or time.time()) - self.created_at,
+            error=self.error,
+            events=list(self.events),
+        )
+
+
+class JobQueue:
+    """Run tailoring pipelines on a bounded pool of worker threads.
+
+    Jobs are submitted with `submit` and return immediately; callers poll
+    `get` for status and per-stage timings.
+    """
+
+    def __init__(self, max_workers: int = None, retention_seconds: int = None):
+        self.max_workers = max_workers or config.JOB_QUEUE_WORKERS
+        self.retention_seconds = retention_seconds or config.JOB_RETENTION_SECONDS
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="resume-job"
+        )
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def _add(self, params: dict) -> Job:
+        self._prune()
+        job = Job(params)
+        with self._lock:
+            self.jobs[job.id] = job
+        return job
+
+    def submit(self, pipeline: Callable, **params) -> Job:
+        """Queue `pipeline(job, **params)` and return the job immediately.
+
+        Args:
+            pipeline (Callable): The function that runs the job. It receives the Job as its first argument.
+            **params: Keyword arguments forwarded to the pipeline.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = self._add(params)
+        job.future = self.executor.submit(self._run, job, pipeline, params)
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        config.logger.info(f"Queued job {job.id}")
+        return job
+
+    def submit_async(self, pipeline: Callable, **params) -> Job:
+        """Run the coroutine `pipeline(job, **params)` on the running event loop.
+
+        The job is tracked like any other, and `job.future` is the asyncio
+        task, so it can be cancelled while in flight.
+
+        Args:
+            pipeline (Callable): The coroutine function that runs the job. It receives the Job as its first argument.
+            **params: Keyword arguments forwarded to the pipeline.
+
+        Returns:
+            Job: The scheduled job.
+        """
+        job = self._add(params)
+        job.future = asyncio.ensure_future(self._arun(job, pipeline, params))
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        config.logger.info(f"Scheduled job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job: Job, pipeline: Callable, params: dict):
+        job.status = Job.RUNNING
+        job.started_at = job.started_at or time.time()
+        try:
+            result = pipeline(job, **params)
+            if isinstance(result, AwaitReview):
+                self._await_review(job, result)
+                return None
+            job.result = result
+            job.status = Job.COMPLETED
+        except Exception as e:
+            config.logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = Job.FAILED
+        job.finished_at = time.time()
+        job.stage = None
+        return job.result
+
+    def _await_review(self, job: Job, request: AwaitReview):
+        """Park a job until its review is done, without holding a worker thread."""
+        job.status = Job.AWAITING_REVIEW
+        job.stage = "review"
+        job.emit("awaiting_review", resume_location=request.resume_location)
+        review_started_at = time.time()
+
+        def resume():
+            with self._lock:
+                if job.status != Job.AWAITING_REVIEW:
+                    return
+                job.status = Job.QUEUED
+            job.timings["review"] = time.time() - review_started_at
+            job.emit("reviewed")
+            job.future = self.executor.submit(self._run, job, request.continuation, {})
+            job.future.add_done_callback(lambda future: self._on_done(job, future))
+
+        job.review.watch(request.resume_location, resume)
+        config.logger.info(f"Job {job.id} is waiting for review")
+
+    def approve(self, job_id: str) -> bool:
+        """End the manual review of a job so it continues right away.
+
+        Returns:
+            bool: True if the job was waiting for review.
+        """
+        job = self.get(job_id)
+        if job is None or job.status != Job.AWAITING_REVIEW:
+            return False
+        job.review.approve()
+        return True
+
+    async def _arun(self, job: Job, pipeline: Callable, params: dict):
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await pipeline(job, **params)
+            job.status = Job.COMPLETED
+        except asyncio.CancelledError:
+            config.logger.info(f"Job {job.id} cancelled")
+            job.status = Job.CANCELLED
+            raise
+        except Exception as e:
+            config.logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = Job.FAILED
+        finally:
+            job.finished_at = time.time()
+            job.stage = None
+        return job.result
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not finished.
+
+        Jobs scheduled with `submit_async` can be cancelled at any point; jobs
+        on the worker threads only while they are queued or waiting for review.
+
+        Returns:
+            bool: True if the job was cancelled.
+        """
+        job = self.get(job_id)
+        if job is None or job.done or job.future is None:
+            return False
+        if job.future.done():
+            # A worker-thread job parked for review
+            with self._lock:
+                if job.status != Job.AWAITING_REVIEW:
+                    return False
+                job.status = Job.CANCELLED
+            job.review.close()
+            job.finished_at = time.time()
+            job.stage = None
+            return True
+        return job.future.cancel()
+
+    @staticmethod
+    def _on_done(job: Job, future):
+        # Jobs cancelled before they started never reach `_run` / `_arun`
+        if future.cancelled() and not job.done:
+            job.status = Job.CANCELLED
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window and remove their workspaces."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job
+                for job in self.jobs.values()
+                if job.done and job.finished_at < cutoff
+            ]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            if job.workspace is not None:
+                job.workspace.cleanup()
+
+    async def prune_periodically(self, interval_seconds: float = None):
+        """Forget expired jobs every `interval_seconds`, until cancelled.
+
+        Jobs are otherwise only pruned when a new one is added, so an idle API
+        would keep the renders and workspaces of finished jobs indefinitely.
+        """
+        interval_seconds = interval_seconds or config.JOB_PRUNE_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self._prune)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self.executor.shutdown(wait=wait)
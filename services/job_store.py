@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from config import config
+
+
+class JobStore:
+    """SQLite record of background tailoring jobs and the stages they finished.
+
+    Each job of a batch is stored with its config, its status and the output
+    location of every finished stage, so a batch interrupted by a crash or a
+    redeploy can be run again: finished jobs are skipped and the others resume
+    after their last finished stage. Each stage also stores a fingerprint of
+    its inputs and output, so a stage is only restored while they are
+    unchanged. The database runs in WAL mode and can be shared by several
+    processes.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, database_path: str = None):
+        self.database_path = database_path or config.JOB_STORE_PATH
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    config TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_batch_id ON jobs (batch_id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    output_location TEXT,
+                    duration REAL,
+                    completed_at REAL NOT NULL,
+                    fingerprint TEXT,
+                    PRIMARY KEY (job_id, stage)
+                )
+                """
+            )
+            # Databases written before stages were fingerprinted
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(job_stages)")]
+            if "fingerprint" not in columns:
+                conn.execute("ALTER TABLE job_stages ADD COLUMN fingerprint TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_batch_id(job_configs: List[dict]) -> str:
+        """Build the id of a batch from its configs, so re-running a batch finds its jobs."""
+        return hashlib.sha256(
+            json.dumps(job_configs, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+
+    def add_job(self, batch_id: str, position: int, job_config: dict) -> dict:
+        """Record a job of a batch, keeping the existing record if it was added before.
+
+        Args:
+            batch_id (str): The id of the batch.
+            position (int): The position of the job in the batch.
+            job_config (dict): The JSON-serializable config of the job.
+
+        Returns:
+            dict: The job record, see `get_job`.
+        """
+        job_id = f"{batch_id}:{position}"
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(id, batch_id, position, config, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, batch_id, position, json.dumps(job_config, default=str), JobStore.PENDING, now, now),
+            )
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Return a job record with the output location of each finished stage.
+
+        Returns:
+            dict: `id`, `batch_id`, `position`, `config`, `status`, `error`,
+                `stages` (stage name -> output location) and `fingerprints`
+                (stage name -> fingerprint), or None if unknown.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, batch_id, position, config, status, error FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        stages = conn.execute(
+            "SELECT stage, output_location, fingerprint FROM job_stages "
+            "WHERE job_id = ? ORDER BY completed_at",
+            (job_id,),
+        ).fetchall()
+        return dict(
+            id=row[0],
+            batch_id=row[1],
+            position=row[2],
+            config=json.loads(row[3]),
+            status=row[4],
+            error=row[5],
+            stages={stage: output_location for stage, output_location, _ in stages},
+            fingerprints={stage: fingerprint for stage, _, fingerprint in stages},
+        )
+
+    def batch_jobs(self, batch_id: str) -> List[dict]:
+        """Return the job records of a batch in submission order."""
+        job_ids = self._connection().execute(
+            "SELECT id FROM jobs WHERE batch_id = ? ORDER BY position", (batch_id,)
+        ).fetchall()
+        return [self.get_job(job_id) for (job_id,) in job_ids]
+
+    def set_status(self, job_id: str, status: str, error: str = None):
+        """Update the status of a job (and its error message for failed jobs)."""
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    def complete_stage(
+        self,
+        job_id: str,
+        stage: str,
+        output_location: str = None,
+        duration: float = None,
+        fingerprint: str = None,
+    ):
+        """Record that a job finished a stage, where its output was written and the fingerprint of its inputs."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_stages "
+                "(job_id, stage, output_location, duration, completed_at, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, stage, output_location, duration, now, fingerprint),
+            )
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
@@ -1,23 +1,215 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
+import threading
 from typing import List
 from dateutil import parser as dateparser
 from dateutil.relativedelta import relativedelta
 from langchain_openai import ChatOpenAI
-import langchain
 from langchain_community.cache import InMemoryCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda
 import config
 import utils
+from . import llm_dispatcher
+from .llm_cache import PersistentLLMCache
 
-# Set up LLM cache
-langchain.llm_cache = InMemoryCache()
+# Set up LLM cache, persisted on disk so repeat calls are shared across requests and processes
+if config.LLM_CACHE_ENABLED:
+    set_llm_cache(PersistentLLMCache())
+else:
+    set_llm_cache(InMemoryCache())
+
+
+# Pooled LLM instances, least recently used first
+_llm_pool = OrderedDict()
+_llm_pool_lock = threading.Lock()
+
+
+def _running_loop():
+    """Return the running event loop, or None outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _drop_closed_loops(pool: OrderedDict):
+    """Remove the entries of a pool keyed by event loop whose loop was closed. Call with its lock held."""
+    for key in [key for key in pool if key[1] is not None and key[1].is_closed()]:
+        del pool[key]
 
 
 def create_llm(**kwargs):
-    """Create an LLM instance with specified parameters."""
-    chat_model = kwargs.pop("chat_model", ChatOpenAI)
+    """Create an LLM instance with specified parameters.
+
+    Instances are pooled per chat model class and settings (model name,
+    temperature, API key, ...), so every call with the same settings shares one
+    client and its keep-alive HTTP connections instead of opening new ones.
+    The async HTTP client of an instance is bound to the event loop it was
+    first used on, so instances created inside an event loop are only shared
+    within that loop and dropped once it is closed. Settings that cannot be
+    hashed always get a new instance. With
+    `LLM_DISPATCHER_ENABLED` the LLM is `rate_limited`, and OpenAI clients do
+    not retry on their own, since the dispatcher retries rate limited calls.
+    """
+    chat_model = kwargs.pop("chat_model", config.CHAT_MODEL)
     kwargs.setdefault("model_name", config.MODEL_NAME)
-    kwargs.setdefault("cache", False)
-    return chat_model(**kwargs)
+    kwargs.setdefault("cache", config.LLM_CACHE_ENABLED)
+    if config.LLM_DISPATCHER_ENABLED:
+        if issubclass(chat_model, ChatOpenAI):
+            kwargs.setdefault("max_retries", 0)
+        chat_model = rate_limited(chat_model)
+    try:
+        key = (chat_model, _running_loop(), tuple(sorted(kwargs.items())))
+        hash(key)
+    except TypeError:
+        return chat_model(**kwargs)
+    with _llm_pool_lock:
+        llm = _llm_pool.get(key)
+        if llm is not None:
+            _llm_pool.move_to_end(key)
+            return llm
+    llm = chat_model(**kwargs)
+    with _llm_pool_lock:
+        _drop_closed_loops(_llm_pool)
+        # Another thread may have created the same instance meanwhile
+        llm = _llm_pool.setdefault(key, llm)
+        _llm_pool.move_to_end(key)
+        while len(_llm_pool) > config.LLM_POOL_SIZE:
+            _llm_pool.popitem(last=False)
+    return llm
+
+
+# Rate limited subclass of each chat model class
+_rate_limited_models = {}
+_rate_limited_models_lock = threading.Lock()
+
+
+def rate_limited(chat_model: type) -> type:
+    """Return a subclass of `chat_model` whose provider calls go through the shared `llm_dispatcher`.
+
+    The dispatcher queues each call by priority, keeps it within the
+    requests-per-minute and tokens-per-minute budgets and retries it when the
+    provider answers with a rate limit error. Only `_generate` and
+    `_agenerate` are dispatched, which LangChain calls once the LLM cache
+    missed, so cached responses are returned right away without waiting for
+    (or spending) the budgets.
+
+    Args:
+        chat_model (type): A `BaseChatModel` subclass.
+
+    Returns:
+        type: The subclass. It keeps the class name, so LLM cache keys are unchanged.
+    """
+    with _rate_limited_models_lock:
+        subclass = _rate_limited_models.get(chat_model)
+        if subclass is not None:
+            return subclass
+
+        def _generate(self, messages, *args, **kwargs):
+            return llm_dispatcher.dispatcher.call(
+                lambda: chat_model._generate(self, messages, *args, **kwargs), messages
+            )
+
+        methods = dict(_generate=_generate, __module__=chat_model.__module__)
+        # Models without a native async call run `_generate` on a thread, which is dispatched already
+        if chat_model._agenerate is not BaseChatModel._agenerate:
+
+            async def _agenerate(self, messages, *args, **kwargs):
+                return await llm_dispatcher.dispatcher.acall(
+                    lambda: chat_model._agenerate(self, messages, *args, **kwargs), messages
+                )
+
+            methods["_agenerate"] = _agenerate
+        subclass = _rate_limited_models[chat_model] = type(
+            chat_model.__name__, (chat_model,), methods
+        )
+        return subclass
+
+
+# Compiled prompt | structured-output LLM runnables, least recently used last
+_structured_chains = OrderedDict()
+_structured_chains_lock = threading.Lock()
+
+
+def create_structured_chain(prompt, schema, **llm_kwargs):
+    """Return `prompt | llm.with_structured_output(schema)`, reusing a cached runnable.
+
+    Runnables are cached per prompt object, schema, LLM settings and event
+    loop (like the LLMs of `create_llm`), so chains built from the compiled
+    prompts in `Prompts.chat_prompts` are only assembled once. Settings that
+    cannot be hashed are built without caching. The LLM of the chain comes
+    from `create_llm`, so its calls go through the LLM dispatcher.
+
+    Args:
+        prompt (ChatPromptTemplate): A compiled prompt that lives for the whole process.
+        schema (type): The pydantic class of the structured output.
+        **llm_kwargs: Keyword arguments for `create_llm`.
+
+    Returns:
+        Runnable: The chain.
+    """
+    try:
+        key = (id(prompt), _running_loop(), schema, tuple(sorted(llm_kwargs.items())))
+        hash(key)
+    except TypeError:
+        key = None
+    if key is not None:
+        with _structured_chains_lock:
+            cached = _structured_chains.get(key)
+            if cached is not None and cached[0] is prompt:
+                _structured_chains.move_to_end(key)
+                return cached[1]
+    chain = prompt | create_llm(**llm_kwargs).with_structured_output(schema=schema)
+    if key is not None:
+        with _structured_chains_lock:
+            _drop_closed_loops(_structured_chains)
+            _structured_chains[key] = (prompt, chain)
+            while len(_structured_chains) > config.CHAIN_CACHE_SIZE:
+                _structured_chains.popitem(last=False)
+    return chain
+
+
+async def _ainvoke_chain(call):
+    chain, chain_inputs = call
+    return await chain.ainvoke(chain_inputs)
+
+
+# Invokes the (chain, inputs) pair it receives, so calls to different chains can share one batch
+_chain_dispatcher = RunnableLambda(
+    lambda call: call[0].invoke(call[1]), afunc=_ainvoke_chain
+)
+
+
+def batch_chains_as_completed(calls: list, max_concurrency: int = None):
+    """Invoke several chains concurrently, yielding each output as soon as it is ready.
+
+    Args:
+        calls (list): (chain, inputs) pairs.
+        max_concurrency (int, optional): Maximum calls in flight. Defaults to `config.MAX_CONCURRENT_WORKERS`.
+
+    Yields:
+        tuple: The index of the call in `calls` and its output.
+    """
+    if not calls:
+        return
+    yield from _chain_dispatcher.batch_as_completed(
+        list(calls),
+        config={"max_concurrency": max_concurrency or config.MAX_CONCURRENT_WORKERS},
+    )
+
+
+async def abatch_chains_as_completed(calls: list, max_concurrency: int = None):
+    """Async version of `batch_chains_as_completed`."""
+    if not calls:
+        return
+    async for index, output in _chain_dispatcher.abatch_as_completed(
+        list(calls),
+        config={"max_concurrency": max_concurrency or config.MAX_CONCURRENT_WORKERS},
+    ):
+        yield index, output
 
 
 def format_list_as_string(lst: list, list_sep: str = "\n- ") -> str:
@@ -40,7 +232,6 @@ def parse_date(date_str: str) -> datetime:
     try:
         return dateparser.parse(str(date_str), default=default_date)
     except dateparser._parser.ParserError as e:
-        langchain.llm_cache.clear()
         config.logger.error(f"Date input `{date_str}` could not be parsed.")
         raise e
 
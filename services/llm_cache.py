@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from config import config
+
+
+class PersistentLLMCache(BaseCache):
+    """SQLite-backed LLM response cache shared by every process using the same file.
+
+    Entries are keyed by a hash of the LLM configuration string (model name,
+    temperature and the structured-output schema bound to the call) and a hash
+    of the rendered prompt, so identical calls cost zero tokens on repeat.
+    Entries older than `ttl_seconds` are dropped and the least recently used
+    entries are evicted once `max_entries` or `max_bytes` is exceeded.
+    """
+
+    def __init__(
+        self,
+        database_path: str = None,
+        max_entries: int = None,
+        max_bytes: int = None,
+        ttl_seconds: int = None,
+    ):
+        self.database_path = database_path or config.LLM_CACHE_PATH
+        self.max_entries = max_entries or config.LLM_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.LLM_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or config.LLM_CACHE_TTL_SECONDS
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Build the content-addressed key for a prompt and LLM configuration."""
+        llm_hash = hashlib.sha256(llm_string.encode()).hexdigest()
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        return f"{llm_hash}:{prompt_hash}"
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up cached generations for the prompt and LLM configuration."""
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count(hit=False)
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        try:
+            generations = [loads(generation) for generation in json.loads(row[0])]
+        except Exception as e:
+            config.logger.warning(f"Discarding unreadable LLM cache entry: {e}")
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store generations for the prompt and LLM configuration."""
+        key = self.make_key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones over the limits."""
+        conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        count, total_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            count -= 1
+            total_size -= size
+            evicted += 1
+        config.logger.info(f"Evicted {evicted} entries from the LLM cache")
+
+    def clear(self, **kwargs) -> None:
+        """Remove every cached entry."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for this process and the size of the cache."""
+        with self._connection() as conn:
+            entries, total_size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return dict(
+            hits=hits,
+            misses=misses,
+            hit_rate=hits / lookups if lookups else 0.0,
+            entries=entries,
+            size_bytes=total_size,
+        )
@@ -0,0 +1,322 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from config import config
+from .prompt_compaction import count_tokens
+
+# Priorities of LLM calls, lower values are dispatched first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """Dispatch the LLM calls made inside the block (and the threads or tasks it starts) at `level`.
+
+    Example:
+        with llm_dispatcher.priority(llm_dispatcher.BACKGROUND):
+            improver.create_draft_tailored_resume()
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def rate_limit_retry_after(error: Exception):
+    """Return how long the provider asked to wait after a rate limit error.
+
+    Returns:
+        float: The Retry-After delay in seconds, 0.0 if the error is a rate
+            limit without one, or None if the error is not a rate limit.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429 and type(error).__name__ != "RateLimitError":
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        return float(headers.get("retry-after") or 0.0)
+    except (TypeError, ValueError):  # An HTTP date instead of seconds
+        return 0.0
+
+
+class _TokenBucket:
+    """Refill `per_minute` units evenly over a minute, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.available = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.capacity:
+            self.available = min(
+                self.capacity, self.available + (now - self.updated_at) * self.capacity / 60
+            )
+        self.updated_at = now
+
+    def delay(self, amount: int, now: float) -> float:
+        """Seconds until `amount` units are available (0 for an unlimited bucket)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing * 60 / self.capacity)
+
+    def take(self, amount: int):
+        if self.capacity:
+            self.available -= min(amount, self.capacity)
+
+
+class _Waiter:
+    def __init__(self, level: int, seq: int, tokens: int, loop=None):
+        self.level = level
+        self.seq = seq
+        self.tokens = tokens
+        self.granted = False
+        self.loop = loop
+        self.event = asyncio.Event() if loop else threading.Event()
+
+    def __lt__(self, other):
+        return (self.level, self.seq) < (other.level, other.seq)
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class LLMDispatcher:
+    """Admit LLM calls within the provider's rate limits.
+
+    Calls wait in a priority queue (interactive before background, then in
+    arrival order) and are admitted while the requests-per-minute and
+    tokens-per-minute budgets allow and fewer than `concurrency_limit` calls
+    are in flight. A rate limit error (HTTP 429) pauses every call for its
+    Retry-After delay and halves the concurrency limit, which then grows back
+    by one for every `concurrency_limit` successful calls. The call is retried
+    up to `LLM_RATE_LIMIT_RETRIES` times.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_concurrency: int = None,
+    ):
+        self._requests = _TokenBucket(
+            config.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        )
+        self._tokens = _TokenBucket(
+            config.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        )
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.concurrency_limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        self._queue = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(inputs) -> int:
+        """Estimate the tokens a call spends: its inputs plus `LLM_ESTIMATED_OUTPUT_TOKENS`."""
+        if isinstance(inputs, dict):
+            inputs = "\n".join(str(value) for value in inputs.values())
+        elif isinstance(inputs, list):  # Chat messages
+            inputs = "\n".join(str(getattr(message, "content", message)) for message in inputs)
+        return count_tokens(str(inputs)) + config.LLM_ESTIMATED_OUTPUT_TOKENS
+
+    def _dispatch_locked(self, current: _Waiter = None):
+        """Admit queued calls while the limits allow, waking every waiter but `current`.
+
+        Returns:
+            float: Seconds until the first queued call may be admitted, or None
+                if it waits for a call in flight to finish (or nothing is queued).
+        """
+        now = time.monotonic()
+        delay = None
+        while self._queue and self.in_flight < int(self.concurrency_limit):
+            waiter = self._queue[0]
+            delay = max(
+                self._paused_until - now,
+                self._requests.delay(1, now),
+                self._tokens.delay(waiter.tokens, now),
+            )
+            if delay > 0:
+                # The head of the queue sleeps until then
+                if waiter is not current:
+                    waiter.wake()
+                return delay
+            heapq.heappop(self._queue)
+            self._requests.take(1)
+            self._tokens.take(waiter.tokens)
+            self.in_flight += 1
+            waiter.granted = True
+            if waiter is not current:
+                waiter.wake()
+        return None
+
+    def _enqueue(self, tokens: int, loop=None) -> _Waiter:
+        waiter = _Waiter(_priority.get(), next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _acquire(self, tokens: int):
+        waiter = self._enqueue(tokens)
+        while True:
+            with self._lock:
+                waiter.event.clear()
+                delay = self._dispatch_locked(waiter)
+                if waiter.granted:
+                    return
+            waiter.event.wait(delay)
+
+    async def _aacquire(self, tokens: int):
+        waiter = self._enqueue(tokens, asyncio.get_running_loop())
+        try:
+            while True:
+                with self._lock:
+                    waiter.event.clear()
+                    delay = self._dispatch_locked(waiter)
+                    if waiter.granted:
+                        return
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                else:
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                self._dispatch_locked()
+            raise
+
+    def _release(self, retry_after: float = None):
+        """Finish a call, adapting the concurrency limit to whether it was rate limited."""
+        with self._lock:
+            self.in_flight -= 1
+            if retry_after is None:
+                self.concurrency_limit = min(
+                    self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit
+                )
+            else:
+                self.rate_limited += 1
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._dispatch_locked()
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Release the slot of a failed call and tell whether it is retried.
+
+        A rate limited call pauses the dispatcher for the Retry-After delay, or
+        for an exponential backoff when the provider did not send one.
+        """
+        retry_after = rate_limit_retry_after(error)
+        if retry_after is not None:
+            retry_after = retry_after or config.LLM_RATE_LIMIT_BACKOFF_SECONDS * 2**attempt
+        self._release(retry_after)
+        if retry_after is None or attempt >= config.LLM_RATE_LIMIT_RETRIES:
+            return False
+        config.logger.warning(f"LLM call rate limited, retrying in {retry_after:.1f}s: {error}")
+        return True
+
+    def call(self, func, inputs):
+        """Call `func()` once the limits allow, retrying it when it is rate limited.
+
+        Args:
+            func (Callable): Makes the provider call.
+            inputs: What is sent to the provider, to estimate the tokens of the call.
+
+        Returns:
+            The return value of `func`.
+        """
+        tokens = self.estimate_tokens(inputs)
+        for attempt in itertools.count():
+            self._acquire(tokens)
+            try:
+                output = func()
+            except Exception as e:
+                if self._should_retry(e, attempt):
+                    continue
+                raise
+            except BaseException:
+                self._release()
+                raise
+            self._release()
+            return output
+
+    async def acall(self, make_coroutine, inputs):
+        """Async version of `call`: awaits `make_coroutine()`. No thread is held while waiting."""
+        tokens = self.estimate_tokens(inputs)
+        for attempt in itertools.count():
+            await self._aacquire(tokens)
+            try:
+                output = await make_coroutine()
+            except Exception as e:
+                if self._should_retry(e, attempt):
+                    continue
+                raise
+            except BaseException:
+                self._release()
+                raise
+            self._release()
+            return output
+
+    def invoke(self, runnable, inputs, run_config=None):
+        """Invoke a runnable once the limits allow, retrying it when it is rate limited.
+
+        Args:
+            runnable (Runnable): The chain or LLM to invoke.
+            inputs: The inputs of the runnable.
+            run_config (RunnableConfig, optional): Passed on to the runnable, e.g. with callbacks.
+
+        Returns:
+            The output of the runnable.
+        """
+        return self.call(lambda: runnable.invoke(inputs, run_config), inputs)
+
+    async def ainvoke(self, runnable, inputs, run_config=None):
+        """Async version of `invoke`. No thread is held while waiting."""
+        return await self.acall(lambda: runnable.ainvoke(inputs, run_config), inputs)
+
+    def stats(self) -> dict:
+        """Return the queue depth per priority and the current limits."""
+        with self._lock:
+            now = time.monotonic()
+            # Bring both buckets up to date before reporting them
+            self._requests.delay(0, now)
+            self._tokens.delay(0, now)
+            queued = [waiter.level for waiter in self._queue]
+            return dict(
+                queued=len(queued),
+                queued_interactive=queued.count(INTERACTIVE),
+                queued_background=queued.count(BACKGROUND),
+                in_flight=self.in_flight,
+                concurrency_limit=int(self.concurrency_limit),
+                max_concurrency=self.max_concurrency,
+                paused_seconds=max(0.0, self._paused_until - now),
+                rate_limited=self.rate_limited,
+                requests_available=int(self._requests.available) if self._requests.capacity else None,
+                tokens_available=int(self._tokens.available) if self._tokens.capacity else None,
+            )
+
+
+# Shared by every LLM call of the process
+dispatcher = LLMDispatcher()
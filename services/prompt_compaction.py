@@ -0,0 +1,128 @@
+import functools
+import re
+from bs4 import BeautifulSoup
+import config
+
+# Page furniture that never describes the job
+BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "footer", "aside", "iframe", "svg")
+BOILERPLATE_ATTRIBUTE = re.compile(r"cookie|consent|gdpr|newsletter|breadcrumb", re.IGNORECASE)
+BOILERPLATE_SENTENCE = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|©|skip to (main )?content"
+    r"|sign in|log in|create (an )?account|share (this|on)|similar jobs|back to (search|jobs)",
+    re.IGNORECASE,
+)
+SENTENCE_END = re.compile(r"(?<=[.!?;])\s+|\s+(?=[•·▪])|\n+")
+WORD = re.compile(r"[a-z0-9+#]+")
+# Share of a sentence's words found in one parsed job field for it to count as a duplicate
+DUPLICATE_COVERAGE = 0.8
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model_name: str):
+    """Return the local tokenizer for a model, or None if tiktoken cannot provide one."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        config.logger.warning(
+            f"No local tokenizer for {model_name}, estimating tokens from characters: {e}"
+        )
+        return None
+
+
+def count_tokens(text: str, model_name: str = None) -> int:
+    """Count the tokens of a text with the model's tokenizer.
+
+    Falls back to an estimate of four characters per token when tiktoken or its
+    encoding files are not available.
+    """
+    encoding = _encoding(model_name or config.MODEL_NAME)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def extract_job_post_text(html: str) -> str:
+    """Extract the text of a job post page without navigation, footers and cookie banners."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(
+        lambda tag: tag.attrs is not None
+        and BOILERPLATE_ATTRIBUTE.search(
+            " ".join([tag.get("id") or ""] + list(tag.get("class") or []))
+        )
+    ):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+def _words(text: str) -> set:
+    return set(WORD.findall(text.lower()))
+
+
+def _parsed_job_fields(parsed_job: dict) -> list:
+    """Return the word sets of every value in the parsed job."""
+    fields = []
+    for value in (parsed_job or {}).values():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, str) and item:
+                fields.append(_words(item))
+    return fields
+
+
+def format_parsed_job(parsed_job: dict) -> str:
+    """Format the parsed job as compact `key: value` lines, leaving out empty fields."""
+    lines = []
+    for key, value in (parsed_job or {}).items():
+        if value in (None, "", []):
+            continue
+        if isinstance(value, list):
+            value = "; ".join(str(item) for item in value)
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+
+def compact_job_post(job_post_raw: str, parsed_job: dict, max_tokens: int) -> str:
+    """Shrink the job post text that accompanies the parsed job in a prompt.
+
+    Boilerplate sentences (cookie notices, sign-in links, ...) and repeated
+    sentences are dropped, as are sentences already captured by a field of
+    `parsed_job`. The remaining sentences are kept in order until `max_tokens`
+    is reached.
+
+    Args:
+        job_post_raw (str): The text of the job post.
+        parsed_job (dict): The job extracted from the text.
+        max_tokens (int): The token budget of the returned text.
+
+    Returns:
+        str: The compacted text.
+    """
+    fields = _parsed_job_fields(parsed_job)
+    seen = set()
+    kept = []
+    used_tokens = 0
+    for sentence in SENTENCE_END.split(job_post_raw or ""):
+        sentence = sentence.strip()
+        words = _words(sentence)
+        if not words or BOILERPLATE_SENTENCE.search(sentence):
+            continue
+        key = " ".join(sorted(words))
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(words) >= 4 and any(
+            len(words & field) >= DUPLICATE_COVERAGE * len(words) for field in fields
+        ):
+            continue
+        tokens = count_tokens(sentence) + 1
+        if used_tokens + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used_tokens += tokens
+    return " ".join(kept)
@@ -0,0 +1,46 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from config import config
+
+
+def _body_too_large(max_bytes: int) -> dict:
+    return {"detail": f"Request body exceeds the limit of {max_bytes} bytes"}
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies larger than `max_bytes` while they arrive.
+
+    Starlette's form parser reads the whole multipart body into a spool file
+    before the endpoint runs, so the endpoint cannot stop an oversized upload.
+    This ASGI middleware answers 413 right away when the declared
+    Content-Length is over the limit and, for chunked bodies, stops reading as
+    soon as more than `max_bytes` were received.
+    """
+
+    def __init__(self, app, max_bytes: int = None):
+        self.app = app
+        self.max_bytes = max_bytes or config.MAX_REQUEST_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(_body_too_large(self.max_bytes), status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside the form parser; FastAPI passes HTTPExceptions through as responses
+                    raise HTTPException(status_code=413, detail=_body_too_large(self.max_bytes)["detail"])
+            return message
+
+        await self.app(scope, limited_receive, send)
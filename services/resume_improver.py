@@ -1,15 +1,21 @@
+import copy
+import hashlib
+import json
 import os
 import time
+import asyncio
 import subprocess
 from datetime import datetime
 from typing import List, Optional
 from bs4 import BeautifulSoup
 import uuid
 import requests
+import aiohttp
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableSequence
 from langchain_core.output_parsers import StrOutputParser
 from models.resume import (
+    BatchResumeOutput,
     ResumeImproverOutput,
     ResumeSkillsMatcherOutput,
     ResumeSummarizerOutput,
@@ -21,33 +27,69 @@ from .langchain_helpers import *
 from prompts import Prompts
 from models.job_post import JobPost
 from pdf_generation import ResumePDFGenerator
-import concurrent.futures
+import threading
 from fp.fp import FreeProxy
 import time
 from config import config
-from .background_runner import BackgroundRunner
+from .background_runner import BackgroundRunner, current_task
+from .job_store import JobStore
+from . import llm_dispatcher
+from .review import ReviewGate
+from .job_index import job_post_index, hash_job_post
+from .single_flight import shared_stages
+from .http_client import get_http_session
+from .prompt_compaction import (
+    compact_job_post,
+    count_tokens,
+    extract_job_post_text,
+    format_parsed_job,
+)
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+
+# Tailored sections stored in the job data folder for reuse by later submissions
+TAILORED_SECTIONS_FILENAME = "tailored_sections.yaml"
 
 
 class ResumeImprover:
 
+    # Compiled by `_create_combined_prompt` on first use
+    _combined_prompt = None
+
     def __init__(
         self,
         url=None,
         job_description=None,
         resume_location=None,
         llm_kwargs: dict = None,
+        progress_callback=None,
+        workspace: str = None,
+        resume: dict = None,
+        save_yaml: bool = True,
     ):
         """Initialize ResumeImprover with the job post URL and optional resume location.
 
+        Construction is cheap: no network, LLM or file work happens until one of
+        the stages (`prepare`, `parse_job`, `tailor`, `render`) is run. Each
+        stage runs the ones before it and is memoized, so stages can be
+        scheduled independently and are never repeated. Every stage has an
+        async counterpart (`aprepare`, `aparse_job`, `atailor`, `arender`)
+        sharing the same memoized results.
+
         Args:
             url (str): The URL of the job post.
+            job_description (str, optional): The text of the job post, used when no URL is given. Defaults to None.
             resume_location (str, optional): The file path to the resume. Defaults to None.
             llm_kwargs (dict, optional): Additional keyword arguments for the language model. Defaults to None.
+            progress_callback (Callable, optional): Called as `progress_callback(event, **data)` as stages finish and sections are rewritten. Defaults to None.
+            workspace (str, optional): Private directory for the tailored resume and PDFs of this run, so concurrent runs for the same job post do not overwrite each other. Defaults to the job data folder.
+            resume (dict, optional): The resume, already loaded, used instead of reading `resume_location`. Defaults to None.
+            save_yaml (bool, optional): Write the tailored resume to `resume.yaml` as soon as it is tailored. When False it is only kept in `resume_yaml` (and rendered from there) until `save_resume_yaml` is called. Defaults to True.
         """
         super().__init__()
         self.job_post_html_data = None
         self.job_post_raw = None
-        self.resume = None
+        self.resume = resume
         self.resume_yaml = None
         self.job_post = None
         self.parsed_job = None
@@ -58,24 +100,245 @@ class ResumeImprover:
         self.yaml_loc = None
         self.url = url
         self.job_description = job_description
+        self.job_post_response_headers = None
+        self.job_post_not_modified = False
+        self.resume_location = resume_location or config.DEFAULT_RESUME_PATH
+        self.progress_callback = progress_callback
+        self.workspace = workspace
+        self.save_yaml = save_yaml
         
         # Cache for API responses to avoid duplicate calls
         self._api_cache = {}
-        
-        self.download_and_parse_job_post(job_description=self.job_description)
-        self.resume_location = resume_location or config.DEFAULT_RESUME_PATH
-        self._update_resume_fields()
+        # Prompt and completion tokens of the last batch call
+        self.token_usage = {}
+
+        # Results of the pipeline stages that have already run
+        self._stages = {}
+        self._stage_lock = threading.RLock()
+        # Async stages in flight, so concurrent awaiters share one run
+        self._stage_tasks = {}
+
+    @property
+    def output_location(self) -> str:
+        """The folder the tailored resume and PDFs are written to: the workspace, if any, or the job data folder."""
+        return self.workspace or self.job_data_location
+
+    def _run_stage(self, name, func):
+        """Run a pipeline stage once and memoize its result.
+
+        Args:
+            name: The key identifying the stage.
+            func (Callable): The function computing the stage result.
+        """
+        with self._stage_lock:
+            if name not in self._stages:
+                self._stages[name] = func()
+            return self._stages[name]
+
+    async def _arun_stage(self, name, make_coroutine):
+        """Async version of `_run_stage`.
+
+        Concurrent callers on the same event loop await a single run of the stage.
+
+        Args:
+            name: The key identifying the stage.
+            make_coroutine (Callable): Returns the coroutine computing the stage result.
+        """
+        if name in self._stages:
+            return self._stages[name]
+        task = self._stage_tasks.get(name)
+        if task is None:
+            task = asyncio.ensure_future(make_coroutine())
+            self._stage_tasks[name] = task
+        try:
+            result = await task
+        finally:
+            if self._stage_tasks.get(name) is task and task.done():
+                del self._stage_tasks[name]
+        with self._stage_lock:
+            self._stages.setdefault(name, result)
+            return self._stages[name]
+
+    def _report(self, event, **data):
+        """Pass a progress event to the progress callback, if any."""
+        if self.progress_callback is not None:
+            self.progress_callback(event, **data)
+
+    def _reset_stages(self, *names):
+        """Forget memoized stages (and every render) so they run again."""
+        with self._stage_lock:
+            for key in list(self._stages):
+                stage = key[0] if isinstance(key, tuple) else key
+                if stage in names or stage == "render":
+                    del self._stages[key]
+
+    def prepare(self):
+        """Stage 1: fetch the job post and load the resume.
+
+        Job posts already in the job post index are restored here, parsed job
+        included, so `parse_job` has nothing left to do for them.
+        """
+        def _prepare():
+            self.load_resume()
+            if self.url:
+                self._download_indexed_job_post()
+            elif self.job_description:
+                self.job_post_raw = self.job_description
+            else:
+                raise ValueError("Either url or job_description must be provided")
+            self._report("fetched", url=self.url)
+
+        return self._run_stage("prepare", _prepare)
+
+    def load_resume(self):
+        """Read and validate the resume YAML."""
+        return self._run_stage("resume", self._update_resume_fields)
+
+    def parse_job(self) -> dict:
+        """Stage 2: extract the job description from the job post.
+
+        Returns:
+            dict: The parsed job.
+        """
+        def _parse_job():
+            self.prepare()
+            if self.parsed_job is None:
+                self._parse_job_post_raw()
+            self._report("job_parsed", job=self.parsed_job)
+            return self.parsed_job
+
+        return self._run_stage("parse_job", _parse_job)
+
+    def tailor(self) -> dict:
+        """Stage 3: tailor the resume to the job post (and write `resume.yaml` if `save_yaml`).
+
+        Returns:
+            dict: The tailored resume.
+        """
+        return self._run_stage("tailor", self._tailor)
+
+    def render(self, template_name="classic", output_dir=None) -> str:
+        """Stage 4: render the tailored resume to PDF.
+
+        Args:
+            template_name (str, optional): The PDF template to use. Defaults to "classic".
+            output_dir (str, optional): Where to write the PDF. Defaults to the workspace or the job data folder.
+
+        Returns:
+            str: The location of the generated PDF.
+        """
+        self.tailor()
+        output_dir = output_dir or self.output_location
+        return self._run_stage(
+            ("render", template_name, output_dir),
+            lambda: self._render_pdf(template_name, output_dir),
+        )
+
+    async def aprepare(self):
+        """Async version of `prepare`."""
+        async def _aprepare():
+            await asyncio.to_thread(self.load_resume)
+            if self.url:
+                await self._adownload_indexed_job_post()
+            elif self.job_description:
+                self.job_post_raw = self.job_description
+            else:
+                raise ValueError("Either url or job_description must be provided")
+            self._report("fetched", url=self.url)
+
+        return await self._arun_stage("prepare", _aprepare)
+
+    async def aparse_job(self) -> dict:
+        """Async version of `parse_job`."""
+        async def _aparse_job():
+            await self.aprepare()
+            if self.parsed_job is None:
+                await self._aparse_job_post_raw()
+            self._report("job_parsed", job=self.parsed_job)
+            return self.parsed_job
+
+        return await self._arun_stage("parse_job", _aparse_job)
+
+    async def atailor(self) -> dict:
+        """Async version of `tailor`."""
+        return await self._arun_stage("tailor", self._atailor)
+
+    async def arender(self, template_name="classic", output_dir=None) -> str:
+        """Async version of `render`. The PDF is drawn on a worker thread."""
+        await self.atailor()
+        output_dir = output_dir or self.output_location
+        return await self._arun_stage(
+            ("render", template_name, output_dir),
+            lambda: asyncio.to_thread(self._render_pdf, template_name, output_dir),
+        )
+
+    def share_job_post(self, other):
+        """Reuse the job post parsed by another ResumeImprover for the same posting.
+
+        Args:
+            other (ResumeImprover): The improver that downloads and parses the job post.
+        """
+        other.parse_job()
+        with self._stage_lock:
+            for attr in (
+                "job_post_html_data",
+                "job_post_raw",
+                "job_post",
+                "parsed_job",
+                "clean_url",
+                "job_data_location",
+                "job_post_response_headers",
+            ):
+                setattr(self, attr, getattr(other, attr))
+            self.load_resume()
+            self._stages["prepare"] = None
+            self._stages["parse_job"] = self.parsed_job
+
+    def restore_stages(self, stage_outputs: dict, fingerprints: dict = None) -> list:
+        """Restore the stages an earlier run finished from their outputs.
+
+        Args:
+            stage_outputs (dict): Maps "parse_job" to the job data folder and
+                "tailor" to the tailored resume YAML.
+            fingerprints (dict, optional): Maps each stage to its `stage_fingerprint`
+                when it finished.
+
+        Returns:
+            list: The restored stages. Stages whose output is gone, or whose
+                fingerprint no longer matches, are run again.
+        """
+        fingerprints = fingerprints or {}
+        restored = []
+        with self._stage_lock:
+            job_data_location = stage_outputs.get("parse_job")
+            if job_data_location and os.path.isdir(job_data_location):
+                self._load_indexed_job_post(job_data_location)
+                if fingerprints.get("parse_job") != self.stage_fingerprint("parse_job"):
+                    self.parsed_job = self.job_post_raw = self.job_post_html_data = None
+                    self.job_post = self.job_data_location = self.clean_url = None
+                    return restored
+                self.load_resume()
+                self._stages["prepare"] = None
+                self._stages["parse_job"] = self.parsed_job
+                restored.append("parse_job")
+                yaml_loc = stage_outputs.get("tailor")
+                if yaml_loc and fingerprints.get("tailor") == self.stage_fingerprint("tailor", yaml_loc):
+                    self.yaml_loc = yaml_loc
+                    self.resume_yaml = utils.read_yaml(filename=yaml_loc)
+                    self._stages["tailor"] = self.resume_yaml
+                    restored.append("tailor")
+        return restored
 
     def _get_cache_key(self, prompt_type: str, section_data: str = None) -> str:
-        """Generate a cache key for API responses based on content hash."""
-        import hashlib
-        content = f"{prompt_type}_{self.job_post_raw}_{section_data or ''}"
+        """Generate a cache key for API responses based on content hash and the model settings."""
+        content = f"{prompt_type}_{self.job_post_raw}_{section_data or ''}_{self._llm_settings()}"
         return hashlib.md5(content.encode()).hexdigest()
 
     def _update_resume_fields(self):
-        """Update the resume fields based on the current resume location."""
-        utils.check_resume_format(self.resume_location)
-        self.resume = utils.read_yaml(filename=self.resume_location)
+        """Update the resume fields from the resume, reading it from the resume location unless it was given."""
+        if self.resume is None:
+            self.resume = utils.read_yaml(filename=self.resume_location)
+        utils.check_resume_format(self.resume)
         self.degrees = self._get_degrees(self.resume)
         self.basic_info = utils.get_dict_field(field="basic", data_dict=self.resume)
         self.education = utils.get_dict_field(field="education", data_dict=self.resume)
@@ -93,9 +356,9 @@ class ResumeImprover:
             new_resume_location (str): The new file path to the resume.
         """
         self.resume_location = new_resume_location
-        self._update_resume_fields()
-        # Clear cache when resume changes
-        self._api_cache.clear()
+        self.resume = None
+        self._reset_stages("resume", "tailor")
+        self.load_resume()
 
     def _extract_html_data(self):
         """Extract text content from HTML, removing all HTML tags.
@@ -104,17 +367,21 @@ class ResumeImprover:
             Exception: If HTML data extraction fails.
         """
         try:
-            soup = BeautifulSoup(self.job_post_html_data, "html.parser")
-            self.job_post_raw = soup.get_text(separator=" ", strip=True)
+            if config.PROMPT_COMPACTION_ENABLED:
+                self.job_post_raw = extract_job_post_text(self.job_post_html_data)
+            else:
+                soup = BeautifulSoup(self.job_post_html_data, "html.parser")
+                self.job_post_raw = soup.get_text(separator=" ", strip=True)
         except Exception as e:
             config.logger.error(f"Failed to extract HTML data: {e}")
             raise
 
-    def _download_url(self, url=None):
+    def _download_url(self, url=None, request_headers=None):
         """Download the content of the URL and return it as a string.
 
         Args:
             url (str, optional): The URL to download. Defaults to None.
+            request_headers (dict, optional): Extra headers, e.g. for a conditional GET. Defaults to None.
 
         Returns:
             bool: True if download was successful, False otherwise.
@@ -125,23 +392,26 @@ class ResumeImprover:
         max_retries = config.MAX_RETRIES
         backoff_factor = config.BACKOFF_FACTOR
         use_proxy = False
+        headers = dict(config.REQUESTS_HEADERS, **(request_headers or {}))
 
         for attempt in range(max_retries):
+            response = None
             try:
                 proxies = None
                 if use_proxy:
                     proxy = FreeProxy(rand=True).get()
                     proxies = {"http": proxy, "https": proxy}
 
-                response = requests.get(
-                    self.url, headers=config.REQUESTS_HEADERS, proxies=proxies
-                )
+                response = requests.get(self.url, headers=headers, proxies=proxies)
                 response.raise_for_status()
-                self.job_post_html_data = response.text
+                self.job_post_response_headers = response.headers
+                self.job_post_not_modified = response.status_code == 304
+                if not self.job_post_not_modified:
+                    self.job_post_html_data = response.text
                 return True
 
             except requests.RequestException as e:
-                if response.status_code == 429:
+                if response is not None and response.status_code == 429:
                     config.logger.warning(
                         f"Rate limit exceeded. Retrying in {backoff_factor * 2 ** attempt} seconds..."
                     )
@@ -154,70 +424,327 @@ class ResumeImprover:
         config.logger.error(f"Exceeded maximum retries for URL {self.url}")
         return False
 
-    def download_and_parse_job_post(self, url=None, job_description=None):
-        """Download and parse the job post from the provided URL.
+    async def _adownload_url(self, url=None, request_headers=None):
+        """Async version of `_download_url` using the pooled HTTP session.
 
         Args:
-            url (str, optional): The URL of the job post. Defaults to None.
+            url (str, optional): The URL to download. Defaults to None.
+            request_headers (dict, optional): Extra headers, e.g. for a conditional GET. Defaults to None.
+
+        Returns:
+            bool: True if download was successful, False otherwise.
         """
-        if self.url:
-            self._download_url()
-            self._extract_html_data()
-        elif self.job_description:
-            self.job_post_raw = job_description
-        else:
-            raise ValueError("Either url or job_description must be provided")
+        if url:
+            self.url = url
+
+        max_retries = config.MAX_RETRIES
+        backoff_factor = config.BACKOFF_FACTOR
+        use_proxy = False
+        headers = dict(config.REQUESTS_HEADERS, **(request_headers or {}))
+
+        for attempt in range(max_retries):
+            try:
+                proxy = None
+                if use_proxy:
+                    proxy = await asyncio.to_thread(FreeProxy(rand=True).get)
+
+                async with get_http_session().get(
+                    self.url, headers=headers, proxy=proxy
+                ) as response:
+                    if response.status != 429:
+                        response.raise_for_status()
+                        self.job_post_response_headers = response.headers
+                        self.job_post_not_modified = response.status == 304
+                        if not self.job_post_not_modified:
+                            self.job_post_html_data = await response.text()
+                        return True
+
+                config.logger.warning(
+                    f"Rate limit exceeded. Retrying in {backoff_factor * 2 ** attempt} seconds..."
+                )
+                await asyncio.sleep(backoff_factor * 2**attempt)
+                use_proxy = True
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                config.logger.error(f"Failed to download URL {self.url}: {e}")
+                return False
+
+        config.logger.error(f"Exceeded maximum retries for URL {self.url}")
+        return False
 
+    def _load_indexed_job_post(self, job_data_location):
+        """Restore a previously parsed job post from its folder."""
+        self.parsed_job, self.job_post_raw, self.job_post_html_data = (
+            job_post_index.load(job_data_location)
+        )
         self.job_post = JobPost(self.job_post_raw)
-        self.parsed_job = self.job_post.parse_job_post(verbose=False)
-        try:
-            filename = self.parsed_job["company"] + "_" + self.parsed_job["job_title"]
-            filename = filename.replace(" ", "_")
-        except KeyError:
-            if "://" in self.url:
-                filename = self.url.split("://")[1]
-            else:
-                filename = self.url
-            url_paths = filename.split("/")
-            filename = url_paths[0]
-            if len(url_paths) > 1:
-                filename = filename + "." + url_paths[-1]
-        self.clean_url = filename
-        filepath = os.path.join(config.DATA_PATH, self.clean_url)
-        self.job_data_location = filepath
-        os.makedirs(self.job_data_location, exist_ok=True)
-        utils.write_yaml(
-            self.parsed_job, filename=os.path.join(self.job_data_location, "job.yaml")
+        self.job_post.parsed_job = self.parsed_job
+        self.job_data_location = job_data_location
+        self.clean_url = os.path.basename(job_data_location)
+
+    def _lookup_indexed_url(self):
+        """Return the job post index entry for the URL, if the index is enabled."""
+        if config.JOB_INDEX_MODE == "off":
+            return None
+        return job_post_index.lookup_url(self.url)
+
+    @staticmethod
+    def _conditional_request_headers(entry):
+        """Build the conditional GET headers for a job post index entry."""
+        request_headers = {}
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        return request_headers
+
+    @staticmethod
+    def _can_reuse_indexed_url(entry) -> bool:
+        """Tell whether an indexed job post is trusted without contacting the job board.
+
+        In "reuse" mode, entries checked longer than `JOB_INDEX_TTL_SECONDS`
+        ago are revalidated with a conditional GET first.
+        """
+        return bool(entry) and config.JOB_INDEX_MODE == "reuse" and job_post_index.is_fresh(entry)
+
+    def _reuse_indexed_url(self, entry):
+        config.logger.info(f"Reusing parsed job post for {self.url}")
+        self._load_indexed_job_post(entry["job_data_location"])
+
+    def _finish_download(self, entry):
+        """Handle a completed download of an indexed or new job post.
+
+        Returns:
+            bool: True if the stored job post was reused and no parsing is needed.
+        """
+        if entry and self.job_post_not_modified:
+            config.logger.info(f"Job post {self.url} not modified, reusing parsed job")
+            self._load_indexed_job_post(entry["job_data_location"])
+            self._record_job_post()
+            return True
+        self._extract_html_data()
+        return False
+
+    def _download_indexed_job_post(self):
+        """Download the job post, reusing the index where possible.
+
+        Returns:
+            bool: True if the stored job post was reused and no parsing is needed.
+        """
+        entry = self._lookup_indexed_url()
+        if self._can_reuse_indexed_url(entry):
+            self._reuse_indexed_url(entry)
+            return True
+        self._download_url(request_headers=self._conditional_request_headers(entry))
+        return self._finish_download(entry)
+
+    async def _adownload_indexed_job_post(self):
+        """Async version of `_download_indexed_job_post`."""
+        entry = await asyncio.to_thread(self._lookup_indexed_url)
+        if self._can_reuse_indexed_url(entry):
+            await asyncio.to_thread(self._reuse_indexed_url, entry)
+            return True
+        await self._adownload_url(
+            request_headers=self._conditional_request_headers(entry)
         )
+        return await asyncio.to_thread(self._finish_download, entry)
 
-    def parse_raw_job_post(self, raw_html):
+    def download_and_parse_job_post(self, url=None, job_description=None):
         """Download and parse the job post from the provided URL.
 
+        Known job posts are looked up in the job post index first, so the
+        extraction LLM call only runs for postings that have not been seen.
+        Calling this again re-runs the job post stages and everything after them.
+
         Args:
             url (str, optional): The URL of the job post. Defaults to None.
+            job_description (str, optional): The text of the job post. Defaults to None.
         """
+        if url:
+            self.url = url
+        if job_description:
+            self.job_description = job_description
+        self._reset_stages("prepare", "parse_job", "tailor")
+        self.parsed_job = None
+        return self.parse_job()
+
+    def parse_raw_job_post(self, raw_html):
+        """Parse the job post from raw HTML.
+
+        Args:
+            raw_html (str): The HTML of the job post.
+        """
+        self._reset_stages("prepare", "parse_job", "tailor")
+        self.parsed_job = None
         self.job_post_html_data = raw_html
         self._extract_html_data()
-        self.job_post = JobPost(self.job_post_raw)
+        self._run_stage("prepare", self.load_resume)
+        return self.parse_job()
+
+    def _llm_settings(self) -> tuple:
+        """Return the model settings the LLM responses depend on."""
+        return (
+            config.CHAT_MODEL,
+            config.MODEL_NAME,
+            config.TEMPERATURE,
+            repr(sorted(self.llm_kwargs.items())),
+        )
+
+    def _shared_stage_key(self, stage: str) -> tuple:
+        """Identify a stage run by its inputs: the job post text, the model settings and, once tailoring, the resume."""
+        key = (stage, hash_job_post(self.job_post_raw)) + self._llm_settings()
+        if stage == "tailor":
+            resume = json.dumps(self.resume, sort_keys=True, default=str)
+            key += (hashlib.sha256(resume.encode()).hexdigest(),)
+        return key
+
+    def stage_fingerprint(self, stage: str, output_location: str = None) -> Optional[str]:
+        """Fingerprint the inputs and output of a finished stage for the job store.
+
+        The fingerprint covers the job post, the model settings and, for the
+        tailor stage, the resume and the content of the tailored resume YAML,
+        so an edited resume, another model or a YAML overwritten by another run
+        is not restored.
+
+        Args:
+            stage (str): "parse_job" or "tailor".
+            output_location (str, optional): The tailored resume YAML of the tailor stage.
+
+        Returns:
+            str: The fingerprint, or None if the output is gone.
+        """
+        fingerprint = hashlib.sha256(repr(self._shared_stage_key(stage)).encode())
+        if stage == "tailor":
+            try:
+                with open(output_location, "rb") as f:
+                    fingerprint.update(f.read())
+            except (OSError, TypeError):
+                return None
+        return fingerprint.hexdigest()
+
+    def _share_stage(self, stage: str, func):
+        """Run a stage, or wait for a concurrent request running it on the same inputs and share its result.
+
+        Returns:
+            tuple: The result and whether it came from another request.
+        """
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return func(), False
+        return shared_stages.do(self._shared_stage_key(stage), func)
+
+    async def _ashare_stage(self, stage: str, make_coroutine):
+        """Async version of `_share_stage`."""
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return await make_coroutine(), False
+        return await shared_stages.ado(self._shared_stage_key(stage), make_coroutine)
+
+    def _parse_job_post_raw(self):
+        """Extract the job description from `job_post_raw` unless the same text was already parsed.
+
+        Concurrent requests for the same text share one extraction.
+        """
+        if self._reuse_indexed_text():
+            return
+        result, shared = self._share_stage("parse_job", self._extract_job_post)
+        if shared:
+            self._adopt_parsed_job(*result)
+
+    async def _aparse_job_post_raw(self):
+        """Async version of `_parse_job_post_raw`."""
+        if await asyncio.to_thread(self._reuse_indexed_text):
+            return
+        result, shared = await self._ashare_stage("parse_job", self._aextract_job_post)
+        if shared:
+            await asyncio.to_thread(self._adopt_parsed_job, *result)
+
+    def _extract_job_post(self):
+        """Run the extraction LLM call and save the parsed job.
+
+        Returns:
+            tuple: The parsed job and its folder.
+        """
+        self.job_post = JobPost(self.job_post_raw, llm_kwargs=self.llm_kwargs)
         self.parsed_job = self.job_post.parse_job_post(verbose=False)
+        self._save_parsed_job()
+        return self.parsed_job, self.job_data_location
+
+    async def _aextract_job_post(self):
+        """Async version of `_extract_job_post`."""
+        self.job_post = JobPost(self.job_post_raw, llm_kwargs=self.llm_kwargs)
+        self.parsed_job = await self.job_post.aparse_job_post(verbose=False)
+        await asyncio.to_thread(self._save_parsed_job)
+        return self.parsed_job, self.job_data_location
+
+    def _adopt_parsed_job(self, parsed_job, job_data_location):
+        """Take over the job post parsed by a concurrent request."""
+        config.logger.info("Sharing the job post parsed by a concurrent request")
+        self.parsed_job = copy.deepcopy(parsed_job)
+        self.job_post = JobPost(self.job_post_raw, llm_kwargs=self.llm_kwargs)
+        self.job_post.parsed_job = self.parsed_job
+        self.job_data_location = job_data_location
+        self.clean_url = os.path.basename(job_data_location)
+        self._record_job_post()
+
+    def _reuse_indexed_text(self):
+        """Restore a parsed job post whose text matches `job_post_raw`.
+
+        Returns:
+            bool: True if an identical job post had already been parsed.
+        """
+        if config.JOB_INDEX_MODE == "off":
+            return False
+        job_data_location = job_post_index.lookup_text(hash_job_post(self.job_post_raw))
+        if not job_data_location:
+            return False
+        config.logger.info("Reusing parsed job post with identical text")
+        job_post_html_data = self.job_post_html_data
+        self._load_indexed_job_post(job_data_location)
+        self.job_post_html_data = job_post_html_data or self.job_post_html_data
+        # The text is indexed already; only a newly downloaded URL needs an entry
+        if self.url:
+            self._record_job_post()
+        return True
+
+    def _save_parsed_job(self):
+        """Write the parsed job to its folder and record it in the job post index."""
         try:
             filename = self.parsed_job["company"] + "_" + self.parsed_job["job_title"]
             filename = filename.replace(" ", "_")
-        except KeyError:
-            if "://" in self.url:
-                filename = self.url.split("://")[1]
+        except (KeyError, TypeError):
+            if not self.url:
+                filename = f"job_{hash_job_post(self.job_post_raw)[:12]}"
             else:
-                filename = self.url
-            url_paths = filename.split("/")
-            filename = url_paths[0]
-            if len(url_paths) > 1:
-                filename = filename + "." + url_paths[-1]
+                if "://" in self.url:
+                    filename = self.url.split("://")[1]
+                else:
+                    filename = self.url
+                url_paths = filename.split("/")
+                filename = url_paths[0]
+                if len(url_paths) > 1:
+                    filename = filename + "." + url_paths[-1]
         self.clean_url = filename
         filepath = os.path.join(config.DATA_PATH, self.clean_url)
         self.job_data_location = filepath
-        os.makedirs(self.job_data_location, exist_ok=True)
-        utils.write_yaml(
-            self.parsed_job, filename=os.path.join(self.job_data_location, "job.yaml")
+        job_post_index.save(
+            self.job_data_location,
+            self.parsed_job,
+            self.job_post_raw,
+            self.job_post_html_data,
+        )
+        self._record_job_post()
+
+    def _record_job_post(self):
+        """Record the current job post in the job post index."""
+        if config.JOB_INDEX_MODE == "off":
+            return
+        response_headers = self.job_post_response_headers or {}
+        job_post_index.record(
+            self.job_data_location,
+            hash_job_post(self.job_post_raw),
+            url=self.url,
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
         )
 
     def create_draft_tailored_resume_batch(
@@ -229,20 +756,71 @@ class ResumeImprover:
             auto_open (bool, optional): Whether to automatically open the generated resume. Defaults to True.
             manual_review (bool, optional): Whether to wait for manual review. Defaults to True.
         """
-        config.logger.info("Starting batch processing for resume optimization...")
-        
-        # Process all sections in a single batch API call
-        batch_results = self._process_all_sections_batch()
+        self.tailor()
         
+        if auto_open:
+            subprocess.run(f"start {self.save_resume_yaml()}", shell=True)
+        if manual_review:
+            # Returns as soon as the resume is saved with `editing: false`
+            ReviewGate().wait(self.save_resume_yaml())
+            self.reload_resume_yaml()
+        config.logger.info("Generating PDF")
+        if not skip_pdf_create:
+            self.create_pdf(auto_open=auto_open)
+
+    def _tailor(self, logger=None):
+        """Rewrite every resume section for the job post.
+
+        Concurrent requests tailoring the same resume to the same job post share one run.
+        """
+        logger = logger or config.logger
+        self.parse_job()
+
+        def tailor_sections():
+            logger.info("Starting batch processing for resume optimization...")
+            # Process all sections in a single batch API call
+            batch_results = self._process_all_sections_batch()
+            return self._apply_tailored_sections(batch_results, logger)
+
+        resume_yaml, shared = self._share_stage("tailor", tailor_sections)
+        if shared:
+            return self._adopt_tailored_resume(resume_yaml, logger)
+        return resume_yaml
+
+    async def _atailor(self):
+        """Async version of `_tailor`."""
+        await self.aparse_job()
+
+        async def tailor_sections():
+            config.logger.info("Starting batch processing for resume optimization...")
+            batch_results = await self._aprocess_all_sections_batch()
+            return await asyncio.to_thread(
+                self._apply_tailored_sections, batch_results, config.logger
+            )
+
+        resume_yaml, shared = await self._ashare_stage("tailor", tailor_sections)
+        if shared:
+            return await asyncio.to_thread(
+                self._adopt_tailored_resume, resume_yaml, config.logger
+            )
+        return resume_yaml
+
+    def _adopt_tailored_resume(self, resume_yaml, logger):
+        """Take over the resume tailored by a concurrent request."""
+        logger.info("Sharing the resume tailored by a concurrent request")
+        resume_yaml = copy.deepcopy(resume_yaml)
+        return self._apply_tailored_sections(resume_yaml, logger)
+
+    def _apply_tailored_sections(self, batch_results, logger):
+        """Store the rewritten sections in `resume_yaml`, writing `resume.yaml` if `save_yaml`."""
         # Extract results from batch response
         self.skills = batch_results.get('skills', self.skills)
         self.objective = batch_results.get('objective', self.objective)
         self.experiences = batch_results.get('experiences', self.experiences)
         self.projects = batch_results.get('projects', self.projects)
         
-        config.logger.info("Done updating...")
-        self.yaml_loc = os.path.join(self.job_data_location, "resume.yaml")
-        resume_dict = dict(
+        logger.info("Done updating...")
+        self.resume_yaml = dict(
             editing=True,
             basic=self.basic_info,
             objective=self.objective,
@@ -251,53 +829,157 @@ class ResumeImprover:
             projects=self.projects,
             skills=self.skills,
         )
-        utils.write_yaml(resume_dict, filename=self.yaml_loc)
+        # A resume.yaml of an earlier tailoring run is out of date
+        self.yaml_loc = None
+        if self.save_yaml:
+            self.save_resume_yaml()
+        self._report("tailored", resume_location=self.yaml_loc)
+        return self.resume_yaml
+
+    def save_resume_yaml(self) -> str:
+        """Write the tailored resume to `resume.yaml` in the output location, unless it already was.
+
+        Returns:
+            str: The location of `resume.yaml`.
+        """
+        if self.yaml_loc is None:
+            yaml_loc = os.path.join(self.output_location, "resume.yaml")
+            utils.write_yaml(self.resume_yaml, filename=yaml_loc)
+            self.yaml_loc = yaml_loc
+        return self.yaml_loc
+
+    def reload_resume_yaml(self) -> dict:
+        """Read `resume.yaml` back into `resume_yaml`, e.g. after it was edited during manual review.
+
+        Returns:
+            dict: The tailored resume.
+        """
         self.resume_yaml = utils.read_yaml(filename=self.yaml_loc)
-        
-        if auto_open:
-            subprocess.run(f"start {self.yaml_loc}", shell=True)
-        while manual_review and utils.read_yaml(filename=self.yaml_loc)["editing"]:
-            time.sleep(5)
-        config.logger.info("Generating PDF")
-        if not skip_pdf_create:
-            self.create_pdf(auto_open=auto_open)
+        return self.resume_yaml
 
     def _process_all_sections_batch(self):
-        """Process all resume sections in a single batch API call to minimize API usage."""
-        
-        # Create a combined prompt that handles all sections at once
-        combined_prompt = self._create_combined_prompt()
-        
-        # Use a single LLM call for all processing
-        llm = create_llm(**self.llm_kwargs)
-        
-        # Create structured output for all sections
-        from pydantic import BaseModel, Field
-        from typing import List
-        
-        class SkillCategory(BaseModel):
-            category: str = Field(description="The skill category name")
-            skills: List[str] = Field(description="List of skills in this category")
-        
-        class ExperienceHighlight(BaseModel):
-            company: str = Field(description="Company name")
-            title: str = Field(description="Job title")
-            highlights: List[str] = Field(description="Optimized bullet points")
-        
-        class ProjectHighlight(BaseModel):
-            name: str = Field(description="Project name")
-            highlights: List[str] = Field(description="Optimized bullet points")
-        
-        class BatchResumeOutput(BaseModel):
-            technical_skills: List[str] = Field(description="Technical skills that match the job")
-            non_technical_skills: List[str] = Field(description="Non-technical skills that match the job")
-            objective: str = Field(description="Tailored objective statement")
-            experience_highlights: List[List[str]] = Field(description="Rewritten highlights for each experience")
-            project_highlights: List[List[str]] = Field(description="Rewritten highlights for each project")
-        
-        # Single API call for all sections
-        runnable = combined_prompt | llm.with_structured_output(schema=BatchResumeOutput)
-        
+        """Process all resume sections in a single batch API call to minimize API usage.
+
+        Sections already tailored to this job post (by an earlier submission of
+        the same resume, say) are reused, and when only some sections changed
+        just those are rewritten, one call per section.
+        """
+        if self._load_tailored_sections():
+            results = self._process_sections_with_cache()
+        else:
+            runnable, chain_inputs = self._create_batch_runnable()
+            try:
+                usage_handler = UsageMetadataCallbackHandler()
+                result = runnable.invoke(chain_inputs, config={"callbacks": [usage_handler]})
+                self._record_token_usage(usage_handler, result)
+                results = self._report_sections(self._cache_batch_result(result))
+            except Exception as e:
+                config.logger.error(f"Batch processing failed: {e}")
+                # Fallback to individual processing with caching
+                results = self._process_sections_with_cache()
+        self._save_tailored_sections()
+        return results
+
+    async def _aprocess_all_sections_batch(self):
+        """Async version of `_process_all_sections_batch`."""
+        if await asyncio.to_thread(self._load_tailored_sections):
+            results = await self._aprocess_sections_with_cache()
+        else:
+            runnable, chain_inputs = self._create_batch_runnable()
+            try:
+                usage_handler = UsageMetadataCallbackHandler()
+                result = await runnable.ainvoke(
+                    chain_inputs, config={"callbacks": [usage_handler]}
+                )
+                self._record_token_usage(usage_handler, result)
+                results = self._report_sections(self._cache_batch_result(result))
+            except Exception as e:
+                config.logger.error(f"Batch processing failed: {e}")
+                results = await self._aprocess_sections_with_cache()
+        await asyncio.to_thread(self._save_tailored_sections)
+        return results
+
+    def _tailored_sections_path(self) -> str:
+        return os.path.join(self.job_data_location, TAILORED_SECTIONS_FILENAME)
+
+    def _load_tailored_sections(self) -> bool:
+        """Add the sections tailored to this job post by earlier runs to `_api_cache`.
+
+        Returns:
+            bool: True if at least one section of the current resume can be reused.
+        """
+        if not config.DELTA_TAILORING_ENABLED or not self.job_data_location:
+            return False
+        path = self._tailored_sections_path()
+        if os.path.exists(path):
+            for cache_key, output in (utils.read_yaml(filename=path) or {}).items():
+                self._api_cache.setdefault(cache_key, output)
+        reused = [
+            cache_key for cache_key, *_ in self._section_calls() if cache_key in self._api_cache
+        ]
+        if reused:
+            config.logger.info(f"Reusing {len(reused)} previously tailored sections")
+        return bool(reused)
+
+    def _save_tailored_sections(self):
+        """Store the tailored sections of the current resume next to the parsed job.
+
+        Entries are keyed by a hash of the job post, the section content and the
+        model settings, and only the most recently used
+        `TAILORED_SECTIONS_MAX_ENTRIES` are kept.
+        """
+        if not config.DELTA_TAILORING_ENABLED or not self.job_data_location:
+            return
+        path = self._tailored_sections_path()
+        entries = (utils.read_yaml(filename=path) or {}) if os.path.exists(path) else {}
+        for cache_key, *_ in self._section_calls():
+            if cache_key in self._api_cache:
+                # Move to the end so the least recently used entries are dropped first
+                entries.pop(cache_key, None)
+                entries[cache_key] = self._api_cache[cache_key]
+        entries = dict(list(entries.items())[-config.TAILORED_SECTIONS_MAX_ENTRIES:])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        utils.write_yaml(entries, filename=tmp_path)
+        os.replace(tmp_path, path)
+
+    def _cache_batch_result(self, result) -> dict:
+        """Map the batch output back to the resume and cache each section's rewrite."""
+        results = self._map_batch_result(result)
+        self._api_cache[self._prompt_cache_key("SKILLS_MATCHER")] = results["skills"]
+        self._api_cache[self._prompt_cache_key("OBJECTIVE_WRITER")] = results["objective"]
+        for section_name, highlights in (
+            ("experiences", result.experience_highlights),
+            ("projects", result.project_highlights),
+        ):
+            sections = getattr(self, section_name)
+            for section, section_highlights in zip(sections, highlights):
+                self._api_cache[self._section_cache_key(section)] = section_highlights
+        return results
+
+    def _report_sections(self, results):
+        """Report every rewritten section of a batch result and return it unchanged."""
+        for section in ("skills", "objective"):
+            self._report("section_rewritten", section=section, index=0, content=results[section])
+        for section in ("experiences", "projects"):
+            for index, entry in enumerate(results[section]):
+                self._report(
+                    "section_rewritten",
+                    section=section,
+                    index=index,
+                    content=entry.get("highlights"),
+                )
+        return results
+
+    def _create_batch_runnable(self):
+        """Build the single-call runnable for all sections and its inputs.
+
+        Returns:
+            tuple: The runnable and the inputs to invoke it with.
+        """
+        # Create a combined prompt that handles all sections at once, in a single LLM call
+        prompt = self._create_combined_prompt()
+        runnable = create_structured_chain(prompt, BatchResumeOutput, **self.llm_kwargs)
+
         # Get all inputs needed
         chain_inputs = {
             'job_description': self.job_post_raw,
@@ -311,45 +993,75 @@ class ResumeImprover:
             'num_experiences': len(self.experiences),
             'num_projects': len(self.projects)
         }
+        uncompacted_prompt_tokens = count_tokens(prompt.format(**chain_inputs))
+
+        if config.PROMPT_COMPACTION_ENABLED:
+            # The parsed job carries the essentials, so the job post text gets what is left of the budget
+            chain_inputs['parsed_job'] = format_parsed_job(self.parsed_job)
+            chain_inputs['job_description'] = ''
+            budget = config.BATCH_PROMPT_TOKEN_BUDGET - count_tokens(prompt.format(**chain_inputs))
+            chain_inputs['job_description'] = compact_job_post(
+                self.job_post_raw, self.parsed_job, max(budget, 0)
+            )
+
+        self.token_usage = dict(
+            uncompacted_prompt_tokens=uncompacted_prompt_tokens,
+            prompt_tokens=count_tokens(prompt.format(**chain_inputs)),
+        )
+        return runnable, chain_inputs
+
+    def _record_token_usage(self, usage_handler, result):
+        """Add the completion tokens of the batch call to `token_usage` and report it.
+
+        The token counts reported by the API are used when available; cached
+        and offline responses are counted with the local tokenizer instead.
+        """
+        usage = next(iter(usage_handler.usage_metadata.values()), None)
+        if usage:
+            self.token_usage["prompt_tokens"] = usage["input_tokens"]
+            self.token_usage["completion_tokens"] = usage["output_tokens"]
+        else:
+            self.token_usage["completion_tokens"] = count_tokens(result.json())
+        config.logger.info(f"Batch call token usage: {self.token_usage}")
+        self._report("token_usage", **self.token_usage)
+
+    def _map_batch_result(self, result):
+        """Convert the batch output back to the resume section structure."""
+        # Convert the result back to the expected format
+        processed_result = {
+            'skills': [
+                {'category': 'Technical', 'skills': result.technical_skills},
+                {'category': 'Non-technical', 'skills': result.non_technical_skills}
+            ],
+            'objective': result.objective,
+            'experiences': [],
+            'projects': []
+        }
+        # Keep the resume's other skills, as `extract_matched_skills` does, so the
+        # cached SKILLS_MATCHER entry is the same whichever path produced it
+        self._combine_skill_lists(processed_result['skills'], self.skills)
         
-        try:
-            result = runnable.invoke(chain_inputs)
-            
-            # Convert the result back to the expected format
-            processed_result = {
-                'skills': [
-                    {'category': 'Technical', 'skills': result.technical_skills},
-                    {'category': 'Non-technical', 'skills': result.non_technical_skills}
-                ],
-                'objective': result.objective,
-                'experiences': [],
-                'projects': []
-            }
-            
-            # Map experience highlights back to original structure
-            for i, exp in enumerate(self.experiences):
-                exp_copy = dict(exp)
-                if i < len(result.experience_highlights):
-                    exp_copy['highlights'] = result.experience_highlights[i]
-                processed_result['experiences'].append(exp_copy)
-            
-            # Map project highlights back to original structure  
-            for i, proj in enumerate(self.projects):
-                proj_copy = dict(proj)
-                if i < len(result.project_highlights):
-                    proj_copy['highlights'] = result.project_highlights[i]
-                processed_result['projects'].append(proj_copy)
-            
-            return processed_result
-            
-        except Exception as e:
-            config.logger.error(f"Batch processing failed: {e}")
-            # Fallback to individual processing with caching
-            return self._process_sections_with_cache()
+        # Map experience highlights back to original structure
+        for i, exp in enumerate(self.experiences):
+            exp_copy = dict(exp)
+            if i < len(result.experience_highlights):
+                exp_copy['highlights'] = result.experience_highlights[i]
+            processed_result['experiences'].append(exp_copy)
+        
+        # Map project highlights back to original structure  
+        for i, proj in enumerate(self.projects):
+            proj_copy = dict(proj)
+            if i < len(result.project_highlights):
+                proj_copy['highlights'] = result.project_highlights[i]
+            processed_result['projects'].append(proj_copy)
+        
+        return processed_result
 
     def _create_combined_prompt(self):
-        """Create a combined prompt template for batch processing."""
-        
+        """Return the combined prompt template for batch processing, compiled once."""
+        if ResumeImprover._combined_prompt is not None:
+            return ResumeImprover._combined_prompt
+
         combined_template = """
         You are a professional resume optimizer. Given a job description and current resume sections, 
         optimize ALL sections simultaneously to match the job requirements.
@@ -386,33 +1098,139 @@ class ResumeImprover:
         Maintain truthfulness while optimizing for relevance.
         Ensure the arrays match the exact count of experiences and projects provided.
         """
-        
-        return ChatPromptTemplate.from_template(combined_template)
+
+        ResumeImprover._combined_prompt = ChatPromptTemplate.from_template(combined_template)
+        return ResumeImprover._combined_prompt
 
     def _process_sections_with_cache(self):
-        """Fallback method using individual API calls with caching."""
-        results = {}
-        
-        # Process with caching to avoid duplicate calls
-        cache_key_skills = self._get_cache_key("skills")
-        if cache_key_skills not in self._api_cache:
-            self._api_cache[cache_key_skills] = self.extract_matched_skills(verbose=False)
-        results['skills'] = self._api_cache[cache_key_skills]
-        
-        cache_key_objective = self._get_cache_key("objective")
-        if cache_key_objective not in self._api_cache:
-            self._api_cache[cache_key_objective] = self.write_objective(verbose=False)
-        results['objective'] = self._api_cache[cache_key_objective]
-        
-        # Process experiences and projects with parallel execution
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            exp_future = executor.submit(self.rewrite_unedited_experiences_cached, verbose=False)
-            proj_future = executor.submit(self.rewrite_unedited_projects_cached, verbose=False)
-            
-            results['experiences'] = exp_future.result()
-            results['projects'] = proj_future.result()
-        
-        return results
+        """Fallback method using individual API calls with caching.
+
+        Skills, objective and every experience and project are rewritten in a
+        single `batch`, with at most `config.MAX_CONCURRENT_WORKERS` calls in
+        flight. Each section is reported as soon as its call returns.
+        """
+        pending = list(self._pending_section_calls().items())
+        calls = [(chain, chain_inputs) for _, (chain, chain_inputs, _, _) in pending]
+        for index, output in batch_chains_as_completed(calls):
+            self._store_section_output(*pending[index], output)
+        return self._collect_section_results()
+
+    async def _aprocess_sections_with_cache(self):
+        """Async version of `_process_sections_with_cache`."""
+        pending = list(self._pending_section_calls().items())
+        calls = [(chain, chain_inputs) for _, (chain, chain_inputs, _, _) in pending]
+        async for index, output in abatch_chains_as_completed(calls):
+            self._store_section_output(*pending[index], output)
+        return self._collect_section_results()
+
+    def _section_cache_key(self, section: dict) -> str:
+        return self._get_cache_key("section_highlight", str(section))
+
+    def _prompt_cache_key(self, prompt_name: str) -> str:
+        """Key a whole-resume call by the resume fields its prompt reads (the job post is always part of the key)."""
+        resume_data = {
+            key: self.__dict__.get(key)
+            for key in Prompts.chat_prompts[prompt_name].input_variables
+            if key in self.__dict__
+        }
+        return self._get_cache_key(prompt_name.lower(), str(resume_data))
+
+    def _section_calls(self) -> list:
+        """List the per-section LLM calls that tailor the current resume.
+
+        Every call is keyed by a hash of the job post and the content of its
+        section, so a section's rewrite stays valid until that section changes.
+
+        Returns:
+            list: (cache key, prompt name, output schema, section, output
+                handler, (section name, index)) tuples.
+        """
+        calls = [
+            (
+                self._prompt_cache_key("SKILLS_MATCHER"),
+                "SKILLS_MATCHER",
+                ResumeSkillsMatcherOutput,
+                None,
+                self._matched_skills,
+                ("skills", 0),
+            ),
+            (
+                self._prompt_cache_key("OBJECTIVE_WRITER"),
+                "OBJECTIVE_WRITER",
+                ResumeSummarizerOutput,
+                None,
+                self._final_answer,
+                ("objective", 0),
+            ),
+        ]
+        for section_name in ("experiences", "projects"):
+            for index, section in enumerate(getattr(self, section_name)):
+                calls.append(
+                    (
+                        self._section_cache_key(section),
+                        "SECTION_HIGHLIGHTER",
+                        ResumeSectionHighlighterOutput,
+                        section,
+                        self._sorted_highlights,
+                        (section_name, index),
+                    )
+                )
+        return calls
+
+    def _pending_section_calls(self) -> dict:
+        """Build the fallback LLM calls whose results are not in `_api_cache` yet.
+
+        Sections whose rewrite is already cached are reported as reused.
+
+        Returns:
+            dict: Maps each cache key to its chain, chain inputs, output handler
+                and the (section, index) positions its result fills.
+        """
+        pending = {}
+        for cache_key, prompt_name, pydantic_object, section, handle_output, target in self._section_calls():
+            if cache_key in self._api_cache:
+                self._report(
+                    "section_rewritten",
+                    section=target[0],
+                    index=target[1],
+                    content=self._api_cache[cache_key],
+                    reused=True,
+                )
+                continue
+            # Identical sections share a cache key and are only rewritten once
+            if cache_key in pending:
+                pending[cache_key][3].append(target)
+                continue
+            chain = self._chain_updater(Prompts.chat_prompts[prompt_name], pydantic_object)
+            chain_inputs = self._get_formatted_chain_inputs(chain=chain, section=section)
+            pending[cache_key] = (chain, chain_inputs, handle_output, [target])
+        return pending
+
+    def _store_section_output(self, cache_key: str, call: tuple, output):
+        """Cache the handled output of a call built by `_pending_section_calls` and report it."""
+        _, _, handle_output, targets = call
+        self._api_cache[cache_key] = handle_output(output)
+        for section_name, index in targets:
+            self._report(
+                "section_rewritten",
+                section=section_name,
+                index=index,
+                content=self._api_cache[cache_key],
+            )
+
+    def _collect_section_results(self) -> dict:
+        """Merge the cached section rewrites back in the original resume order."""
+        def with_highlights(section):
+            section = dict(section)
+            section["highlights"] = self._api_cache[self._section_cache_key(section)]
+            return section
+
+        return {
+            'skills': self._api_cache[self._prompt_cache_key("SKILLS_MATCHER")],
+            'objective': self._api_cache[self._prompt_cache_key("OBJECTIVE_WRITER")],
+            'experiences': [with_highlights(exp) for exp in self.experiences],
+            'projects': [with_highlights(proj) for proj in self.projects],
+        }
 
     def create_draft_tailored_resume(
         self, auto_open=True, manual_review=True, skip_pdf_create=False
@@ -424,74 +1242,165 @@ class ResumeImprover:
         return self.create_draft_tailored_resume_batch(auto_open, manual_review, skip_pdf_create)
 
     def _create_tailored_resume_in_background(
-        self, auto_open=True, manual_review=True, background_runner=None
+        self, auto_open=True, manual_review=True, background_runner=None, job_store=None, job_id=None
     ):
-        """Run a full review of the resume against the job post using optimized processing."""
+        """Run a full review of the resume against the job post using optimized processing.
+
+        With a `job_store`, each finished stage is recorded under `job_id`.
+
+        Returns:
+            bool: False if the background task was cancelled before tailoring.
+        """
         if background_runner is not None:
             logger = background_runner.logger
         else:
             logger = config.logger
             
         logger.info("Starting optimized background processing...")
-        
-        # Use batch processing for background jobs too
-        batch_results = self._process_all_sections_batch()
-        
-        self.skills = batch_results.get('skills', self.skills)
-        self.objective = batch_results.get('objective', self.objective)
-        self.experiences = batch_results.get('experiences', self.experiences)
-        self.projects = batch_results.get('projects', self.projects)
-        
-        logger.info("Done updating...")
-        self.yaml_loc = os.path.join(self.job_data_location, "resume.yaml")
-        resume_dict = dict(
-            editing=True,
-            basic=self.basic_info,
-            objective=self.objective,
-            education=self.education,
-            experiences=self.experiences,
-            projects=self.projects,
-            skills=self.skills,
-        )
-        utils.write_yaml(resume_dict, filename=self.yaml_loc)
-        self.resume_yaml = utils.read_yaml(filename=self.yaml_loc)
+        start = time.time()
+        self.parse_job()
+        if job_store is not None:
+            job_store.complete_stage(
+                job_id,
+                "parse_job",
+                self.job_data_location,
+                time.time() - start,
+                fingerprint=self.stage_fingerprint("parse_job"),
+            )
+        # Stop between stages when the background task was cancelled
+        task = current_task()
+        if task is not None and task.cancel_requested:
+            logger.info(f"Cancelled before tailoring the resume for {self.url}")
+            return False
+        start = time.time()
+        self._run_stage("tailor", lambda: self._tailor(logger=logger))
+        if job_store is not None:
+            job_store.complete_stage(
+                job_id,
+                "tailor",
+                self.yaml_loc,
+                time.time() - start,
+                fingerprint=self.stage_fingerprint("tailor", self.yaml_loc),
+            )
+        return True
 
     @staticmethod
-    def create_draft_tailored_resumes_in_background(background_configs: List[dict]):
+    def create_draft_tailored_resumes_in_background(
+        background_configs: List[dict], batch_id: str = None, job_store: JobStore = None
+    ):
         """Run 'create_draft_tailored_resume' for multiple configurations in the background.
 
+        Improvers are created lazily, so every job post is downloaded inside its
+        own background task. Configs sharing a URL reuse a single download and
+        parse of that posting. The tasks share `BACKGROUND_RUNNER_WORKERS`
+        threads; configs with a lower `priority` run first, and their LLM calls
+        wait behind those of interactive requests. `stop_all_tasks`
+        skips the tasks that have not started and stops running ones before
+        their next stage.
+
+        Progress is recorded in the job store (`JOB_STORE_PATH`). Running the
+        same batch again, e.g. after a crash, skips the configs that were
+        finished and resumes the others after their last finished stage.
+
         Args:
             background_configs (List[dict]): List of configurations for creating draft tailored resumes.
+            batch_id (str, optional): Identifies the batch in the job store. Defaults to a hash of the configs.
+            job_store (JobStore, optional): Where progress is recorded. Defaults to the store at `JOB_STORE_PATH` if `JOB_STORE_ENABLED`.
+
+        Returns:
+            dict: The `ResumeImprovers` (one per config), the `background_runner` and the `batch_id`.
         """
+        if job_store is None and config.JOB_STORE_ENABLED:
+            job_store = JobStore()
         output = {}
         output["ResumeImprovers"] = []
         output["background_runner"] = BackgroundRunner()
+        output["batch_id"] = batch_id or JobStore.make_batch_id(background_configs)
 
-        def run_config(background_config, resume_improver):
+        def run_config(background_config, resume_improver, lead_improver, job_id):
+            if job_store is not None:
+                job_store.set_status(job_id, JobStore.RUNNING)
             try:
-                resume_improver.download_and_parse_job_post()
-                resume_improver._create_tailored_resume_in_background(
-                    auto_open=background_config.get("auto_open", True),
-                    manual_review=background_config.get("manual_review", True),
-                    background_runner=output["background_runner"]
-                )
+                if resume_improver is not lead_improver:
+                    resume_improver.share_job_post(lead_improver)
+                # Interactive requests get their LLM calls dispatched first
+                with llm_dispatcher.priority(llm_dispatcher.BACKGROUND):
+                    finished = resume_improver._create_tailored_resume_in_background(
+                        auto_open=background_config.get("auto_open", True),
+                        manual_review=background_config.get("manual_review", True),
+                        background_runner=output["background_runner"],
+                        job_store=job_store,
+                        job_id=job_id,
+                    )
+                if job_store is not None:
+                    job_store.set_status(
+                        job_id, JobStore.COMPLETED if finished else JobStore.CANCELLED
+                    )
             except Exception as e:
                 output["background_runner"].logger.error(
                     f"An error occurred with config {background_config}: {e}"
                 )
+                if job_store is not None:
+                    job_store.set_status(job_id, JobStore.FAILED, error=str(e))
 
-        for background_config in background_configs:
-            output["ResumeImprovers"].append(
-                ResumeImprover(
-                    url=background_config["url"],
-                    resume_location=background_config.get("resume_location"),
-                )
+        lead_improvers = {}
+        for position, background_config in enumerate(background_configs):
+            resume_improver = ResumeImprover(
+                url=background_config["url"],
+                resume_location=background_config.get("resume_location"),
+            )
+            output["ResumeImprovers"].append(resume_improver)
+            job_id = None
+            if job_store is not None:
+                job = job_store.add_job(output["batch_id"], position, background_config)
+                job_id = job["id"]
+                restored = resume_improver.restore_stages(job["stages"], job["fingerprints"])
+                if "tailor" in restored:
+                    output["background_runner"].logger.info(
+                        f"Skipping {background_config['url']}, tailored by an earlier run"
+                    )
+                    job_store.set_status(job_id, JobStore.COMPLETED)
+                    lead_improvers.setdefault(background_config["url"], resume_improver)
+                    continue
+                if restored:
+                    output["background_runner"].logger.info(
+                        f"Resuming {background_config['url']} after its parsed job post"
+                    )
+            lead_improver = lead_improvers.setdefault(
+                background_config["url"], resume_improver
             )
+            if "parse_job" in resume_improver._stages:
+                # The parsed job post was restored, so there is nothing to share
+                lead_improver = resume_improver
             output["background_runner"].run_in_background(
-                run_config, background_config, output["ResumeImprovers"][-1]
+                run_config,
+                background_config,
+                resume_improver,
+                lead_improver,
+                job_id,
+                priority=background_config.get("priority", 0),
             )
         return output
 
+    @staticmethod
+    def resume_background_batch(batch_id: str, job_store: JobStore = None):
+        """Run the unfinished configs of a batch recorded in the job store again.
+
+        Args:
+            batch_id (str): The `batch_id` returned by `create_draft_tailored_resumes_in_background`.
+            job_store (JobStore, optional): Defaults to the store at `JOB_STORE_PATH`.
+
+        Returns:
+            dict: Same as `create_draft_tailored_resumes_in_background`.
+        """
+        job_store = job_store or JobStore()
+        background_configs = [job["config"] for job in job_store.batch_jobs(batch_id)]
+        if not background_configs:
+            raise ValueError(f"No batch {batch_id} in the job store")
+        return ResumeImprover.create_draft_tailored_resumes_in_background(
+            background_configs, batch_id=batch_id, job_store=job_store
+        )
+
     def _get_formatted_chain_inputs(self, chain, section=None):
         output_dict = {}
         raw_self_data = self.__dict__
@@ -505,17 +1414,16 @@ class ResumeImprover:
         return output_dict
 
     def _chain_updater(
-        self, prompt_msgs, pydantic_object, **chain_kwargs
+        self, prompt, pydantic_object, **chain_kwargs
     ) -> RunnableSequence:
-        """Create a chain based on the prompt messages.
+        """Return the chain for a compiled prompt from `Prompts.chat_prompts`.
+
+        Chains are shared by every call with the same prompt, output schema and LLM settings.
 
         Returns:
             RunnableSequence: The chain for highlighting resume sections, matching skills, or improving resume content.
         """
-        prompt = ChatPromptTemplate(messages=prompt_msgs)
-        llm = create_llm(**self.llm_kwargs)
-        runnable = prompt | llm.with_structured_output(schema=pydantic_object)
-        return runnable
+        return create_structured_chain(prompt, pydantic_object, **self.llm_kwargs)
 
     def _get_degrees(self, resume: dict):
         """Extract degrees from the resume.
@@ -569,12 +1477,27 @@ class ResumeImprover:
     def rewrite_section(self, section: list | str, **chain_kwargs) -> dict:
         """Rewrite a section of the resume."""
         chain = self._chain_updater(
-            Prompts.lookup["SECTION_HIGHLIGHTER"],
+            Prompts.chat_prompts["SECTION_HIGHLIGHTER"],
             ResumeSectionHighlighterOutput,
             **chain_kwargs,
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain, section=section)
-        section_revised = chain.invoke(chain_inputs).dict()
+        return self._sorted_highlights(chain.invoke(chain_inputs))
+
+    async def arewrite_section(self, section: list | str, **chain_kwargs) -> dict:
+        """Async version of `rewrite_section`."""
+        chain = self._chain_updater(
+            Prompts.chat_prompts["SECTION_HIGHLIGHTER"],
+            ResumeSectionHighlighterOutput,
+            **chain_kwargs,
+        )
+        chain_inputs = self._get_formatted_chain_inputs(chain=chain, section=section)
+        return self._sorted_highlights(await chain.ainvoke(chain_inputs))
+
+    @staticmethod
+    def _sorted_highlights(output) -> list:
+        """Order the rewritten highlights by relevance."""
+        section_revised = output.dict()
         section_revised = sorted(
             section_revised["final_answer"], key=lambda d: d["relevance"] * -1
         )
@@ -623,10 +1546,22 @@ class ResumeImprover:
     def extract_matched_skills(self, **chain_kwargs) -> dict:
         """Extract matched skills from the resume and job post."""
         chain = self._chain_updater(
-            Prompts.lookup["SKILLS_MATCHER"], ResumeSkillsMatcherOutput, **chain_kwargs
+            Prompts.chat_prompts["SKILLS_MATCHER"], ResumeSkillsMatcherOutput, **chain_kwargs
+        )
+        chain_inputs = self._get_formatted_chain_inputs(chain=chain)
+        return self._matched_skills(chain.invoke(chain_inputs))
+
+    async def aextract_matched_skills(self, **chain_kwargs) -> dict:
+        """Async version of `extract_matched_skills`."""
+        chain = self._chain_updater(
+            Prompts.chat_prompts["SKILLS_MATCHER"], ResumeSkillsMatcherOutput, **chain_kwargs
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
-        extracted_skills = chain.invoke(chain_inputs).dict()
+        return self._matched_skills(await chain.ainvoke(chain_inputs))
+
+    def _matched_skills(self, output) -> list:
+        """Merge the matched skills into the existing skill categories."""
+        extracted_skills = output.dict()
         if not extracted_skills or "final_answer" not in extracted_skills:
             return None
         extracted_skills = extracted_skills["final_answer"]
@@ -648,19 +1583,32 @@ class ResumeImprover:
     def write_objective(self, **chain_kwargs) -> dict:
         """Write a objective for the resume."""
         chain = self._chain_updater(
-            Prompts.lookup["OBJECTIVE_WRITER"], ResumeSummarizerOutput, **chain_kwargs
+            Prompts.chat_prompts["OBJECTIVE_WRITER"], ResumeSummarizerOutput, **chain_kwargs
         )
 
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
-        objective = chain.invoke(chain_inputs).dict()
-        if not objective or "final_answer" not in objective:
+        return self._final_answer(chain.invoke(chain_inputs))
+
+    async def awrite_objective(self, **chain_kwargs) -> dict:
+        """Async version of `write_objective`."""
+        chain = self._chain_updater(
+            Prompts.chat_prompts["OBJECTIVE_WRITER"], ResumeSummarizerOutput, **chain_kwargs
+        )
+        chain_inputs = self._get_formatted_chain_inputs(chain=chain)
+        return self._final_answer(await chain.ainvoke(chain_inputs))
+
+    @staticmethod
+    def _final_answer(output):
+        """Return the `final_answer` field of a structured output, if any."""
+        output = output.dict()
+        if not output or "final_answer" not in output:
             return None
-        return objective["final_answer"]
+        return output["final_answer"]
 
     def suggest_improvements(self, **chain_kwargs) -> dict:
         """Suggest improvements for the resume."""
         chain = self._chain_updater(
-            Prompts.lookup["IMPROVER"], ResumeImproverOutput, **chain_kwargs
+            Prompts.chat_prompts["IMPROVER"], ResumeImproverOutput, **chain_kwargs
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
         improvements = chain.invoke(chain_inputs).dict()
@@ -679,13 +1627,18 @@ class ResumeImprover:
             skills=self.skills,
         )
 
+    def _render_pdf(self, template_name="classic", output_dir=None):
+        """Render the tailored resume to a PDF."""
+        pdf_generator = ResumePDFGenerator(template_name=template_name)
+        return pdf_generator.generate_resume(
+            job_data_location=output_dir or self.output_location,
+            data=self.resume_yaml,
+        )
+
     def create_pdf(self, auto_open=True):
         """Create a PDF of the resume."""
-        pdf_generator = ResumePDFGenerator()
-        pdf_location = pdf_generator.generate_resume(
-            job_data_location=self.job_data_location,
-            data=utils.read_yaml(filename=self.yaml_loc),
-        )
+        self.tailor()
+        pdf_location = self._render_pdf()
         if auto_open:
             subprocess.run(config.OPEN_FILE_COMMAND.split(" ") + [pdf_location])
-        return pdf_location
\ No newline at end of file
+        return pdf_location
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import threading
+from typing import Callable
+import utils
+from config import config
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+# Events of a file being written or replaced (reads only produce "opened"/"closed_no_write")
+WRITE_EVENTS = ("created", "modified", "moved", "closed")
+
+
+class _FileEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in WRITE_EVENTS:
+            return
+        paths = (event.src_path, getattr(event, "dest_path", None))
+        if any(path and os.path.abspath(path) == self.watcher.path for path in paths):
+            self.watcher.callback()
+
+
+class FileWatcher:
+    """Call `callback` from a background thread whenever a file is written or replaced.
+
+    Changes are reported by watchdog (inotify, FSEvents, ...), so the file is
+    never read or polled to find out whether it changed.
+    """
+
+    def __init__(self, path: str, callback: Callable[[], None]):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self._observer = None
+
+    def start(self):
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_FileEventHandler(self), os.path.dirname(self.path))
+        self._observer.start()
+        return self
+
+    def stop(self):
+        """Stop watching. Safe to call from the callback."""
+        if self._observer is not None:
+            self._observer.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class ReviewGate:
+    """Hold a tailored resume until its manual review is done.
+
+    The review is done when the reviewer clears the `editing` flag of the
+    resume YAML or when `approve` is called, e.g. by POST /jobs/{job_id}/approve.
+    Nothing is polled: the YAML is only read again after it was saved.
+    """
+
+    def __init__(self):
+        self.approved = False
+        self.resume_location = None
+        self._lock = threading.Lock()
+        self._on_done = None
+        self._watcher = None
+
+    def approve(self):
+        """End the review, whatever the `editing` flag says."""
+        self.approved = True
+        self._check()
+
+    def is_done(self) -> bool:
+        if self.approved:
+            return True
+        try:
+            resume = utils.read_yaml(filename=self.resume_location)
+        except Exception as e:
+            # The editor may still be writing the file; its next write wakes us again
+            config.logger.debug(f"Could not read {self.resume_location} under review: {e}")
+            return False
+        return not (resume or {}).get("editing", False)
+
+    def _check(self):
+        with self._lock:
+            if self._on_done is None or not self.is_done():
+                return
+            on_done, self._on_done = self._on_done, None
+        self.close()
+        on_done()
+
+    def watch(self, resume_location: str, on_done: Callable[[], None]):
+        """Call `on_done` once when the review of `resume_location` is done.
+
+        Returns immediately; `on_done` runs on the watcher thread, or on the
+        thread calling `approve`.
+
+        Args:
+            resume_location (str): The resume YAML under review.
+            on_done (Callable): Called without arguments when the review is done.
+        """
+        self.resume_location = resume_location
+        self._watcher = FileWatcher(resume_location, self._check).start()
+        with self._lock:
+            self._on_done = on_done
+        # The review may be over before the watcher started
+        self._check()
+
+    def close(self):
+        """Stop watching the resume without ending the review."""
+        with self._lock:
+            self._on_done = None
+        if self._watcher is not None:
+            self._watcher.stop()
+
+    def wait(self, resume_location: str, timeout: float = None) -> bool:
+        """Block until the review of `resume_location` is done.
+
+        Returns:
+            bool: False if `timeout` seconds passed first.
+        """
+        done = threading.Event()
+        self.watch(resume_location, done.set)
+        try:
+            return done.wait(timeout)
+        finally:
+            self.close()
+
+    async def wait_async(self, resume_location: str, timeout: float = None) -> bool:
+        """Async version of `wait`. No thread is held while waiting."""
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+        await asyncio.to_thread(
+            self.watch, resume_location, lambda: loop.call_soon_threadsafe(done.set)
+        )
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.close()
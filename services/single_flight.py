@@ -0,0 +1,113 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Hashable
+
+
+class _LeaderInterrupted(Exception):
+    """The caller running a shared computation was cancelled before it finished."""
+
+
+class SingleFlight:
+    """Share one run of a computation between concurrent callers with the same key.
+
+    The first caller for a key runs the computation; callers arriving while it
+    is in flight wait for it and receive the same result (or exception)
+    instead of running it again. Once the computation finishes the key is
+    forgotten, so later callers run it anew. Sync and async callers of the
+    same key share one run. If the running caller is cancelled, a waiting
+    caller takes over.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key: Hashable):
+        """Return the future of the computation in flight for `key` and whether the caller runs it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = concurrent.futures.Future()
+            # A running future cannot be cancelled by a waiting caller
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _forget(self, key: Hashable):
+        with self._lock:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Return the number of computations in flight."""
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, func: Callable):
+        """Run `func()`, or wait for the run already in flight for `key`.
+
+        Args:
+            key (Hashable): Identifies computations with interchangeable results.
+            func (Callable): Computes the result.
+
+        Returns:
+            tuple: The result and whether it was shared from another caller's run.
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except _LeaderInterrupted:
+                continue
+        try:
+            result = func()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.set_exception(_LeaderInterrupted())
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._forget(key)
+
+    async def ado(self, key: Hashable, make_coroutine: Callable[[], Awaitable]):
+        """Async version of `do`. Waiting callers hold no thread.
+
+        Args:
+            key (Hashable): Identifies computations with interchangeable results.
+            make_coroutine (Callable): Returns the coroutine computing the result.
+
+        Returns:
+            tuple: The result and whether it was shared from another caller's run.
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded, so a cancelled waiter leaves the shared run alone
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except _LeaderInterrupted:
+                continue
+        try:
+            result = await make_coroutine()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.set_exception(_LeaderInterrupted())
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._forget(key)
+
+
+# Shared pipeline stages of concurrent requests, keyed by job post, resume and model settings
+shared_stages = SingleFlight()
@@ -1,13 +1,17 @@
 import streamlit as st
 import requests
+import json
 import re
+import time
 from urllib.parse import unquote
 import os
 
 if os.getenv("DOCKER_CONTAINER", "false") == "true":
-    API_URL = "http://backend:8000/process-resume/"
+    BASE_URL = "http://backend:8000"
 else:
-    API_URL = "http://localhost:8000/process-resume/"
+    BASE_URL = "http://localhost:8000"
+API_URL = f"{BASE_URL}/process-resume/"
+STREAM_URL = f"{BASE_URL}/process-resume/stream"
 
 
 # Page configuration
@@ -26,6 +30,7 @@ st.session_state.setdefault("success_message", None)
 st.session_state.setdefault("error_message", None)
 st.session_state.setdefault("processing_times", None)
 st.session_state.setdefault("download_file", None)
+st.session_state.setdefault("review_job", None)
 
 # Define function to extract processing times from headers
 def extract_processing_times_from_headers(headers):
@@ -42,6 +47,51 @@ def extract_processing_times_from_headers(headers):
             pass # Ignore if not a valid float
     return times
 
+# Human readable labels for the progress events sent by the API
+EVENT_LABELS = {
+    "queued": "Queued",
+    "converted": "Resume converted to YAML",
+    "fetched": "Job post fetched",
+    "job_parsed": "Job description parsed",
+    "tailored": "Resume tailored",
+    "pdf_rendered": "PDF rendered",
+}
+
+def iter_server_sent_events(response):
+    """Yield the JSON payload of each server-sent event in a streamed response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data: "):
+            yield json.loads(line[len("data: "):])
+
+def stream_tailoring(data, files, status, partial_results):
+    """Stream the tailoring progress, showing partial results, and return the final event."""
+    with requests.post(STREAM_URL, data=data, files=files, stream=True, timeout=300) as response:
+        if response.status_code != 200:
+            return {"event": "failed", "error": response.json().get("detail", response.text)}
+        for event in iter_server_sent_events(response):
+            name = event["event"]
+            if name in ("completed", "failed", "cancelled"):
+                return event
+            if name == "section_rewritten":
+                section = event["section"]
+                status.update(label=f"Rewrote {section} {event['index'] + 1}")
+                if section == "objective":
+                    partial_results.markdown(f"**Objective:** {event['content']}")
+                elif section == "skills":
+                    for category in event["content"] or []:
+                        partial_results.markdown(f"**{category['category']} skills:** {', '.join(category['skills'])}")
+            elif name == "token_usage":
+                status.write(
+                    f"Prompt: {event['prompt_tokens']} tokens "
+                    f"({event['uncompacted_prompt_tokens']} before compaction), "
+                    f"completion: {event['completion_tokens']} tokens"
+                )
+            else:
+                label = EVENT_LABELS.get(name, name)
+                status.update(label=label)
+                status.write(label)
+    return {"event": "failed", "error": "The connection closed before the resume was finished."}
+
 # Input form
 with st.form(key="resume_form"):
     col1, col2 = st.columns(2)
@@ -67,6 +117,7 @@ if submit_button and (job_url.strip() or job_description.strip()):
     if not resume_file and not api_key:
         st.error("OpenAI API Key is required when no resume file is uploaded (to use the default resume with AI processing).")
     else:
+        st.session_state.review_job = None
         try:
             # Prepare data and file
             data = {
@@ -81,11 +132,42 @@ if submit_button and (job_url.strip() or job_description.strip()):
             if resume_file:
                 files["resume_file"] = (resume_file.name, resume_file.getvalue(), "application/pdf")
 
-            with st.spinner("Processing your resume..."):
-                # Use requests.post with 'data' for form fields and 'files' for file uploads
-                response = requests.post(API_URL, data=data, files=files, timeout=300)
+            # With manual review the API answers once the resume is tailored, with the YAML to review
+            if manual_review:
+                with st.spinner("Processing your resume..."):
+                    # Use requests.post with 'data' for form fields and 'files' for file uploads
+                    response = requests.post(API_URL, data=data, files=files, timeout=300)
+                if response.status_code == 202:
+                    st.session_state.review_job = response.json()
+                    st.session_state.success_message = (
+                        f"Review the tailored resume at {st.session_state.review_job['resume_location']}, then approve it below."
+                    )
+                    st.session_state.error_message = None
+                    st.session_state.download_file = None
+                    response = None
+            else:
+                data.pop("manual_review")
+                with st.status("Processing your resume...", expanded=True) as status:
+                    # Partial results are shown while the rest of the resume is tailored.
+                    # Leaving the page closes the stream, which cancels the job on the server.
+                    final_event = stream_tailoring(data, files, status, st.container())
+                    status.update(
+                        label=EVENT_LABELS.get(final_event["event"], final_event["event"].capitalize()),
+                        state="complete" if final_event["event"] == "completed" else "error",
+                    )
+                if final_event["event"] == "completed":
+                    response = requests.get(f"{BASE_URL}{final_event['pdf_url']}", timeout=60)
+                    if final_event["timings"].get("convert") is not None:
+                        response.headers["x-processing-time-yaml"] = str(final_event["timings"]["convert"])
+                else:
+                    response = None
+                    st.session_state.error_message = f"Error: {final_event.get('error') or 'Job ' + final_event['event']}"
+                    st.session_state.success_message = None
+                    st.session_state.download_file = None
 
-            if response.status_code == 200:
+            if response is None:
+                pass
+            elif response.status_code == 200:
                 # Extract filename from headers
                 content_disp = response.headers.get("Content-Disposition", "")
                 filename = "tailored_resume.pdf" # Default filename
@@ -124,6 +206,33 @@ if submit_button and (job_url.strip() or job_description.strip()):
             st.session_state.success_message = None
             st.session_state.download_file = None
 
+# Approve a reviewed resume and download its PDF
+if st.session_state.review_job and st.button("Approve and Generate PDF"):
+    review_job = st.session_state.review_job
+    try:
+        requests.post(f"{BASE_URL}{review_job['approve_url']}", timeout=60).raise_for_status()
+        with st.spinner("Rendering your resume..."):
+            job = requests.get(f"{BASE_URL}/jobs/{review_job['id']}", timeout=60).json()
+            while job["status"] not in ("completed", "failed", "cancelled"):
+                time.sleep(1)
+                job = requests.get(f"{BASE_URL}/jobs/{review_job['id']}", timeout=60).json()
+        if job["status"] == "completed":
+            response = requests.get(f"{BASE_URL}{review_job['pdf_url']}", timeout=60)
+            response.raise_for_status()
+            st.session_state.download_file = {
+                "content": response.content,
+                "filename": "tailored_resume.pdf",
+            }
+            st.session_state.success_message = "Resume generated successfully! Download the file below."
+            st.session_state.error_message = None
+        else:
+            st.session_state.error_message = f"Error: {job.get('error') or 'Job ' + job['status']}"
+            st.session_state.success_message = None
+    except requests.exceptions.RequestException as e:
+        st.session_state.error_message = f"Failed to approve the resume: {e}"
+        st.session_state.success_message = None
+    st.session_state.review_job = None
+
 # Show messages and download button
 if st.session_state.error_message:
     st.error(st.session_state.error_message)
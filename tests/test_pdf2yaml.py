@@ -0,0 +1,71 @@
+import unittest
+from .. import pdf2yaml
+from ..pdf2yaml import ConversionCache, OpenAIPDFToYAMLConverter
+from ..config import config
+from ..utils import utils
+from unittest import mock
+import os
+import shutil
+import tempfile
+
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, "resume.pdf")
+        shutil.copyfile(
+            os.path.join(config.TESTS_DATA_PATH, "John_Doe_resume.pdf"), self.pdf_path
+        )
+        self.cache = ConversionCache(os.path.join(self.tmp_dir.name, "cache"))
+        self.converter = OpenAIPDFToYAMLConverter(api_key="sk-test", cache=self.cache)
+        self.patches = [
+            mock.patch.object(
+                self.converter, "extract_text_from_pdf", return_value="John Doe"
+            ),
+            mock.patch.object(
+                self.converter,
+                "parse_resume_with_openai",
+                return_value={"basic": {"name": "John Doe"}, "objective": "Build things"},
+            ),
+        ]
+        self.extract_text, self.parse_resume = [patch.start() for patch in self.patches]
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _convert(self, name):
+        output_path = os.path.join(self.tmp_dir.name, name)
+        self.assertTrue(self.converter.convert_pdf_to_yaml(self.pdf_path, output_path))
+        return utils.read_yaml(filename=output_path)
+
+    def test_reupload_skips_extraction_and_openai_call(self):
+        first = self._convert("first.yaml")
+        second = self._convert("second.yaml")
+        self.assertEqual(second, first)
+        self.assertEqual(first["basic"]["name"], "John Doe")
+        self.assertEqual(self.extract_text.call_count, 1)
+        self.assertEqual(self.parse_resume.call_count, 1)
+
+    def test_other_pdf_or_converter_version_is_converted_again(self):
+        self._convert("first.yaml")
+        with open(self.pdf_path, "ab") as stream:
+            stream.write(b"\n%edited")
+        self._convert("edited.yaml")
+        self.assertEqual(self.parse_resume.call_count, 2)
+        with mock.patch.object(pdf2yaml, "converter_version", return_value="new prompt"):
+            self._convert("new_version.yaml")
+        self.assertEqual(self.parse_resume.call_count, 3)
+
+    def test_failed_conversions_are_not_cached(self):
+        self.parse_resume.return_value = None
+        output_path = os.path.join(self.tmp_dir.name, "failed.yaml")
+        self.assertFalse(self.converter.convert_pdf_to_yaml(self.pdf_path, output_path))
+        self.parse_resume.return_value = {"basic": {"name": "John Doe"}}
+        self._convert("retry.yaml")
+        self.assertEqual(self.parse_resume.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
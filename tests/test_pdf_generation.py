@@ -1,8 +1,15 @@
 import unittest
-from ..pdf_generation.resume_pdf_generator import ResumePDFGenerator
+from ..pdf_generation.resume_pdf_generator import ResumePDFGenerator, render_many
+from ..pdf_generation import resume_pdf_generator
+from ..pdf_generation.pdf_cache import RenderedPDFCache
+from ..pdf_generation.font_registry import FontRegistry
 from ..config import config
 from ..utils import utils
+from unittest import mock
+from reportlab.pdfbase import pdfmetrics, ttfonts
+import copy
 import os
+import tempfile
 
 
 class TestResumePDFGenerator(unittest.TestCase):
@@ -15,6 +22,180 @@ class TestResumePDFGenerator(unittest.TestCase):
         self.pdf_generator.generate_resume(job_data_location=file_path, data=data)
         self.assertTrue(os.path.exists(file_path))
 
+    def test_render_to_bytes_writes_no_file(self):
+        data = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+            resume_pdf_generator.config, "PDF_CACHE_ENABLED", False
+        ):
+            os.chdir(tmp_dir)
+            try:
+                for template_name in ResumePDFGenerator.TEMPLATES:
+                    if template_name == "try1":
+                        # Its single-cell table does not fit the sample resume on a page
+                        continue
+                    pdf = ResumePDFGenerator(template_name).render_to_bytes(data)
+                    self.assertTrue(pdf.startswith(b"%PDF-"), template_name)
+                    self.assertIn(b"%%EOF", pdf[-32:])
+                self.assertEqual(os.listdir(tmp_dir), [])
+            finally:
+                os.chdir(cwd)
+
+
+class TestRenderedPDFCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp_dir.name, "output")
+        os.makedirs(self.output_dir)
+        self.pdf_cache = RenderedPDFCache(os.path.join(self.tmp_dir.name, "cache"))
+        self.patch = mock.patch.object(resume_pdf_generator, "pdf_cache", self.pdf_cache)
+        self.patch.start()
+        self.data = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp_dir.cleanup()
+
+    def _render(self, template_name, data):
+        pdf_generator = ResumePDFGenerator(template_name)
+        with mock.patch.object(
+            pdf_generator, "_build_resume", wraps=pdf_generator._build_resume
+        ) as build_resume:
+            pdf_location = pdf_generator.generate_resume(self.output_dir, data)
+        return pdf_location, build_resume.call_count
+
+    def test_repeat_render_is_served_from_cache(self):
+        pdf_location, builds = self._render("classic", self.data)
+        self.assertEqual(builds, 1)
+        with open(pdf_location, "rb") as stream:
+            rendered = stream.read()
+        os.remove(pdf_location)
+
+        pdf_location, builds = self._render("classic", copy.deepcopy(self.data))
+        self.assertEqual(builds, 0)
+        with open(pdf_location, "rb") as stream:
+            self.assertEqual(stream.read(), rendered)
+
+    def test_render_into_folder_of_cache_hit_keeps_cache_entry(self):
+        pdf_location, _ = self._render("classic", self.data)
+        with open(pdf_location, "rb") as stream:
+            rendered = stream.read()
+        self.assertEqual(self._render("classic", self.data), (pdf_location, 0))
+
+        # Same file name, different resume, rendered over the cache hit
+        changed = copy.deepcopy(self.data)
+        changed["objective"] = "A different objective."
+        self.assertEqual(self._render("classic", changed), (pdf_location, 1))
+        key = self.pdf_cache.make_key(
+            "classic", ResumePDFGenerator.TEMPLATES["classic"], self.data
+        )
+        self.assertEqual(self.pdf_cache.fetch_bytes(key), rendered)
+
+    def test_in_memory_render_does_not_touch_the_cache(self):
+        pdf = ResumePDFGenerator("classic").render_to_bytes(self.data)
+        self.assertTrue(pdf.startswith(b"%PDF-"))
+        self.assertFalse(os.path.exists(self.pdf_cache.cache_dir))
+
+    def test_changed_data_or_template_is_rendered(self):
+        self._render("classic", self.data)
+        changed = copy.deepcopy(self.data)
+        changed["objective"] = "A different objective."
+        self.assertEqual(self._render("classic", changed)[1], 1)
+        self.assertEqual(self._render("minimal", self.data)[1], 1)
+
+    def test_least_recently_used_pdfs_are_evicted(self):
+        pdf_location, _ = self._render("classic", self.data)
+        self.pdf_cache.max_bytes = os.path.getsize(pdf_location) + 1
+        first_key = self.pdf_cache.make_key(
+            "classic", ResumePDFGenerator.TEMPLATES["classic"], self.data
+        )
+        self._render("minimal", self.data)
+        self.assertFalse(self.pdf_cache.fetch(first_key, pdf_location))
+
+    def test_eviction_does_not_rescan_the_cache(self):
+        pdf_location, _ = self._render("classic", self.data)
+        size = os.path.getsize(pdf_location)
+        # A new cache instance reads what is already on disk, once
+        self.pdf_cache = RenderedPDFCache(self.pdf_cache.cache_dir, max_bytes=size * 10)
+        with mock.patch.object(resume_pdf_generator, "pdf_cache", self.pdf_cache):
+            with mock.patch.object(os, "scandir", wraps=os.scandir) as scandir:
+                for template_name in ("minimal", "modern", "elegant"):
+                    self._render(template_name, self.data)
+        self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(
+            self.pdf_cache._total_bytes,
+            sum(entry.stat().st_size for entry in os.scandir(self.pdf_cache.cache_dir)),
+        )
+
+
+class TestRenderMany(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_each_template_gets_its_own_pdf(self):
+        template_names = ["classic", "minimal", "modern", "technical"]
+        locations = render_many(self.data, template_names, self.tmp_dir.name)
+        self.assertEqual(list(locations), template_names)
+        self.assertEqual(len(set(locations.values())), len(template_names))
+        for template_name, pdf_location in locations.items():
+            self.assertTrue(os.path.exists(pdf_location))
+            self.assertEqual(
+                os.path.basename(os.path.dirname(pdf_location)), template_name
+            )
+
+    def test_without_location_pdfs_are_returned_in_memory(self):
+        pdfs = render_many(self.data, ["classic", "minimal"])
+        self.assertEqual(list(pdfs), ["classic", "minimal"])
+        for pdf in pdfs.values():
+            self.assertTrue(pdf.startswith(b"%PDF-"))
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_unknown_template(self):
+        with self.assertRaises(ValueError):
+            render_many(self.data, ["classic", "missing"], self.tmp_dir.name)
+
+
+class TestFontRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = FontRegistry()
+        self.font_path = os.path.join(config.RESOURCES_PATH, "fonts/calibri.ttf")
+
+    def test_font_file_is_parsed_once(self):
+        with mock.patch.object(ttfonts, "TTFont", wraps=ttfonts.TTFont) as ttfont:
+            for _ in range(3):
+                self.registry.register("TestRegistry-Calibri", self.font_path)
+        ttfont.assert_called_once()
+        self.assertTrue(self.registry.is_registered("TestRegistry-Calibri"))
+
+    def test_font_registered_directly_with_reportlab(self):
+        pdfmetrics.registerFont(ttfonts.TTFont("TestRegistry-Direct", self.font_path))
+        self.assertTrue(self.registry.is_registered("TestRegistry-Direct"))
+        self.assertFalse(self.registry.is_registered("TestRegistry-Unknown"))
+        with mock.patch.object(ttfonts, "TTFont", wraps=ttfonts.TTFont) as ttfont:
+            self.registry.register("TestRegistry-Direct", self.font_path)
+        ttfont.assert_not_called()
+
+    def test_name_reused_for_another_file(self):
+        self.registry.register("TestRegistry-Conflict", self.font_path)
+        with self.assertRaises(ValueError):
+            self.registry.register(
+                "TestRegistry-Conflict",
+                os.path.join(config.RESOURCES_PATH, "fonts/calibrib.ttf"),
+            )
+
+    def test_missing_font_falls_back_to_builtin(self):
+        self.registry.register("TestRegistry-Missing", "missing.ttf", "bold")
+        font = pdfmetrics.getFont("TestRegistry-Missing")
+        self.assertEqual(font.face.name, "Helvetica-Bold")
+
+    def test_template_font_names_are_unique_per_file(self):
+        registry = FontRegistry()
+        registry.preload(ResumePDFGenerator.TEMPLATES.values())
+
 
 if __name__ == "__main__":
     unittest.main()
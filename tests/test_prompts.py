@@ -2,6 +2,7 @@ import unittest
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 from ..prompts.prompts import Prompts
+from unittest import mock
 
 PROMPT_GROUPS = ["IMPROVER", "SECTION_HIGHLIGHTER", "SKILLS_MATCHER", "OBJECTIVE_WRITER"]
 
@@ -33,6 +34,17 @@ class TestPrompts(unittest.TestCase):
             self.assertIsInstance(Prompts.descriptions[description], dict)
             self.assertGreater(len(Prompts.descriptions[description]), 0)
 
+    def test_chat_prompts_are_compiled(self):
+        for prompt_group in PROMPT_GROUPS:
+            self.assertIsInstance(Prompts.chat_prompts[prompt_group], ChatPromptTemplate)
+
+    def test_initialize_loads_once(self):
+        chat_prompts = Prompts.chat_prompts
+        with mock.patch.object(Prompts, "_load_prompts") as load_prompts:
+            Prompts.initialize()
+        load_prompts.assert_not_called()
+        self.assertIs(Prompts.chat_prompts, chat_prompts)
+
 
 if __name__ == "__main__":
     unittest.main()
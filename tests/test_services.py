@@ -2,12 +2,53 @@ import unittest
 from ..services.resume_improver import ResumeImprover
 from ..services.langchain_helpers import (
     create_llm,
+    create_structured_chain,
     format_list_as_string,
     format_prompt_inputs_as_strings,
     parse_date,
     datediff_years,
 )
+from ..services.job_queue import AwaitReview, Job, JobQueue
+from ..services import job_queue as job_queue_module
+from ..services.review import ReviewGate
+from ..services.background_runner import BackgroundRunner, BackgroundTask, current_task
+from ..services.job_store import JobStore
+from ..services import llm_dispatcher
+from ..services.llm_dispatcher import LLMDispatcher
+from ..services.single_flight import SingleFlight
+from ..services.llm_cache import PersistentLLMCache
+from ..services.job_index import JobPostIndex, hash_job_post
+from ..services import resume_improver as resume_improver_module
+from ..services import langchain_helpers
+from ..services.http_client import close_http_session
+from ..services.request_limits import RequestSizeLimitMiddleware
+from ..prompts.prompts import Prompts
+from ..services.fake_chat_model import FakeChatModel
+from ..services.prompt_compaction import (
+    compact_job_post,
+    count_tokens,
+    extract_job_post_text,
+    format_parsed_job,
+)
+from ..models.job_post import JobDescription, JobPost
+from unittest import mock
+from aiohttp import web
+from fastapi import FastAPI, File, UploadFile
+from langchain_community.cache import InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+import threading
+import logging
+import asyncio
+import copy
+import os
+import tempfile
+import time
 from ..config import config
+from ..utils import utils
 
 
 class TestResumeImproverExtractor(unittest.TestCase):
@@ -16,6 +57,7 @@ class TestResumeImproverExtractor(unittest.TestCase):
             "https://takline.github.io/ResumeGPT/tests/test_data/example_job_posting"
         )
         self.resume_improver = ResumeImprover(self.url)
+        self.resume_improver.parse_job()
 
     def test_download_and_parse_job_post(self):
         #self.resume_improver.download_and_parse_job_post()
@@ -122,6 +164,1272 @@ class TestLangchainHelpers(unittest.TestCase):
         llm = create_llm()
         self.assertIsNotNone(llm)
 
+    def test_llm_clients_are_pooled(self):
+        llm = create_llm(temperature=0.1, api_key="sk-pool")
+        self.assertIs(create_llm(temperature=0.1, api_key="sk-pool"), llm)
+        self.assertIsNot(create_llm(temperature=0.1, api_key="sk-other"), llm)
+        self.assertIsNot(create_llm(temperature=0.2, api_key="sk-pool"), llm)
+
+    def test_llm_clients_are_pooled_per_event_loop(self):
+        async def create():
+            return create_llm(temperature=0.1, api_key="sk-loop"), create_llm(
+                temperature=0.1, api_key="sk-loop"
+            )
+
+        first, same_loop = asyncio.run(create())
+        self.assertIs(same_loop, first)
+        second, _ = asyncio.run(create())
+        self.assertIsNot(second, first)
+        self.assertIsNot(create_llm(temperature=0.1, api_key="sk-loop"), first)
+        # The instances of closed loops are dropped from the pool
+        self.assertNotIn(first, langchain_helpers._llm_pool.values())
+
+    def test_unhashable_llm_settings_are_not_pooled(self):
+        kwargs = dict(chat_model=FakeListChatModel, responses=["a"], cache=False)
+        self.assertIsNot(create_llm(**kwargs), create_llm(**kwargs))
+
+    def test_structured_chains_are_reused(self):
+        prompt = Prompts.chat_prompts["SKILLS_MATCHER"]
+        schema = resume_improver_module.ResumeSkillsMatcherOutput
+        chain = create_structured_chain(prompt, schema, temperature=0.1)
+        self.assertIs(create_structured_chain(prompt, schema, temperature=0.1), chain)
+        self.assertIsNot(create_structured_chain(prompt, schema, temperature=0.2), chain)
+
+    def test_unparseable_date_keeps_llm_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = PersistentLLMCache(database_path=os.path.join(tmp_dir, "llm_cache.sqlite3"))
+            cache.update("prompt", "gpt-4o", [ChatGeneration(message=AIMessage(content="answer"))])
+            previous_cache = get_llm_cache()
+            set_llm_cache(cache)
+            try:
+                with self.assertRaises(ValueError):
+                    parse_date("not a date")
+            finally:
+                set_llm_cache(previous_cache)
+            self.assertIsNotNone(cache.lookup("prompt", "gpt-4o"))
+
+
+class RateLimitError(Exception):
+    """Stands in for `openai.RateLimitError`."""
+
+    def __init__(self, retry_after):
+        super().__init__("Rate limit reached")
+        self.status_code = 429
+        self.response = mock.Mock(status_code=429, headers={"retry-after": str(retry_after)})
+
+
+class TestLLMDispatcher(unittest.TestCase):
+    def test_rate_limited_call_is_retried_with_less_concurrency(self):
+        dispatcher = LLMDispatcher(max_concurrency=4)
+        errors = [RateLimitError(0.05)]
+
+        def call(inputs):
+            if errors:
+                raise errors.pop()
+            return inputs["text"].upper()
+
+        start = time.monotonic()
+        self.assertEqual(dispatcher.invoke(RunnableLambda(call), {"text": "ok"}), "OK")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        stats = dispatcher.stats()
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["concurrency_limit"], 2)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_other_errors_are_not_retried(self):
+        dispatcher = LLMDispatcher()
+        calls = []
+
+        def call(inputs):
+            calls.append(inputs)
+            raise ValueError("bad output")
+
+        with self.assertRaises(ValueError):
+            dispatcher.invoke(RunnableLambda(call), "input")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(dispatcher.stats()["in_flight"], 0)
+
+    def test_interactive_calls_are_dispatched_before_background_calls(self):
+        dispatcher = LLMDispatcher(max_concurrency=1)
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def hold(inputs):
+            started.set()
+            release.wait(5)
+
+        def call(name, level):
+            with llm_dispatcher.priority(level):
+                dispatcher.invoke(RunnableLambda(lambda inputs: order.append(inputs)), name)
+
+        holder = threading.Thread(target=dispatcher.invoke, args=(RunnableLambda(hold), "hold"))
+        holder.start()
+        self.assertTrue(started.wait(5))
+        threads = [
+            threading.Thread(target=call, args=("background", llm_dispatcher.BACKGROUND)),
+            threading.Thread(target=call, args=("interactive", llm_dispatcher.INTERACTIVE)),
+        ]
+        for thread in threads:
+            thread.start()
+            while dispatcher.stats()["queued"] < threads.index(thread) + 1:
+                time.sleep(0.01)
+        stats = dispatcher.stats()
+        self.assertEqual((stats["queued_interactive"], stats["queued_background"]), (1, 1))
+        release.set()
+        for thread in [holder] + threads:
+            thread.join(5)
+        self.assertEqual(order, ["interactive", "background"])
+
+    def test_requests_per_minute_budget_queues_calls(self):
+        dispatcher = LLMDispatcher(requests_per_minute=1)
+        runnable = RunnableLambda(lambda inputs: inputs)
+
+        async def run():
+            self.assertEqual(await dispatcher.ainvoke(runnable, "first"), "first")
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(dispatcher.ainvoke(runnable, "second"), 0.1)
+
+        asyncio.run(run())
+        stats = dispatcher.stats()
+        self.assertEqual((stats["queued"], stats["in_flight"]), (0, 0))
+
+    def test_structured_chains_go_through_the_dispatcher(self):
+        dispatcher = LLMDispatcher()
+        prompt = Prompts.chat_prompts["SKILLS_MATCHER"]
+        schema = resume_improver_module.ResumeSkillsMatcherOutput
+        chain = create_structured_chain(
+            prompt, schema, chat_model=FakeChatModel, latency=0, cache=False
+        )
+        inputs = {name: "python" for name in prompt.input_variables}
+        with mock.patch.object(dispatcher, "call", wraps=dispatcher.call) as call:
+            with mock.patch.object(langchain_helpers.llm_dispatcher, "dispatcher", dispatcher):
+                self.assertIsInstance(chain.invoke(inputs), schema)
+        call.assert_called_once()
+
+    def test_cache_hits_skip_the_dispatcher(self):
+        dispatcher = LLMDispatcher(requests_per_minute=1)
+        llm = create_llm(chat_model=FakeListChatModel, responses=["first", "second"], cache=InMemoryCache())
+
+        async def run():
+            self.assertEqual((await llm.ainvoke("hello")).content, "first")
+            # The request budget is spent, but the cached response needs none
+            self.assertEqual((await asyncio.wait_for(llm.ainvoke("hello"), 1)).content, "first")
+
+        with mock.patch.object(dispatcher, "call", wraps=dispatcher.call) as call:
+            with mock.patch.object(langchain_helpers.llm_dispatcher, "dispatcher", dispatcher):
+                self.assertEqual(llm.invoke("hello").content, "first")
+                asyncio.run(run())
+        call.assert_called_once()
+
+    def test_openai_clients_leave_retries_to_the_dispatcher(self):
+        llm = create_llm(temperature=0.1, api_key="sk-retries")
+        self.assertEqual(llm.max_retries, 0)
+        self.assertEqual(type(llm).__name__, "ChatOpenAI")
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_run(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight.do("key", compute)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while not calls:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("result", False), ("result", True), ("result", True)])
+        self.assertEqual(single_flight.in_flight(), 0)
+        self.assertEqual(single_flight.do("key", lambda: "again"), ("again", False))
+
+    def test_errors_are_shared(self):
+        single_flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("extraction failed")
+
+        async def run():
+            return await asyncio.gather(
+                single_flight.ado("key", fail),
+                single_flight.ado("key", fail),
+                return_exceptions=True,
+            )
+
+        errors = asyncio.run(run())
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        self.assertIs(errors[0], errors[1])
+
+    def test_waiting_caller_takes_over_from_a_cancelled_one(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        async def compute():
+            runs.append(1)
+            await asyncio.sleep(0.1)
+            return len(runs)
+
+        async def run():
+            leader = asyncio.ensure_future(single_flight.ado("key", compute))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(single_flight.ado("key", compute))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(run()), (2, False))
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.job_queue = JobQueue(max_workers=2)
+
+    def tearDown(self):
+        self.job_queue.shutdown()
+
+    def test_submit_records_stage_timings(self):
+        def pipeline(job, value):
+            with job.track_stage("parse"):
+                pass
+            with job.track_stage("render"):
+                return value * 2
+
+        job = self.job_queue.submit(pipeline, value=21)
+        job.future.result(timeout=5)
+        self.assertIs(self.job_queue.get(job.id), job)
+        self.assertEqual(job.status, Job.COMPLETED)
+        self.assertEqual(job.result, 42)
+        self.assertIn("parse", job.to_dict()["timings"])
+        self.assertIn("render", job.to_dict()["timings"])
+
+    def test_failed_job_records_error(self):
+        def pipeline(job):
+            raise ValueError("boom")
+
+        job = self.job_queue.submit(pipeline)
+        job.future.result(timeout=5)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.job_queue.get("missing"))
+
+    def test_async_job_emits_events_and_can_be_cancelled(self):
+        started = []
+
+        async def pipeline(job):
+            job.emit("fetched", url="https://example.com/job")
+            started.append(job.id)
+            await asyncio.sleep(10)
+
+        async def run_and_cancel():
+            job = self.job_queue.submit_async(pipeline)
+            while not started:
+                await asyncio.sleep(0)
+            self.assertTrue(self.job_queue.cancel(job.id))
+            with self.assertRaises(asyncio.CancelledError):
+                await job.future
+            return job
+
+        job = asyncio.run(run_and_cancel())
+        self.assertEqual(job.status, Job.CANCELLED)
+        self.assertEqual(job.to_dict()["events"][0]["event"], "fetched")
+        self.assertFalse(self.job_queue.cancel(job.id))
+
+    def test_finished_jobs_expire_without_new_submissions(self):
+        job_queue = JobQueue(max_workers=1, retention_seconds=0.01)
+        self.addCleanup(job_queue.shutdown)
+        job = job_queue.submit(lambda job: "done")
+        job.future.result(timeout=5)
+
+        async def prune():
+            task = asyncio.create_task(job_queue.prune_periodically(0.01))
+            while job_queue.get(job.id) is not None:
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(prune(), timeout=5))
+        self.assertIsNone(job_queue.get(job.id))
+
+    def test_renders_are_bounded_by_size(self):
+        job = Job()
+        with mock.patch.object(job_queue_module.config, "JOB_RENDERS_MAX_BYTES", 250):
+            job.keep_render("classic", b"a" * 100)
+            job.keep_render("minimal", b"b" * 100)
+            job.keep_render("classic", b"c" * 100)
+            job.keep_render("modern", b"d" * 100)
+            self.assertEqual(list(job.renders), ["classic", "modern"])
+            self.assertEqual(job.renders["classic"], b"c" * 100)
+            # The newest render is kept even on its own over the limit
+            job.keep_render("elegant", b"e" * 300)
+        self.assertEqual(list(job.renders), ["elegant"])
+
+
+class TestManualReview(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resume_location = os.path.join(self.tmp_dir.name, "resume.yaml")
+        utils.write_yaml({"editing": True, "objective": "Draft"}, filename=self.resume_location)
+        self.job_queue = JobQueue(max_workers=1)
+
+    def tearDown(self):
+        self.job_queue.shutdown()
+        self.tmp_dir.cleanup()
+
+    def _save_reviewed_resume(self, delay=0.1):
+        def save():
+            time.sleep(delay)
+            utils.write_yaml({"editing": False, "objective": "Edited"}, filename=self.resume_location)
+
+        threading.Thread(target=save, daemon=True).start()
+
+    def test_review_ends_when_resume_is_saved(self):
+        self._save_reviewed_resume()
+        start = time.perf_counter()
+        self.assertTrue(ReviewGate().wait(self.resume_location, timeout=5))
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_review_timeout(self):
+        self.assertFalse(ReviewGate().wait(self.resume_location, timeout=0.1))
+
+    def test_parked_job_releases_worker(self):
+        def pipeline(job):
+            return AwaitReview(self.resume_location, lambda job: "rendered")
+
+        job = self.job_queue.submit(pipeline)
+        job.future.result(timeout=5)
+        self.assertEqual(job.status, Job.AWAITING_REVIEW)
+
+        # The only worker is free for other jobs during the review
+        other_job = self.job_queue.submit(lambda job: "done")
+        self.assertEqual(other_job.future.result(timeout=5), "done")
+
+        self.assertTrue(self.job_queue.approve(job.id))
+        job.future.result(timeout=5)
+        self.assertEqual((job.status, job.result), (Job.COMPLETED, "rendered"))
+        self.assertIn("review", job.timings)
+        self.assertEqual(
+            [event["event"] for event in job.events], ["awaiting_review", "reviewed"]
+        )
+        self.assertFalse(self.job_queue.approve(job.id))
+
+    def test_parked_job_can_be_cancelled(self):
+        job = self.job_queue.submit(
+            lambda job: AwaitReview(self.resume_location, lambda job: "rendered")
+        )
+        job.future.result(timeout=5)
+        self.assertTrue(self.job_queue.cancel(job.id))
+        self.assertEqual(job.status, Job.CANCELLED)
+        self.assertFalse(self.job_queue.approve(job.id))
+
+    def test_async_job_waits_for_approval(self):
+        async def pipeline(job):
+            await job.await_review(self.resume_location)
+            return "rendered"
+
+        async def run_and_approve():
+            job = self.job_queue.submit_async(pipeline)
+            while job.status != Job.AWAITING_REVIEW or job.review.resume_location is None:
+                await asyncio.sleep(0.01)
+            self.assertTrue(self.job_queue.approve(job.id))
+            return job, await job.future
+
+        job, result = asyncio.run(run_and_approve())
+        self.assertEqual((job.status, result), (Job.COMPLETED, "rendered"))
+
+
+class TestBackgroundRunner(unittest.TestCase):
+    def setUp(self):
+        self.background_runner = BackgroundRunner(max_workers=2)
+
+    def tearDown(self):
+        self.background_runner.stop_all_tasks()
+        self.background_runner.shutdown()
+
+    def test_many_tasks_use_bounded_workers(self):
+        threads = set()
+
+        def task(value):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.001)
+            return value * 2
+
+        tasks = [self.background_runner.run_in_background(task, i) for i in range(100)]
+        self.assertEqual([task.result(timeout=5) for task in tasks], [i * 2 for i in range(100)])
+        self.assertLessEqual(len(threads), 2)
+        statuses = self.background_runner.check_status()
+        self.assertEqual({status["status"] for status in statuses}, {BackgroundTask.COMPLETED})
+        self.assertIsNotNone(statuses[0]["run_time"])
+
+    def test_exceptions_are_captured(self):
+        def task():
+            raise ValueError("boom")
+
+        task = self.background_runner.run_in_background(task)
+        with self.assertRaises(ValueError):
+            task.result(timeout=5)
+        self.assertEqual(task.to_dict()["status"], BackgroundTask.FAILED)
+        self.assertEqual(task.to_dict()["error"], "boom")
+
+    def test_priority_and_cancellation(self):
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def blocker():
+            started.set()
+            while not current_task().cancel_requested:
+                release.wait(0.01)
+
+        runner = BackgroundRunner(max_workers=1)
+        blocking_task = runner.run_in_background(blocker)
+        started.wait(5)
+        low = runner.run_in_background(order.append, "low", priority=5)
+        high = runner.run_in_background(order.append, "high", priority=1)
+        skipped = runner.run_in_background(order.append, "skipped", priority=0)
+        self.assertTrue(skipped.cancel())
+        self.assertTrue(blocking_task.cancel())
+        self.assertTrue(runner.wait(timeout=5))
+        runner.shutdown()
+        self.assertEqual(order, ["high", "low"])
+        self.assertEqual(blocking_task.status, BackgroundTask.CANCELLED)
+        self.assertEqual(skipped.status, BackgroundTask.CANCELLED)
+
+    def test_log_handler_is_added_once(self):
+        BackgroundRunner().shutdown()
+        file_handlers = [
+            handler
+            for handler in self.background_runner.logger.handlers
+            if isinstance(handler, logging.FileHandler)
+        ]
+        self.assertEqual(len(file_handlers), 1)
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.job_store = JobStore(os.path.join(self.tmp_dir.name, "jobs.sqlite3"))
+        self.parsed_urls = []
+        self.tailored_urls = []
+        self.failing_urls = set()
+        self.patches = [
+            mock.patch.object(
+                resume_improver_module,
+                "job_post_index",
+                JobPostIndex(os.path.join(self.tmp_dir.name, "job_index.sqlite3")),
+            ),
+            mock.patch.object(resume_improver_module.config, "DATA_PATH", self.tmp_dir.name),
+            mock.patch.object(
+                ResumeImprover, "_download_indexed_job_post", self._fake_download
+            ),
+            mock.patch.object(
+                ResumeImprover,
+                "_parse_job_post_raw",
+                lambda resume_improver: self._fake_parse(resume_improver),
+            ),
+            mock.patch.object(
+                ResumeImprover,
+                "_tailor",
+                lambda resume_improver, logger=None: self._fake_tailor(resume_improver),
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _fake_download(resume_improver):
+        resume_improver.job_post_raw = f"Posting {resume_improver.url}"
+        return False
+
+    def _fake_parse(self, resume_improver):
+        self.parsed_urls.append(resume_improver.url)
+        resume_improver.parsed_job = {
+            "company": "Example",
+            "job_title": resume_improver.url.rsplit("/", 1)[-1],
+        }
+        resume_improver._save_parsed_job()
+
+    def _fake_tailor(self, resume_improver):
+        if resume_improver.url in self.failing_urls:
+            raise RuntimeError("worker crashed")
+        self.tailored_urls.append(resume_improver.url)
+        resume_improver.yaml_loc = os.path.join(resume_improver.job_data_location, "resume.yaml")
+        utils.write_yaml({"editing": True, "objective": "Tailored"}, filename=resume_improver.yaml_loc)
+        resume_improver.resume_yaml = utils.read_yaml(filename=resume_improver.yaml_loc)
+        return resume_improver.resume_yaml
+
+    def _run_batch(self, background_configs):
+        output = ResumeImprover.create_draft_tailored_resumes_in_background(
+            background_configs, job_store=self.job_store
+        )
+        output["background_runner"].wait(timeout=10)
+        output["background_runner"].shutdown()
+        return output
+
+    def test_add_job_is_idempotent(self):
+        job = self.job_store.add_job("batch", 0, {"url": "https://example.com/a"})
+        self.job_store.complete_stage(job["id"], "parse_job", "/data/a", 1.5)
+        self.job_store.set_status(job["id"], JobStore.FAILED, error="boom")
+        job = self.job_store.add_job("batch", 0, {"url": "https://example.com/a"})
+        self.assertEqual(job["status"], JobStore.FAILED)
+        self.assertEqual(job["error"], "boom")
+        self.assertEqual(job["stages"], {"parse_job": "/data/a"})
+        self.assertEqual([job["id"] for job in self.job_store.batch_jobs("batch")], ["batch:0"])
+
+    def test_interrupted_batch_resumes(self):
+        background_configs = [
+            {"url": "https://example.com/jobs/a", "manual_review": False},
+            {"url": "https://example.com/jobs/b", "manual_review": False},
+        ]
+        self.failing_urls.add("https://example.com/jobs/b")
+        output = self._run_batch(background_configs)
+        statuses = [job["status"] for job in self.job_store.batch_jobs(output["batch_id"])]
+        self.assertEqual(statuses, [JobStore.COMPLETED, JobStore.FAILED])
+        self.assertEqual(len(self.parsed_urls), 2)
+
+        # The rerun skips the finished job and only tailors the other one
+        self.failing_urls.clear()
+        output = ResumeImprover.resume_background_batch(
+            output["batch_id"], job_store=self.job_store
+        )
+        output["background_runner"].wait(timeout=10)
+        self.assertEqual(len(self.parsed_urls), 2)
+        self.assertEqual(self.tailored_urls, [background_config["url"] for background_config in background_configs])
+        jobs = self.job_store.batch_jobs(output["batch_id"])
+        self.assertEqual([job["status"] for job in jobs], [JobStore.COMPLETED] * 2)
+        self.assertEqual(
+            [resume_improver.resume_yaml["objective"] for resume_improver in output["ResumeImprovers"]],
+            ["Tailored", "Tailored"],
+        )
+        self.assertEqual(set(jobs[1]["stages"]), {"parse_job", "tailor"})
+
+    def test_edited_resume_is_tailored_again(self):
+        resume_location = os.path.join(self.tmp_dir.name, "resume.yaml")
+        resume = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+        utils.write_yaml(resume, filename=resume_location)
+        background_configs = [
+            {"url": "https://example.com/jobs/a", "manual_review": False, "resume_location": resume_location},
+        ]
+        self._run_batch(background_configs)
+        self._run_batch(background_configs)
+        self.assertEqual(len(self.tailored_urls), 1)
+
+        # Same batch, but the resume at the same path changed
+        resume["objective"] = "Edited objective"
+        utils.write_yaml(resume, filename=resume_location)
+        output = self._run_batch(background_configs)
+        self.assertEqual(len(self.tailored_urls), 2)
+        self.assertEqual(len(self.parsed_urls), 1)
+        self.assertEqual(output["ResumeImprovers"][0].resume["objective"], "Edited objective")
+
+    def test_overwritten_tailored_resume_is_tailored_again(self):
+        background_configs = [{"url": "https://example.com/jobs/a", "manual_review": False}]
+        output = self._run_batch(background_configs)
+        # Another run tailoring the same job post overwrites the shared resume.yaml
+        utils.write_yaml(
+            {"editing": True, "objective": "Other run"},
+            filename=output["ResumeImprovers"][0].yaml_loc,
+        )
+        self._run_batch(background_configs)
+        self.assertEqual(len(self.tailored_urls), 2)
+
+
+class TestPersistentLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.tmp_dir.name, "llm_cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookup_and_update(self):
+        cache = PersistentLLMCache(database_path=self.database_path)
+        self.assertIsNone(cache.lookup("prompt", "gpt-4o"))
+        cache.update("prompt", "gpt-4o", [ChatGeneration(message=AIMessage(content="answer"))])
+        self.assertEqual(cache.lookup("prompt", "gpt-4o")[0].text, "answer")
+        self.assertIsNone(cache.lookup("prompt", "gpt-4o-mini"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_shared_across_instances(self):
+        PersistentLLMCache(database_path=self.database_path).update(
+            "prompt", "gpt-4o", [ChatGeneration(message=AIMessage(content="answer"))]
+        )
+        cache = PersistentLLMCache(database_path=self.database_path)
+        self.assertEqual(cache.lookup("prompt", "gpt-4o")[0].text, "answer")
+
+    def test_ttl_expiry(self):
+        cache = PersistentLLMCache(database_path=self.database_path, ttl_seconds=1)
+        cache.update("prompt", "gpt-4o", [ChatGeneration(message=AIMessage(content="answer"))])
+        cache.ttl_seconds = 0.000001
+        time.sleep(0.01)
+        self.assertIsNone(cache.lookup("prompt", "gpt-4o"))
+
+    def test_lru_eviction(self):
+        cache = PersistentLLMCache(database_path=self.database_path, max_entries=2)
+        cache.update("first", "gpt-4o", [ChatGeneration(message=AIMessage(content="1"))])
+        cache.update("second", "gpt-4o", [ChatGeneration(message=AIMessage(content="2"))])
+        cache.lookup("first", "gpt-4o")
+        cache.update("third", "gpt-4o", [ChatGeneration(message=AIMessage(content="3"))])
+        self.assertIsNone(cache.lookup("second", "gpt-4o"))
+        self.assertIsNotNone(cache.lookup("first", "gpt-4o"))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_chat_model_uses_cache(self):
+        cache = PersistentLLMCache(database_path=self.database_path)
+        llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+        self.assertEqual(llm.invoke("hello").content, "first")
+        self.assertEqual(llm.invoke("hello").content, "first")
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+class TestJobPostIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = JobPostIndex(
+            index_path=os.path.join(self.tmp_dir.name, "job_index.sqlite3")
+        )
+        self.job_data_location = os.path.join(self.tmp_dir.name, "Example_Engineer")
+        self.job_post_raw = "Example Corp is hiring a Software Engineer."
+        self.parsed_job = {"company": "Example Corp", "job_title": "Software Engineer"}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_and_lookup(self):
+        text_hash = hash_job_post(self.job_post_raw)
+        self.index.save(self.job_data_location, self.parsed_job, self.job_post_raw)
+        self.index.record(
+            self.job_data_location, text_hash, url="https://example.com/job", etag='"v1"'
+        )
+        self.assertEqual(self.index.lookup_url("https://example.com/job")["etag"], '"v1"')
+        self.assertEqual(self.index.lookup_text(text_hash), self.job_data_location)
+        parsed_job, job_post_raw, job_post_html_data = self.index.load(
+            self.job_data_location
+        )
+        self.assertEqual(parsed_job, self.parsed_job)
+        self.assertEqual(job_post_raw, self.job_post_raw)
+        self.assertIsNone(job_post_html_data)
+
+    def test_overwritten_folder_is_not_reused(self):
+        text_hash = hash_job_post(self.job_post_raw)
+        self.index.save(self.job_data_location, self.parsed_job, self.job_post_raw)
+        self.index.record(self.job_data_location, text_hash)
+        self.index.save(self.job_data_location, self.parsed_job, "A different posting.")
+        self.assertIsNone(self.index.lookup_text(text_hash))
+
+    def test_save_replaces_files_atomically(self):
+        html = "<html><body>Example Corp is hiring.</body></html>"
+        self.index.save(self.job_data_location, self.parsed_job, self.job_post_raw, html)
+        self.assertEqual(self.index.load(self.job_data_location)[2], html)
+        with mock.patch("os.replace", wraps=os.replace) as replace:
+            self.index.save(self.job_data_location, self.parsed_job, "A different posting.")
+        self.assertEqual(
+            sorted(os.path.basename(call.args[1]) for call in replace.call_args_list),
+            [JobPostIndex.JOB_FILENAME, JobPostIndex.TEXT_FILENAME],
+        )
+        self.assertEqual(
+            self.index.load(self.job_data_location)[1:], ("A different posting.", None)
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.job_data_location)),
+            [JobPostIndex.JOB_FILENAME, JobPostIndex.TEXT_FILENAME],
+        )
+
+    def test_shared_across_instances(self):
+        text_hash = hash_job_post(self.job_post_raw)
+        self.index.save(self.job_data_location, self.parsed_job, self.job_post_raw)
+        self.index.record(self.job_data_location, text_hash, url="https://example.com/job")
+        index = JobPostIndex(index_path=self.index.index_path)
+        self.assertEqual(index.lookup_url("https://example.com/job")["text_hash"], text_hash)
+
+    def test_reuse_skips_writes_until_the_entry_expires(self):
+        url = "https://example.com/job"
+        self.index.save(self.job_data_location, self.parsed_job, self.job_post_raw)
+        self.index.record(self.job_data_location, hash_job_post(self.job_post_raw), url=url, etag='"v1"')
+        downloads = []
+
+        def fake_download(resume_improver, request_headers=None):
+            downloads.append(request_headers)
+            resume_improver.job_post_not_modified = True
+            resume_improver.job_post_response_headers = {"ETag": '"v1"'}
+
+        with mock.patch.object(
+            resume_improver_module, "job_post_index", self.index
+        ), mock.patch.object(
+            ResumeImprover, "_download_url", fake_download
+        ), mock.patch.object(
+            self.index, "record", wraps=self.index.record
+        ) as record:
+            self.assertTrue(ResumeImprover(url=url)._download_indexed_job_post())
+            self.assertEqual((downloads, record.call_count), ([], 0))
+
+            # Once expired, the posting is revalidated and its entry refreshed
+            self.index.ttl_seconds = 0.000001
+            time.sleep(0.01)
+            resume_improver = ResumeImprover(url=url)
+            self.assertTrue(resume_improver._download_indexed_job_post())
+        self.assertEqual(downloads, [{"If-None-Match": '"v1"'}])
+        self.assertEqual(record.call_count, 1)
+        self.assertEqual(resume_improver.parsed_job, self.parsed_job)
+
+    def test_repeat_job_description_is_not_reparsed(self):
+        with mock.patch.object(
+            resume_improver_module, "job_post_index", self.index
+        ), mock.patch.object(
+            resume_improver_module.config, "DATA_PATH", self.tmp_dir.name
+        ), mock.patch.object(
+            resume_improver_module.JobPost,
+            "parse_job_post",
+            return_value=self.parsed_job,
+        ) as parse_job_post:
+            first = ResumeImprover(job_description=self.job_post_raw)
+            first.parse_job()
+            second = ResumeImprover(job_description=self.job_post_raw)
+            second.parse_job()
+        self.assertEqual(parse_job_post.call_count, 1)
+        self.assertEqual(second.parsed_job, self.parsed_job)
+        self.assertEqual(second.job_data_location, first.job_data_location)
+
+
+class TestFakeChatModel(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(
+                resume_improver_module,
+                "job_post_index",
+                JobPostIndex(os.path.join(self.tmp_dir.name, "job_index.sqlite3")),
+            ),
+            mock.patch.object(
+                resume_improver_module.config, "DATA_PATH", self.tmp_dir.name
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_structured_output_is_schema_valid(self):
+        llm = FakeChatModel(latency=0)
+        for schema in (
+            JobDescription,
+            resume_improver_module.BatchResumeOutput,
+            resume_improver_module.ResumeSectionHighlighterOutput,
+        ):
+            output = llm.with_structured_output(schema).invoke("prompt")
+            self.assertIsInstance(output, schema)
+        highlights = llm.with_structured_output(
+            resume_improver_module.ResumeSectionHighlighterOutput
+        ).invoke("prompt")
+        self.assertIn(highlights.final_answer[0].relevance, [1, 2, 3, 4, 5])
+
+    def test_latency(self):
+        llm = FakeChatModel(latency=0.05)
+        start = time.perf_counter()
+        llm.with_structured_output(JobDescription).invoke("prompt")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+
+    def test_concurrent_identical_requests_share_one_run(self):
+        llm_kwargs = {"chat_model": FakeChatModel, "latency": 0.2, "cache": False}
+        workspaces = [tempfile.TemporaryDirectory() for _ in range(3)]
+        self.addCleanup(lambda: [workspace.cleanup() for workspace in workspaces])
+        improvers = [
+            ResumeImprover(
+                job_description="Coalesced Corp is hiring a Data Engineer.",
+                llm_kwargs=dict(llm_kwargs),
+                workspace=workspace.name,
+            )
+            for workspace in workspaces
+        ]
+        with mock.patch.object(
+            resume_improver_module.JobPost,
+            "parse_job_post",
+            autospec=True,
+            side_effect=resume_improver_module.JobPost.parse_job_post,
+        ) as parse_job_post, mock.patch.object(
+            ResumeImprover,
+            "_process_all_sections_batch",
+            autospec=True,
+            side_effect=ResumeImprover._process_all_sections_batch,
+        ) as process_all_sections_batch:
+            threads = [threading.Thread(target=improver.tailor) for improver in improvers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+        self.assertEqual(parse_job_post.call_count, 1)
+        self.assertEqual(process_all_sections_batch.call_count, 1)
+        for improver in improvers[1:]:
+            self.assertEqual(improver.parsed_job, improvers[0].parsed_job)
+            self.assertEqual(improver.resume_yaml, improvers[0].resume_yaml)
+            self.assertIsNot(improver.experiences, improvers[0].experiences)
+        # Each request writes its tailored resume to its own workspace
+        for improver, workspace in zip(improvers, workspaces):
+            self.assertEqual(os.path.dirname(improver.yaml_loc), workspace.name)
+            self.assertTrue(os.path.exists(improver.yaml_loc))
+
+    def test_pipeline_runs_offline(self):
+        resume_improver = ResumeImprover(
+            job_description="Example Corp is hiring a Software Engineer.",
+            llm_kwargs={"chat_model": FakeChatModel, "latency": 0},
+        )
+        resume = resume_improver.tailor()
+        self.assertEqual(resume_improver.parsed_job["company"], "Sample company")
+        self.assertGreater(resume_improver.token_usage["prompt_tokens"], 0)
+        self.assertGreater(resume_improver.token_usage["completion_tokens"], 0)
+        self.assertEqual(resume["objective"], "Sample objective")
+        self.assertTrue(os.path.exists(resume_improver.yaml_loc))
+
+    def test_tailored_sections_are_reused_with_the_same_model_settings(self):
+        def improver(**llm_kwargs):
+            resume_improver = ResumeImprover(
+                job_description="Example Corp is hiring a Software Engineer.",
+                llm_kwargs={"chat_model": FakeChatModel, "latency": 0, **llm_kwargs},
+            )
+            resume_improver.parse_job()
+            return resume_improver
+
+        improver().tailor()
+        self.assertTrue(improver()._load_tailored_sections())
+        self.assertFalse(improver(temperature=0.9)._load_tailored_sections())
+
+    def test_batch_and_per_section_runs_store_the_same_skills(self):
+        resume = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+
+        def tailor(resume):
+            resume_improver = ResumeImprover(
+                job_description="Example Corp is hiring a Software Engineer.",
+                llm_kwargs={"chat_model": FakeChatModel, "latency": 0},
+                resume=copy.deepcopy(resume),
+                save_yaml=False,
+            )
+            with mock.patch.object(
+                ResumeImprover,
+                "_process_sections_with_cache",
+                autospec=True,
+                side_effect=ResumeImprover._process_sections_with_cache,
+            ) as process_sections:
+                return resume_improver.tailor(), process_sections.call_count
+
+        batch_resume, per_section_calls = tailor(resume)
+        self.assertEqual(per_section_calls, 0)
+        technical = next(s for s in batch_resume["skills"] if s["category"] == "Technical")
+        self.assertIn("Python", technical["skills"])
+
+        # One changed experience sends the next run through the per-section path,
+        # which reuses the skills the batch run stored
+        resume["experiences"][0]["highlights"] = ["Led a different project."]
+        per_section_resume, per_section_calls = tailor(resume)
+        self.assertEqual(per_section_calls, 1)
+        self.assertEqual(per_section_resume["skills"], batch_resume["skills"])
+
+    def test_in_memory_pipeline_skips_yaml_round_trips(self):
+        resume = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+        workspace = os.path.join(self.tmp_dir.name, "workspace")
+        os.makedirs(workspace)
+        resume_improver = ResumeImprover(
+            job_description="Example Corp is hiring a Software Engineer.",
+            llm_kwargs={"chat_model": FakeChatModel, "latency": 0},
+            workspace=workspace,
+            resume=resume,
+            save_yaml=False,
+        )
+        with mock.patch.object(
+            resume_improver_module.utils, "read_yaml", side_effect=AssertionError("read_yaml")
+        ):
+            resume_improver.tailor()
+            pdf_location = resume_improver.render()
+        self.assertEqual(resume_improver.resume_yaml["objective"], "Sample objective")
+        self.assertIsNone(resume_improver.yaml_loc)
+        self.assertEqual(os.listdir(workspace), [os.path.basename(pdf_location)])
+
+        # The YAML is only written on request, and edits to it are read back
+        yaml_loc = resume_improver.save_resume_yaml()
+        self.assertEqual(yaml_loc, os.path.join(workspace, "resume.yaml"))
+        utils.write_yaml(dict(resume_improver.resume_yaml, objective="Edited"), filename=yaml_loc)
+        self.assertEqual(resume_improver.reload_resume_yaml()["objective"], "Edited")
+
+    def test_resubmission_only_rewrites_changed_sections(self):
+        job_description = "Example Corp is hiring a Software Engineer."
+        resume = utils.read_yaml(filename=config.DEFAULT_RESUME_PATH)
+        resume_location = os.path.join(self.tmp_dir.name, "resume.yaml")
+
+        def tailor():
+            utils.write_yaml(resume, filename=resume_location)
+            resume_improver = ResumeImprover(
+                job_description=job_description,
+                resume_location=resume_location,
+                # Enough highlight lists for every section of the resume
+                llm_kwargs={"chat_model": FakeChatModel, "latency": 0, "list_length": 5},
+            )
+            with mock.patch.object(
+                ResumeImprover,
+                "_create_batch_runnable",
+                autospec=True,
+                side_effect=ResumeImprover._create_batch_runnable,
+            ) as batch, mock.patch.object(
+                ResumeImprover,
+                "_chain_updater",
+                autospec=True,
+                side_effect=ResumeImprover._chain_updater,
+            ) as chain_updater:
+                tailored = resume_improver.tailor()
+            prompts = sorted(
+                name
+                for call in chain_updater.call_args_list
+                for name, prompt in resume_improver_module.Prompts.chat_prompts.items()
+                if call.args[1] is prompt
+            )
+            return tailored, batch.call_count, prompts
+
+        first, batch_calls, _ = tailor()
+        self.assertEqual(batch_calls, 1)
+
+        unchanged, batch_calls, prompts = tailor()
+        self.assertEqual((batch_calls, prompts), (0, []))
+        self.assertEqual(unchanged, first)
+
+        resume["projects"][0]["highlights"] = ["Rewrote the search service in Rust"]
+        _, batch_calls, prompts = tailor()
+        self.assertEqual((batch_calls, prompts), (0, ["SECTION_HIGHLIGHTER"]))
+
+        # Skills and the objective are written from the experiences
+        resume["experiences"][0]["highlights"] = ["Led a team of five engineers"]
+        _, batch_calls, prompts = tailor()
+        self.assertEqual(
+            (batch_calls, prompts),
+            (0, ["OBJECTIVE_WRITER", "SECTION_HIGHLIGHTER", "SKILLS_MATCHER"]),
+        )
+
+    def test_job_post_uses_llm_kwargs(self):
+        job_post = JobPost("posting", llm_kwargs={"chat_model": FakeChatModel})
+        self.assertIsInstance(job_post.extractor_llm, FakeChatModel)
+        self.assertEqual(job_post.parse_job_post()["job_title"], "Sample job title")
+
+
+class TestPromptCompaction(unittest.TestCase):
+    def setUp(self):
+        self.parsed_job = {
+            "company": "Example Corp",
+            "duties": ["Build and maintain data pipelines in Python and SQL"],
+            "salary": None,
+        }
+
+    def test_boilerplate_elements_are_removed(self):
+        html = (
+            "<html><nav>Home Jobs Sign in</nav>"
+            "<div class='cookie-banner'>We use cookies.</div>"
+            "<main><h1>Data Engineer</h1><p>Join our team.</p></main>"
+            "<footer>All rights reserved</footer></html>"
+        )
+        self.assertEqual(extract_job_post_text(html), "Data Engineer Join our team.")
+
+    def test_parsed_and_repeated_sentences_are_dropped(self):
+        text = (
+            "You will build and maintain data pipelines in Python and SQL. "
+            "We value curiosity and ownership. We value curiosity and ownership. "
+            "Accept all cookies to continue."
+        )
+        self.assertEqual(
+            compact_job_post(text, self.parsed_job, max_tokens=1000),
+            "We value curiosity and ownership.",
+        )
+
+    def test_token_budget(self):
+        text = " ".join(f"Sentence number {i} about the team." for i in range(200))
+        compacted = compact_job_post(text, {}, max_tokens=50)
+        self.assertLessEqual(count_tokens(compacted), 50)
+        self.assertTrue(compacted.startswith("Sentence number 0"))
+
+    def test_format_parsed_job(self):
+        self.assertEqual(
+            format_parsed_job(self.parsed_job),
+            "company: Example Corp\nduties: Build and maintain data pipelines in Python and SQL",
+        )
+
+
+class TestResumeImproverStages(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.job_post_raw = "Example Corp is hiring a Software Engineer."
+        self.parsed_job = {"company": "Example Corp", "job_title": "Software Engineer"}
+        self.patches = [
+            mock.patch.object(
+                resume_improver_module,
+                "job_post_index",
+                JobPostIndex(os.path.join(self.tmp_dir.name, "job_index.sqlite3")),
+            ),
+            mock.patch.object(
+                resume_improver_module.config, "DATA_PATH", self.tmp_dir.name
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_construction_is_lazy(self):
+        with mock.patch.object(ResumeImprover, "_download_url") as download_url:
+            resume_improver = ResumeImprover(url="https://example.com/job")
+        download_url.assert_not_called()
+        self.assertIsNone(resume_improver.resume)
+        self.assertIsNone(resume_improver.parsed_job)
+
+    def test_stages_are_memoized(self):
+        resume_improver = ResumeImprover(job_description=self.job_post_raw)
+        with mock.patch.object(
+            resume_improver_module.JobPost,
+            "parse_job_post",
+            return_value=self.parsed_job,
+        ) as parse_job_post:
+            resume_improver.prepare()
+            self.assertIsNotNone(resume_improver.resume)
+            parse_job_post.assert_not_called()
+            self.assertEqual(resume_improver.parse_job(), self.parsed_job)
+            self.assertEqual(resume_improver.parse_job(), self.parsed_job)
+        self.assertEqual(parse_job_post.call_count, 1)
+
+    def test_share_job_post(self):
+        lead_improver = ResumeImprover(job_description=self.job_post_raw)
+        resume_improver = ResumeImprover(job_description=self.job_post_raw)
+        with mock.patch.object(
+            resume_improver_module.JobPost,
+            "parse_job_post",
+            return_value=self.parsed_job,
+        ) as parse_job_post:
+            resume_improver.share_job_post(lead_improver)
+            resume_improver.parse_job()
+        self.assertEqual(parse_job_post.call_count, 1)
+        self.assertEqual(resume_improver.parsed_job, self.parsed_job)
+        self.assertEqual(
+            resume_improver.job_data_location, lead_improver.job_data_location
+        )
+        self.assertIsNotNone(resume_improver.resume)
+
+    def test_async_stages_share_memoized_results(self):
+        resume_improver = ResumeImprover(job_description=self.job_post_raw)
+
+        async def run_stages():
+            return await asyncio.gather(
+                resume_improver.aparse_job(), resume_improver.aparse_job()
+            )
+
+        with mock.patch.object(
+            resume_improver_module.JobPost,
+            "aparse_job_post",
+            new_callable=mock.AsyncMock,
+            return_value=self.parsed_job,
+        ) as aparse_job_post:
+            results = asyncio.run(run_stages())
+            self.assertEqual(results, [self.parsed_job, self.parsed_job])
+            self.assertEqual(resume_improver.parse_job(), self.parsed_job)
+        self.assertEqual(aparse_job_post.call_count, 1)
+
+    def test_async_download_uses_conditional_get(self):
+        async def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.Response(
+                text="<p>Software Engineer</p>",
+                content_type="text/html",
+                headers={"ETag": '"v1"'},
+            )
+
+        async def download_twice():
+            app = web.Application()
+            app.router.add_get("/job", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            resume_improver = ResumeImprover(url=f"http://127.0.0.1:{port}/job")
+            try:
+                self.assertTrue(await resume_improver._adownload_url())
+                first = resume_improver.job_post_not_modified
+                self.assertTrue(
+                    await resume_improver._adownload_url(
+                        request_headers={"If-None-Match": '"v1"'}
+                    )
+                )
+                return resume_improver, first
+            finally:
+                await close_http_session()
+                await runner.cleanup()
+
+        resume_improver, first_not_modified = asyncio.run(download_twice())
+        self.assertFalse(first_not_modified)
+        self.assertTrue(resume_improver.job_post_not_modified)
+        self.assertEqual(resume_improver.job_post_html_data, "<p>Software Engineer</p>")
+        self.assertEqual(resume_improver.job_post_response_headers.get("etag"), '"v1"')
+
+
+class TestRequestSizeLimit(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+
+        @app.post("/upload")
+        async def upload(resume_file: UploadFile = File(...)):
+            return {"size": len(await resume_file.read())}
+
+        self.app = RequestSizeLimitMiddleware(app, max_bytes=1000)
+
+    def _post(self, chunks: list, content_length: int = None):
+        """Send a multipart body chunk by chunk; return the status and how many chunks the app read."""
+        boundary = "limit"
+        headers = [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        head = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="resume_file"; '
+            f'filename="resume.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+        ).encode()
+        bodies = [head, *chunks, f"\r\n--{boundary}--\r\n".encode()]
+        scope = {
+            "type": "http", "method": "POST", "path": "/upload", "raw_path": b"/upload",
+            "query_string": b"", "headers": headers, "http_version": "1.1",
+            "scheme": "http", "server": ("testserver", 80), "client": ("client", 1), "root_path": "",
+        }
+        consumed = []
+        messages = []
+
+        async def receive():
+            if len(consumed) == len(bodies):
+                return {"type": "http.disconnect"}
+            consumed.append(bodies[len(consumed)])
+            return {"type": "http.request", "body": consumed[-1], "more_body": len(consumed) < len(bodies)}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.app(scope, receive, send))
+        return messages[0]["status"], len(consumed), len(bodies)
+
+    def test_small_upload_passes(self):
+        status, consumed, total = self._post([b"%PDF-" + b"x" * 100])
+        self.assertEqual((status, consumed), (200, total))
+
+    def test_oversized_chunked_body_is_stopped_while_it_arrives(self):
+        status, consumed, total = self._post([b"x" * 400] * 20)
+        self.assertEqual(status, 413)
+        self.assertLess(consumed, total)
+
+    def test_oversized_content_length_is_rejected_before_reading(self):
+        status, consumed, _ = self._post([b"x" * 400] * 20, content_length=8000)
+        self.assertEqual((status, consumed), (413, 0))
+
+
+class TestSectionFallback(unittest.TestCase):
+    class Output:
+        def __init__(self, final_answer):
+            self.final_answer = final_answer
+
+        def dict(self):
+            return {"final_answer": self.final_answer}
+
+    def setUp(self):
+        self.resume_improver = ResumeImprover(job_description="Software Engineer")
+        self.resume_improver.load_resume()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _fake_chain(self, prompt_msgs, pydantic_object, **chain_kwargs):
+        def run(chain_inputs):
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.05)
+            with self.lock:
+                self.in_flight -= 1
+            if pydantic_object is resume_improver_module.ResumeSkillsMatcherOutput:
+                return self.Output({"technical_skills": ["Python"]})
+            if pydantic_object is resume_improver_module.ResumeSummarizerOutput:
+                return self.Output("Objective")
+            section = chain_inputs["section"]
+            title = section.get("company") or section.get("name")
+            return self.Output([{"highlight": title, "relevance": 1}])
+
+        return RunnableLambda(run)
+
+    def _run_fallback(self, process):
+        with mock.patch.object(
+            ResumeImprover, "_chain_updater", side_effect=self._fake_chain
+        ) as chain_updater, mock.patch.object(
+            ResumeImprover,
+            "_get_formatted_chain_inputs",
+            side_effect=lambda chain, section=None: {"section": section},
+        ), mock.patch.object(langchain_helpers.config, "MAX_CONCURRENT_WORKERS", 2):
+            results = process()
+        return results, chain_updater.call_count
+
+    def _assert_results(self, results):
+        sections = self.resume_improver.experiences + self.resume_improver.projects
+        self.assertEqual(results["objective"], "Objective")
+        self.assertEqual(results["skills"][0]["skills"][0], "Python")
+        self.assertEqual(
+            [s["highlights"] for s in results["experiences"] + results["projects"]],
+            [[s.get("company") or s.get("name")] for s in sections],
+        )
+
+    def test_sections_are_batched_in_order(self):
+        results, calls = self._run_fallback(
+            self.resume_improver._process_sections_with_cache
+        )
+        self._assert_results(results)
+        self.assertEqual(self.max_in_flight, 2)
+        # A second run is served from the cache
+        _, repeat_calls = self._run_fallback(
+            self.resume_improver._process_sections_with_cache
+        )
+        self.assertEqual(repeat_calls, 0)
+
+    def test_sections_are_reported_as_they_finish(self):
+        events = []
+        self.resume_improver.progress_callback = lambda event, **data: events.append(
+            (data["section"], data["index"])
+        )
+        self._run_fallback(self.resume_improver._process_sections_with_cache)
+        expected = [("skills", 0), ("objective", 0)]
+        for section in ("experiences", "projects"):
+            expected += [
+                (section, i) for i in range(len(getattr(self.resume_improver, section)))
+            ]
+        self.assertCountEqual(events, expected)
+
+    def test_async_sections_are_batched_in_order(self):
+        results, _ = self._run_fallback(
+            lambda: asyncio.run(self.resume_improver._aprocess_sections_with_cache())
+        )
+        self._assert_results(results)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,17 @@
 import unittest
 from ..utils.yaml_handler import read_yaml, write_yaml, dict_to_yaml_string
+from ..utils.resume_format_checker import check_resume_format
 from ..utils.file_handler import (
+    Workspace,
     read_jobfile,
     generator_key_in_nested_dict,
     get_dict_field,
+    sweep_workspaces,
 )
+from concurrent.futures import ThreadPoolExecutor
 import os
+import tempfile
+import time
 from ..config import config
 
 
@@ -26,12 +32,30 @@ class TestYamlHandler(unittest.TestCase):
             )
         )
 
+    def test_concurrent_write_yaml_leaves_a_complete_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "resume.yaml")
+            versions = [{"version": i, "items": list(range(i * 100))} for i in range(8)]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda data: write_yaml(data, filename=filename), versions))
+            self.assertIn(read_yaml(filename=filename), versions)
+            self.assertEqual(os.listdir(tmp_dir), ["resume.yaml"])
+
     def test_dict_to_yaml_string(self):
         data = {"key": "value"}
         yaml_string = dict_to_yaml_string(data)
         self.assertIn("key: value", yaml_string)
 
 
+class TestResumeFormatChecker(unittest.TestCase):
+    def test_accepts_a_path_or_a_loaded_resume(self):
+        resume = read_yaml(filename=config.DEFAULT_RESUME_PATH)
+        self.assertEqual(
+            check_resume_format(config.DEFAULT_RESUME_PATH), check_resume_format(resume)
+        )
+        self.assertFalse(check_resume_format(dict(resume, basic="John Doe")))
+
+
 class TestFileHandler(unittest.TestCase):
     def test_generator_key_in_nested_dict(self):
         nested_dict = {"key1": {"key2": "value"}}
@@ -44,5 +68,36 @@ class TestFileHandler(unittest.TestCase):
         self.assertEqual(result, "value")
 
 
+
+class TestWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_workspaces_are_private_and_removed_on_cleanup(self):
+        with Workspace(self.root) as first, Workspace(self.root) as second:
+            self.assertNotEqual(first.path, second.path)
+            path = first.file("renders", "classic", "resume.pdf")
+            self.assertTrue(os.path.isdir(os.path.dirname(path)))
+            self.assertTrue(path.startswith(first.path))
+        self.assertFalse(os.path.exists(first.path))
+        self.assertFalse(os.path.exists(second.path))
+
+    def test_sweep_removes_only_stale_workspaces(self):
+        stale, fresh = Workspace(self.root), Workspace(self.root)
+        other = os.path.join(self.root, "not-a-workspace")
+        os.makedirs(other)
+        old = time.time() - 3600
+        os.utime(stale.path, (old, old))
+        os.utime(other, (old, old))
+        self.assertEqual(sweep_workspaces(max_age_seconds=60, root=self.root), 1)
+        self.assertFalse(os.path.exists(stale.path))
+        self.assertTrue(os.path.exists(fresh.path))
+        self.assertTrue(os.path.exists(other))
+
+
 if __name__ == "__main__":
     unittest.main()
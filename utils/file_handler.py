@@ -1,8 +1,83 @@
 import os
+import shutil
+import tempfile
+import time
 from typing import Union, List, Generator, Optional
 import config
 import utils
 
+# Prefix of workspace directory names, so only workspaces are ever swept
+WORKSPACE_PREFIX = "ws-"
+
+
+class Workspace:
+    """
+    A private directory for the files of one request.
+
+    Each request writes its uploaded resume, tailored resume and PDFs to its
+    own workspace under `WORKSPACES_PATH`, so concurrent requests, in one
+    process or several, never overwrite each other's files. `cleanup` removes
+    the workspace; `sweep_workspaces` removes those left behind by a crash.
+
+    Args:
+        root (str, optional): Parent directory. Defaults to `config.WORKSPACES_PATH`.
+    """
+
+    def __init__(self, root: str = None):
+        root = root or config.WORKSPACES_PATH
+        os.makedirs(root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=root)
+
+    def file(self, *names: str) -> str:
+        """
+        Returns the path of a file in the workspace, creating its parent directories.
+        """
+        path = os.path.join(self.path, *names)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def cleanup(self) -> None:
+        """
+        Removes the workspace and everything in it.
+        """
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+
+def sweep_workspaces(max_age_seconds: float = None, root: str = None) -> int:
+    """
+    Removes workspaces not modified for `max_age_seconds`.
+
+    Args:
+        max_age_seconds (float, optional): Defaults to `config.WORKSPACE_MAX_AGE_SECONDS`.
+        root (str, optional): Defaults to `config.WORKSPACES_PATH`.
+
+    Returns:
+        int: The number of workspaces removed.
+    """
+    root = root or config.WORKSPACES_PATH
+    if max_age_seconds is None:
+        max_age_seconds = config.WORKSPACE_MAX_AGE_SECONDS
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(root):
+        if entry.name.startswith(WORKSPACE_PREFIX) and entry.is_dir():
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
 
 def read_jobfile(filename: str) -> str:
     """
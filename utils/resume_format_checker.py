@@ -1,12 +1,13 @@
 import yaml
 import config
+from typing import Union
 
 
-def check_resume_format(yaml_file_path: str) -> bool:
+def check_resume_format(yaml_file_path: Union[str, dict]) -> bool:
     """Check if the resume format is correct and provide suggestions for corrections.
 
     Args:
-        yaml_file_path (str): The path to the resume YAML file.
+        yaml_file_path (Union[str, dict]): The path to the resume YAML file, or the resume already loaded from it.
 
     Returns:
         bool: True if the format is correct, False otherwise.
@@ -159,8 +160,11 @@ def check_resume_format(yaml_file_path: str) -> bool:
                 return [(path, expected.__name__, type(actual).__name__)]
             return []
 
-    with open(yaml_file_path, "r") as file:
-        actual_yaml_dict = yaml.safe_load(file)
+    if isinstance(yaml_file_path, dict):
+        actual_yaml_dict = yaml_file_path
+    else:
+        with open(yaml_file_path, "r") as file:
+            actual_yaml_dict = yaml.safe_load(file)
 
     errors = validate_format(actual_yaml_dict, expected_format)
 
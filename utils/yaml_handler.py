@@ -1,3 +1,6 @@
+import os
+import sys
+import threading
 import yaml
 from ruamel.yaml.error import YAMLError
 from io import StringIO
@@ -42,6 +45,9 @@ def write_yaml(data: dict, filename: str = None) -> None:
     """
     Writes a dictionary to a YAML file or prints it to stdout.
 
+    The file is replaced atomically, so concurrent readers see either the old
+    or the new content.
+
     Args:
         data (dict): Data to be written to YAML.
         filename (str): Path to the YAML file.
@@ -49,8 +55,15 @@ def write_yaml(data: dict, filename: str = None) -> None:
     yaml.allow_unicode = True
     try:
         if filename:
-            with open(filename, "w") as stream:
-                yaml.dump(data, stream)
+            # Write a temporary file and rename it, so readers never see a partial file
+            tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_filename, "w") as stream:
+                    yaml.dump(data, stream)
+                os.replace(tmp_filename, filename)
+            finally:
+                if os.path.exists(tmp_filename):
+                    os.remove(tmp_filename)
         else:
             yaml.dump(data, sys.stdout)
     except YAMLError as e: